@@ -1,7 +1,5 @@
 import sys
 import os
-import time
-import json
 import logging
 from datetime import datetime
 from typing import Dict, List
@@ -11,11 +9,24 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from src.fetchers.china_fetcher import ChinaStockFetcher
 from src.fetchers.hk_fetcher import HongKongStockFetcher
 from src.fetchers.us_fetcher import USStockFetcher
+from src.storage.bar_store import BarStore
+from src.storage.archive import resolve_path
+from src.storage.catalog import get_catalog, register_artifact
+from src.storage.price_panel import PricePanel
+from src.storage.snapshot import is_snapshot, read_snapshot
+from src.data_sources.cassette import get_cassette
+from src.utils.circuit_breaker import get_source_health
+from src.utils.rate_limiter import get_rate_limiter
 from src.analyzers.fundamental_analyzer import FundamentalAnalyzer
 from src.analyzers.advanced_technical_analyzer import AdvancedTechnicalAnalyzer
+from src.analyzers.compact_signal import CompactSignalEngine
+from src.analyzers.panel_indicators import MIN_BARS, PanelIndicatorEngine
+from src.analyzers.streaming_indicators import StreamingIndicators
 from src.recommenders.recommender import Recommender
 from src.reporters.report_generator import ReportGenerator
 from src.utils.email_sender import EmailSender
+from src.utils.serialization import dump, loads
+from config.config import STORAGE_CONFIG
 
 logging.basicConfig(
     level=logging.INFO,
@@ -23,90 +34,203 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# _prepare_stock 用到的 stocks_to_analyze 字段，读取列式快照时只解码这些列
+ANALYSIS_COLUMNS = ['代码', '名称', 'code', 'name', 'pe_ratio', 'pb_ratio', 'roe', 'revenue_growth', 'profit_growth']
+
 
 class StockAnalyzer:
     def __init__(self):
-        self.cn_fetcher = ChinaStockFetcher()
-        self.hk_fetcher = HongKongStockFetcher()
-        self.us_fetcher = USStockFetcher()
+        self.bar_store = BarStore()
+        self.cn_fetcher = ChinaStockFetcher(bar_store=self.bar_store)
+        self.hk_fetcher = HongKongStockFetcher(bar_store=self.bar_store)
+        self.us_fetcher = USStockFetcher(bar_store=self.bar_store)
         self.fundamental_analyzer = FundamentalAnalyzer()
         self.technical_analyzer = AdvancedTechnicalAnalyzer()
+        self.panel_engine = PanelIndicatorEngine(self.technical_analyzer)
+        self.compact_engine = CompactSignalEngine(self.technical_analyzer)
+        # 最后的兜底：pandas 后端的逐只计算，不经过 compute_indicators 和 numpy/TA-Lib 内核
+        self.fallback_analyzer = AdvancedTechnicalAnalyzer('pandas')
         self.recommender = Recommender()
         self.report_generator = ReportGenerator()
         self.data_dir = 'data'
+        self.panels: Dict[str, PricePanel] = {}
+        self.indicator_states: Dict[str, StreamingIndicators] = {}
+
+    def _panel(self, market: str) -> PricePanel:
+        if market not in self.panels:
+            self.panels[market] = PricePanel(os.path.join(STORAGE_CONFIG['panel_dir'], market))
+        return self.panels[market]
+
+    def _indicator_state(self, market: str) -> StreamingIndicators:
+        if market not in self.indicator_states:
+            self.indicator_states[market] = StreamingIndicators.for_market(market, self.technical_analyzer)
+        return self.indicator_states[market]
+
+    def _technical_signals(self, market: str, frames: Dict) -> Dict:
+        """
+        已有指标状态的股票只增量处理新K线，其余用面板引擎预热；状态出错时退回面板引擎全量计算
+        """
+        try:
+            state = self._indicator_state(market)
+            signals = state.ingest(frames)
+            state.save()
+            return signals
+        except Exception as e:
+            logger.warning(f"增量指标更新失败，全量计算: {e}")
+        return self.panel_engine.generate_signals(frames)
+
+    def _panel_frame(self, market: str, code: str, historical_data):
+        """
+        把K线写入价格面板，并从面板取回统一为 Open/High/Low/Close/Volume 列的视图
+
+        akshare 返回的小写列名在技术分析中无法使用，写入面板时一并统一；
+        面板出错、或取回的K线比写入的少（列名未识别等）时退回原始数据
+        """
+        try:
+            panel = self._panel(market)
+            written = panel.write_frame(code, historical_data)
+            start_date = historical_data['date'].iloc[0] if 'date' in historical_data.columns \
+                else historical_data.index[0]
+            frame = panel.get_frame(code, start_date)
+            if frame.empty or len(frame) < written:
+                logger.warning(f"价格面板K线不完整 {market}/{code}: 写入 {written} 行，取回 {len(frame)} 行，使用原始数据")
+                return historical_data
+            return frame
+        except Exception as e:
+            logger.warning(f"写入价格面板失败 {market}/{code}: {e}")
+            return historical_data
 
     def load_data(self, filepath: str) -> Dict:
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            filepath = resolve_path(filepath)
+            if is_snapshot(filepath):
+                data = read_snapshot(filepath, columns={'stocks_to_analyze': ANALYSIS_COLUMNS})
+            else:
+                with open(filepath, 'rb') as f:
+                    data = loads(f.read())
             logger.info(f"数据加载成功: {filepath}")
             return data
         except Exception as e:
             logger.error(f"加载数据失败: {e}")
             return {}
 
-    def get_latest_data_file(self) -> str:
+    def _newest_data_file(self) -> str:
+        """扫描数据目录，按文件名中的时间取最新的数据文件，.json 和 .snap 两种格式混在一起时也取最新的一个"""
+        files = [f for f in os.listdir(self.data_dir)
+                 if f.startswith('market_data_') and (f.endswith('.json') or
+                                                      is_snapshot(os.path.join(self.data_dir, f)))]
+        if not files:
+            return ""
+        files.sort(key=lambda f: os.path.splitext(f)[0], reverse=True)
+        return os.path.join(self.data_dir, files[0])
+
+    def get_latest_data_file(self, market: str = None) -> str:
         try:
-            files = [f for f in os.listdir(self.data_dir) if f.startswith('market_data_') and f.endswith('.json')]
-            if not files:
-                logger.error("未找到数据文件")
-                return ""
-            
-            files.sort(reverse=True)
-            return os.path.join(self.data_dir, files[0])
+            # 以目录为准，market 指定时返回该市场有数据的最新快照；
+            # 不经抓取流程写入的文件（手工拷入、下载的制品）需先用 python -m src.storage.catalog rebuild 登记
+            entry = get_catalog().latest('market_data', market=market)
+            if entry:
+                path = resolve_path(entry['path'])
+                if os.path.exists(path):
+                    return path
+                logger.warning(f"目录中的数据文件已不存在: {entry['path']}，改为扫描目录")
+        except Exception as e:
+            logger.warning(f"查询数据文件目录失败，改为扫描目录: {e}")
+        
+        try:
+            newest = self._newest_data_file()
         except Exception as e:
             logger.error(f"查找最新数据文件失败: {e}")
             return ""
+        if not newest:
+            logger.error("未找到数据文件")
+        return newest
 
-    def analyze_stock(self, stock_info: Dict, market: str) -> Dict:
-        try:
-            code = stock_info.get('代码') or stock_info.get('code', '')
-            name = stock_info.get('名称') or stock_info.get('name', '')
-            
-            if not code:
-                return None
-            
-            stock_data = stock_info.copy()
-            
-            fundamental_analysis = self.fundamental_analyzer.analyze_stock(stock_data)
-            
-            historical_data = None
-            if market == 'cn':
-                historical_data = self.cn_fetcher.get_stock_data(code)
-            elif market == 'hk':
-                historical_data = self.hk_fetcher.get_stock_data(code)
-            elif market == 'us':
-                historical_data = self.us_fetcher.get_stock_data(code)
-            
-            technical_analysis = {}
-            if historical_data is not None and not historical_data.empty:
-                technical_analysis = self.technical_analyzer.generate_comprehensive_signal(historical_data)
-            
-            recommendation = self.recommender.generate_recommendation(
-                code, name, fundamental_analysis, technical_analysis
-            )
-            
-            if recommendation:
-                logger.info(f"完成分析: {name} ({code}), 评分: {recommendation['total_score']}")
-            
-            return recommendation
-        except Exception as e:
-            logger.error(f"分析股票失败: {e}")
+    def _prepare_stock(self, stock_info: Dict, market: str):
+        """基本面分析并取K线，返回 (代码, 名称, 基本面分析, K线)，K线可能为 None"""
+        code = stock_info.get('代码') or stock_info.get('code', '')
+        name = stock_info.get('名称') or stock_info.get('name', '')
+        
+        if not code:
             return None
+        
+        stock_data = stock_info.copy()
+        
+        fundamental_analysis = self.fundamental_analyzer.analyze_stock(stock_data)
+        
+        historical_data = None
+        if market == 'cn':
+            historical_data = self.cn_fetcher.get_stock_data(code)
+        elif market == 'hk':
+            historical_data = self.hk_fetcher.get_stock_data(code)
+        elif market == 'us':
+            historical_data = self.us_fetcher.get_stock_data(code)
+        
+        if historical_data is not None and not historical_data.empty:
+            historical_data = self._panel_frame(market, code, historical_data)
+        else:
+            historical_data = None
+        
+        return code, name, fundamental_analysis, historical_data
+
+    def _recommend(self, code: str, name: str, fundamental_analysis: Dict, technical_analysis: Dict) -> Dict:
+        recommendation = self.recommender.generate_recommendation(
+            code, name, fundamental_analysis, technical_analysis
+        )
+        
+        if recommendation:
+            logger.info(f"完成分析: {name} ({code}), 评分: {recommendation['total_score']}")
+        
+        return recommendation
+
+    def _per_symbol_signals(self, frames: Dict) -> Dict:
+        """
+        面板引擎失败时逐只计算：先用紧凑模式（工作数组在股票之间复用，不修改K线，内存占用小），
+        紧凑模式失败的股票再用与 compute_indicators 无关的 generate_comprehensive_signal 计算
+        """
+        signals = {}
+        for code, df in frames.items():
+            _, signal = self.compact_engine.generate(df)
+            if not signal and len(df) >= MIN_BARS:
+                try:
+                    signal = self.fallback_analyzer.generate_comprehensive_signal(df.copy())
+                except Exception as e:
+                    logger.error(f"技术分析失败 {code}: {e}")
+                    signal = {}
+            signals[code] = signal
+        return signals
 
     def analyze_market_stocks(self, market_data: Dict) -> List[Dict]:
+        """先取齐全部股票的K线，再一次算完技术指标"""
         market = market_data.get('market', '')
         stocks_to_analyze = market_data.get('stocks_to_analyze', [])
         
         logger.info(f"开始分析 {market} 市场 {len(stocks_to_analyze)} 只股票")
         
+        prepared = []
+        for stock in stocks_to_analyze:
+            try:
+                item = self._prepare_stock(stock, market)
+                if item is not None:
+                    prepared.append(item)
+            except Exception as e:
+                logger.error(f"分析股票失败: {e}")
+        
+        frames = {code: historical_data for code, _, _, historical_data in prepared if historical_data is not None}
+        try:
+            signals = self._technical_signals(market, frames)
+        except Exception as e:
+            logger.error(f"面板指标计算失败，逐只计算: {e}")
+            signals = self._per_symbol_signals(frames)
+        
         recommendations = []
         
-        for idx, stock in enumerate(stocks_to_analyze):
-            if idx > 0 and idx % 5 == 0:
-                time.sleep(1)
-            
-            recommendation = self.analyze_stock(stock, market)
+        for code, name, fundamental_analysis, _ in prepared:
+            try:
+                recommendation = self._recommend(code, name, fundamental_analysis, signals.get(code, {}))
+            except Exception as e:
+                logger.error(f"分析股票失败: {e}")
+                recommendation = None
             
             if recommendation:
                 recommendations.append(recommendation)
@@ -141,6 +265,9 @@ class StockAnalyzer:
             us_recommendations = self.analyze_market_stocks(us_data)
             all_recommendations['us'] = us_recommendations
         
+        for panel in self.panels.values():
+            panel.flush()
+        
         return all_recommendations
 
     def save_recommendations(self, recommendations: Dict, filename: str = None) -> str:
@@ -150,9 +277,12 @@ class StockAnalyzer:
             
             filepath = os.path.join(self.data_dir, filename)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(recommendations, f, ensure_ascii=False, indent=2)
+            dump(recommendations, filepath)
             
+            register_artifact('recommendations', filepath,
+                              markets={market: len(recs) for market, recs in recommendations.items()
+                                       if isinstance(recs, list)})
+            self.recommender.record_run(recommendations, source_file=filepath)
             logger.info(f"推荐数据已保存: {filepath}")
             return filepath
         except Exception as e:
@@ -230,6 +360,9 @@ class StockAnalyzer:
             return False
         
         recommendations = self.analyze_all_stocks(market_data)
+        get_rate_limiter().log_stats()
+        get_source_health().log_status()
+        get_cassette().log_stats()
         
         self.save_recommendations(recommendations)
         
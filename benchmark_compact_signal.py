@@ -0,0 +1,71 @@
+"""
+紧凑模式综合信号：内存与耗时对比
+
+generate_comprehensive_signal 把指标列加到K线上（调用方一直持有这些K线，列也一直占着内存），
+CompactSignalEngine 把指标算进复用的工作数组。逐只处理全部股票，统计每只股票的平均耗时、
+处理过程中的峰值内存，以及处理完成后因指标仍占用的内存（K线本身不计入）
+
+用法: python benchmark_compact_signal.py [股票数] [K线数]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from src.analyzers.advanced_technical_analyzer import AdvancedTechnicalAnalyzer
+from src.analyzers.compact_signal import CompactSignalEngine
+
+
+def make_frame(n: int, rng: np.random.Generator) -> pd.DataFrame:
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    high = close * (1 + rng.uniform(0, 0.03, n))
+    low = close * (1 - rng.uniform(0, 0.03, n))
+    return pd.DataFrame({'Open': (high + low) / 2, 'High': high, 'Low': low, 'Close': close,
+                         'Volume': rng.integers(100000, 10000000, n).astype(float)},
+                        index=pd.bdate_range('2023-01-02', periods=n))
+
+
+def run(frames, compute):
+    start = time.perf_counter()
+    for df in frames:
+        compute(df)
+    seconds = time.perf_counter() - start
+
+    # 内存单独测一遍，避免 tracemalloc 影响耗时
+    copies = [df.copy() for df in frames]
+    tracemalloc.start()
+    results = [compute(df) for df in copies]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return seconds / len(frames), current, peak
+
+
+def main():
+    n_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_bars = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    rng = np.random.default_rng(0)
+    frames = [make_frame(n_bars, rng) for _ in range(n_symbols)]
+
+    analyzer = AdvancedTechnicalAnalyzer()
+    engine = CompactSignalEngine(analyzer)
+    modes = [
+        # 原来的调用方式直接传入抓取到的K线，这里每次用新的副本模拟
+        ('generate_comprehensive_signal', lambda df: analyzer.generate_comprehensive_signal(df)),
+        ('CompactSignalEngine', lambda df: engine.generate(df)),
+    ]
+
+    print(f"{n_symbols} 只股票 × {n_bars} 根K线")
+    print(f"{'方式':<32}{'耗时(毫秒/只)':>14}{'处理后占用(KB)':>16}{'峰值(KB)':>12}")
+    for name, compute in modes:
+        seconds, current, peak = run([df.copy() for df in frames], compute)
+        print(f"{name:<32}{seconds * 1000:>14.2f}{current / 1024:>16.0f}{peak / 1024:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
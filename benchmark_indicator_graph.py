@@ -0,0 +1,79 @@
+"""
+指标计算图：共享中间结果前后对比
+
+memoize=False 时每个指标各自计算需要的滚动统计/EWM/位移（与改动前的写法相同），
+memoize=True 时同一基础运算只算一次。统计每只股票的基础运算次数（每次生成一个完整长度的中间序列）、
+耗时，以及计算完成时仍占用的内存和峰值
+
+用法: python benchmark_indicator_graph.py [股票数] [K线数]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from src.analyzers.advanced_technical_analyzer import AdvancedTechnicalAnalyzer
+from src.analyzers.indicator_graph import IndicatorGraph
+
+
+def make_frame(n: int, rng: np.random.Generator) -> pd.DataFrame:
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    high = close * (1 + rng.uniform(0, 0.03, n))
+    low = close * (1 - rng.uniform(0, 0.03, n))
+    return pd.DataFrame({'Open': (high + low) / 2, 'High': high, 'Low': low, 'Close': close,
+                         'Volume': rng.integers(100000, 10000000, n).astype(float)},
+                        index=pd.bdate_range('2023-01-02', periods=n))
+
+
+def compute_all(analyzer: AdvancedTechnicalAnalyzer, df: pd.DataFrame, memoize: bool) -> IndicatorGraph:
+    graph = IndicatorGraph(df, memoize=memoize)
+    analyzer.calculate_moving_averages(df, graph)
+    analyzer.calculate_rsi(df, graph=graph)
+    analyzer.calculate_stochastic(df, graph=graph)
+    analyzer.calculate_macd(df, graph=graph)
+    analyzer.calculate_bollinger_bands(df, graph=graph)
+    analyzer.calculate_atr(df, graph=graph)
+    analyzer.calculate_cci(df, graph=graph)
+    analyzer.calculate_williams_r(df, graph=graph)
+    analyzer.calculate_volume_indicators(df, graph=graph)
+    analyzer.calculate_momentum(df, graph=graph)
+    analyzer.detect_support_resistance(df, graph=graph)
+    return graph
+
+
+def run(frames, memoize: bool):
+    analyzer = AdvancedTechnicalAnalyzer()
+    start = time.perf_counter()
+    for df in frames:
+        graph = compute_all(analyzer, df.copy(), memoize)
+    seconds = time.perf_counter() - start
+
+    # 内存分配单独测一只股票，避免 tracemalloc 影响耗时
+    tracemalloc.start()
+    graph = compute_all(analyzer, frames[0].copy(), memoize)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return graph.stats(), seconds / len(frames), current, peak
+
+
+def main():
+    n_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_bars = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    rng = np.random.default_rng(0)
+    frames = [make_frame(n_bars, rng) for _ in range(n_symbols)]
+
+    print(f"{n_symbols} 只股票 × {n_bars} 根K线，以下为每只股票的平均值")
+    print(f"{'方式':<20}{'基础运算':>10}{'命中缓存':>10}{'耗时(毫秒)':>12}{'占用(KB)':>10}{'峰值(KB)':>10}")
+    for name, memoize in (('各指标独立计算', False), ('共享计算图', True)):
+        stats, seconds, allocated, peak = run(frames, memoize)
+        print(f"{name:<20}{stats['passes']:>10}{stats['hits']:>10}{seconds * 1000:>12.2f}"
+              f"{allocated / 1024:>10.0f}{peak / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+滚动平均绝对偏差（CCI）性能对比
+
+比较原来的 rolling(20).apply(lambda ...) 与 src.analyzers.rolling_kernels.rolling_mad：
+逐只计算（一维）和整个面板一次计算（交易日 × 股票）。apply 太慢，只跑一部分股票后按比例折算
+
+用法: python benchmark_rolling_mad.py [股票数] [K线数]
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from src.analyzers import rolling_kernels
+from src.analyzers.rolling_kernels import rolling_mad
+
+WINDOW = 20
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    n_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    n_bars = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    rng = np.random.default_rng(0)
+    panel = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, size=(n_bars, n_symbols)), axis=0))
+    series = [pd.Series(panel[:, j]) for j in range(n_symbols)]
+
+    sample = min(n_symbols, 100)
+    apply_time = timed(lambda: [s.rolling(window=WINDOW).apply(lambda x: np.abs(x - x.mean()).mean())
+                                for s in series[:sample]]) * n_symbols / sample
+
+    backends = ['numpy'] + (['numba'] if rolling_kernels.numba is not None else [])
+    rows = [(f'rolling.apply（逐只，按 {sample} 只折算）', apply_time)]
+    for backend in backends:
+        if backend == 'numba':
+            rolling_mad(panel[:, :2], WINDOW, backend='numba')  # 预热编译
+        rows.append((f'rolling_mad {backend}（逐只）',
+                     timed(lambda: [rolling_mad(s.to_numpy(), WINDOW, backend=backend) for s in series])))
+        rows.append((f'rolling_mad {backend}（面板）',
+                     timed(lambda: rolling_mad(panel, WINDOW, backend=backend))))
+
+    expected = series[0].rolling(window=WINDOW).apply(lambda x: np.abs(x - x.mean()).mean()).to_numpy()
+    assert np.allclose(rolling_mad(panel, WINDOW)[:, 0], expected, equal_nan=True)
+
+    print(f"{n_symbols} 只股票 × {n_bars} 根K线，窗口 {WINDOW}")
+    print(f"{'方式':<36}{'耗时(秒)':>10}{'加速':>10}")
+    for name, seconds in rows:
+        print(f"{name:<36}{seconds:>10.3f}{apply_time / seconds:>9.0f}x")
+    if rolling_kernels.numba is None:
+        print("未安装 numba，只测试 numpy 实现")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+序列化性能对比 - 全市场快照
+
+生成与 save_data 相同结构的全市场数据（A股 5000+ 只、港股、美股，含 NaN），
+比较原来的 json.dump(indent=2) 与 src.utils.serialization 的耗时和文件大小
+
+用法: python benchmark_serialization.py [A股数量] [重复次数]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from src.utils import serialization
+
+SPOT_COLUMNS = ['最新价', '涨跌幅', '涨跌额', '成交量', '成交额', '振幅', '最高', '最低', '今开', '昨收',
+                '量比', '换手率', '市盈率-动态', '市净率', '总市值', '流通市值', '涨速', '5分钟涨跌',
+                '60日涨跌幅', '年初至今涨跌幅']
+
+
+def build_market(market: str, n: int, rng: np.random.Generator) -> dict:
+    df = pd.DataFrame(rng.normal(10, 5, size=(n, len(SPOT_COLUMNS))).round(2), columns=SPOT_COLUMNS)
+    df.iloc[rng.integers(0, n, n // 20), rng.integers(0, len(SPOT_COLUMNS), n // 20)] = np.nan
+    df.insert(0, '代码', [f'{i:06d}' for i in range(n)])
+    df.insert(1, '名称', [f'股票{i}' for i in range(n)])
+    records = df.to_dict('records')
+    return {
+        'timestamp': pd.Timestamp.now().isoformat(),
+        'market': market,
+        'hot_stocks': {
+            'top_gainers': records[:20],
+            'top_losers': records[20:40],
+            'top_volume': records[40:60]
+        },
+        'stocks_to_analyze': records
+    }
+
+
+def build_snapshot(n_cn: int) -> dict:
+    rng = np.random.default_rng(0)
+    return {
+        'timestamp': pd.Timestamp.now().isoformat(),
+        'cn': build_market('cn', n_cn, rng),
+        'hk': build_market('hk', n_cn // 2, rng),
+        'us': build_market('us', n_cn // 2, rng)
+    }
+
+
+def timed(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n_cn = int(sys.argv[1]) if len(sys.argv) > 1 else 5500
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    data = build_snapshot(n_cn)
+    tmp_dir = tempfile.mkdtemp()
+    path = os.path.join(tmp_dir, 'market_data.json')
+
+    def baseline():
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    cases = [
+        ('json.dump(indent=2)', baseline),
+        (f'serialization ({serialization.BACKEND})', lambda: serialization.dump(data, path)),
+        (f'serialization ({serialization.BACKEND}, compact)', lambda: serialization.dump(data, path, compact=True)),
+    ]
+
+    print(f"全市场快照: A股 {n_cn} 只，港股/美股各 {n_cn // 2} 只，取 {repeat} 次最好成绩")
+    print(f"{'方式':<36}{'耗时(秒)':>10}{'大小(MB)':>10}{'加速':>8}")
+    base_time = None
+    for name, func in cases:
+        seconds = timed(func, repeat)
+        base_time = base_time or seconds
+        size = os.path.getsize(path) / 1024 / 1024
+        print(f"{name:<36}{seconds:>10.3f}{size:>10.2f}{base_time / seconds:>7.1f}x")
+
+    # numpy 标量、时间戳：原来的写法直接失败
+    typed = {'价格': np.float64(10.5), '成交量': np.int64(100), '日期': pd.Timestamp('2024-01-02'), '缺失': np.nan}
+    try:
+        json.dumps(typed, ensure_ascii=False)
+        print("json.dumps 可以编码 numpy/pandas 类型")
+    except TypeError as e:
+        print(f"json.dumps 编码 numpy/pandas 类型失败: {e}")
+    print(f"serialization: {serialization.dumps(typed, compact=True).decode('utf-8')}")
+
+
+if __name__ == "__main__":
+    main()
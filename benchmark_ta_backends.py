@@ -0,0 +1,76 @@
+"""
+技术指标计算后端性能对比
+
+逐只股票计算各基础运算（窗口 20 的滚动统计、居中滚动最大值、EMA12）、完整的综合信号、紧凑模式信号，
+以及整个面板一次计算全部指标（compute_indicators），比较 pandas / numpy / talib（已安装时）后端，
+表中为每只股票的平均耗时
+
+用法: python benchmark_ta_backends.py [股票数] [K线数]
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from src.analyzers import ta_backends
+from src.analyzers.advanced_technical_analyzer import AdvancedTechnicalAnalyzer
+from src.analyzers.compact_signal import CompactSignalEngine
+from src.analyzers.panel_indicators import compute_indicators, stack_frames
+from src.analyzers.ta_backends import STATS, available_backends, get_backend
+
+WINDOW = 20
+
+
+def make_frame(n: int, rng: np.random.Generator) -> pd.DataFrame:
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    high = close * (1 + rng.uniform(0, 0.03, n))
+    low = close * (1 - rng.uniform(0, 0.03, n))
+    return pd.DataFrame({'Open': (high + low) / 2, 'High': high, 'Low': low, 'Close': close,
+                         'Volume': rng.integers(100000, 10000000, n).astype(float)},
+                        index=pd.bdate_range('2023-01-02', periods=n))
+
+
+def per_symbol(func, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - start) / len(items)
+
+
+def main():
+    n_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_bars = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    rng = np.random.default_rng(0)
+    frames = [make_frame(n_bars, rng) for _ in range(n_symbols)]
+    closes = [df['Close'].to_numpy() for df in frames]
+
+    backends = available_backends()
+    rows = [(f'rolling {stat}', lambda backend, stat=stat: per_symbol(
+        lambda x: backend.rolling(x, WINDOW, stat), closes)) for stat in STATS]
+    rows.append(('rolling max 居中', lambda backend: per_symbol(
+        lambda x: backend.rolling(x, WINDOW, 'max', center=True), closes)))
+    rows.append(('ewm 12', lambda backend: per_symbol(lambda x: backend.ewm(x, 12), closes)))
+    rows.append(('综合信号', lambda backend: per_symbol(
+        lambda df: AdvancedTechnicalAnalyzer(backend.name).generate_comprehensive_signal(df.copy()), frames)))
+    rows.append(('紧凑模式信号', lambda backend: per_symbol(
+        CompactSignalEngine(AdvancedTechnicalAnalyzer(backend.name)).generate, frames)))
+    _, arrays, _ = stack_frames({str(i): df for i, df in enumerate(frames)})
+    rows.append(('面板 compute_indicators', lambda backend: per_symbol(
+        lambda arrays: compute_indicators(arrays, backend=backend), [arrays]) / n_symbols))
+
+    print(f"{n_symbols} 只股票 × {n_bars} 根K线，每只股票平均耗时（微秒）")
+    print(f"{'指标':<20}" + ''.join(f"{name:>12}" for name in backends))
+    for label, bench in rows:
+        timings = [bench(get_backend(name)) * 1e6 for name in backends]
+        print(f"{label:<20}" + ''.join(f"{value:>12.1f}" for value in timings))
+    if ta_backends.talib is None:
+        print("未安装 TA-Lib，只测试 pandas / numpy 后端")
+    print(f"默认后端: {get_backend('auto').name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -35,11 +35,112 @@ ANALYSIS_CONFIG = {
     "rsi_period": 14,
     "macd_fast": 12,
     "macd_slow": 26,
-    "macd_signal": 9
+    "macd_signal": 9,
+    # 技术指标计算后端：auto / talib / numpy / pandas，见 src/analyzers/ta_backends.py
+    # 逐只计算、面板引擎、流式指标预热和紧凑模式都使用这个设置
+    "ta_backend": os.getenv("TA_BACKEND", "auto")
 }
 
 RECOMMENDATION_CONFIG = {
     "buy_threshold": 0.7,
     "sell_threshold": 0.3,
-    "min_score": 60
+    "min_score": 60,
+    "store_path": os.getenv("RECOMMENDATION_DB", "data/recommendations.db")
+}
+
+# 每个上游数据源的令牌桶：rate 为每秒补充的令牌数，capacity 为允许的突发请求数
+# 新闻站点按域名各自一个桶，未单独配置的来源使用 default
+RATE_LIMIT_CONFIG = {
+    "akshare": {"rate": 1.0, "capacity": 2},
+    "yfinance": {"rate": 2.0, "capacity": 4},
+    "default": {"rate": 1.0, "capacity": 1}
+}
+
+# 数据源熔断：连续失败 failure_threshold 次后熔断，recovery_seconds 秒后放行一次探测请求
+# empty_result_sources 中的数据源出错时不抛异常而是返回空表：批量请求全部为空或错误信息为限流/网络错误时按失败计数，
+# 单只代码返回空表（代码无效、已退市）不计入
+CIRCUIT_BREAKER_CONFIG = {
+    "failure_threshold": 3,
+    "recovery_seconds": 60,
+    "empty_result_sources": ["yfinance"]
+}
+
+# 数据源调用录制/回放：mode 为 off、record 或 replay
+# latency 为空时回放不等待，recorded 按录制时的耗时等待，数字则为固定等待秒数
+CASSETTE_CONFIG = {
+    "mode": os.getenv("CASSETTE_MODE", "off").lower(),
+    "dir": os.getenv("CASSETTE_DIR", "data/cassettes"),
+    "latency": os.getenv("CASSETTE_LATENCY", "")
+}
+
+STORAGE_CONFIG = {
+    "bar_store_dir": os.getenv("BAR_STORE_DIR", "data/bars"),
+    "bar_refresh_minutes": 60,
+    "bar_backfill_tolerance_days": 7,
+    "bar_max_segments": 20,
+    "panel_dir": os.getenv("PRICE_PANEL_DIR", "data/panel"),
+    "panel_initial_symbols": 256,
+    "panel_initial_days": 512,
+    "indicator_state_dir": os.getenv("INDICATOR_STATE_DIR", "data/cache/indicator_state")
+}
+
+CACHE_CONFIG = {
+    "snapshot_ttl_seconds": int(os.getenv("SNAPSHOT_TTL_SECONDS", 300)),
+    "snapshot_disk_enabled": os.getenv("SNAPSHOT_DISK_CACHE", "true").lower() == "true",
+    "snapshot_disk_dir": "data/cache/snapshots",
+    "sector_index_path": "data/cache/sector_index.json",
+    "sector_refresh_hours": 24,
+    "sector_refresh_max_boards": 100,
+    "sector_include_concepts": True
+}
+
+# 股票基本信息缓存：名称、行业等很少变化，市值每天更新
+METADATA_CACHE_CONFIG = {
+    "path": "data/cache/us_metadata.json",
+    "default_ttl_hours": 24,
+    "field_ttl_hours": {
+        "longName": 24 * 30,
+        "shortName": 24 * 30,
+        "sector": 24 * 30,
+        "industry": 24 * 30,
+        "sharesOutstanding": 24 * 7,
+        "marketCap": 24
+    }
+}
+
+FETCH_CONFIG = {
+    "concurrent": os.getenv("FETCH_CONCURRENT", "true").lower() == "true"
+}
+
+# 新闻抓取 HTTP 客户端：每个站点的连接池大小，以及 ETag/Last-Modified 条件请求的缓存目录
+HTTP_CONFIG = {
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+    "max_retries": 2,
+    "cache_dir": "data/cache/http",
+    "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+# 市场数据快照格式：columnar 为每张表一个列式文件加 manifest 的目录，json 为原来的单个 JSON 文件
+SNAPSHOT_CONFIG = {
+    "format": os.getenv("SNAPSHOT_FORMAT", "columnar").lower(),
+    "compress": True,
+    # 同一天内每 keyframe_interval 个快照保存一次完整关键帧，其余只保存相对关键帧的变化
+    "keyframe_interval": 12,
+    # 变化的单元格超过该比例时直接保存整表
+    "delta_max_ratio": 0.5
+}
+
+# 数据文件目录：记录每次写出的快照、推荐和热点文件
+CATALOG_CONFIG = {
+    "path": os.getenv("CATALOG_PATH", "data/catalog.db")
+}
+
+# data/ 归档：当天全部保留，daily_days 天内每天保留一个，更早的每周保留一个
+ARCHIVE_CONFIG = {
+    "dir": "data/archive",
+    "restore_dir": "data/cache/archive",
+    "daily_days": 30,
+    "zstd_level": 3,
+    "zlib_level": 6
 }
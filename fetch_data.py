@@ -1,8 +1,8 @@
 import sys
 import os
 import time
-import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict
 import pandas as pd
@@ -12,6 +12,13 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from src.fetchers.china_fetcher import ChinaStockFetcher
 from src.fetchers.hk_fetcher import HongKongStockFetcher
 from src.fetchers.us_fetcher import USStockFetcher
+from src.data_sources.cassette import get_cassette
+from src.utils.circuit_breaker import get_source_health
+from src.storage.catalog import get_catalog, market_rows, register_artifact
+from src.storage.snapshot import choose_keyframe, write_snapshot
+from src.utils.serialization import dump
+from src.utils.rate_limiter import get_rate_limiter
+from config.config import FETCH_CONFIG, SNAPSHOT_CONFIG
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,7 +28,8 @@ logger = logging.getLogger(__name__)
 
 
 class DataFetcher:
-    def __init__(self):
+    def __init__(self, concurrent: bool = None):
+        self.concurrent = FETCH_CONFIG['concurrent'] if concurrent is None else concurrent
         self.cn_fetcher = ChinaStockFetcher()
         self.hk_fetcher = HongKongStockFetcher()
         self.us_fetcher = USStockFetcher()
@@ -42,7 +50,6 @@ class DataFetcher:
             
             try:
                 hot_stocks = self.cn_fetcher.get_hot_stocks()
-                time.sleep(1)
                 
                 if hot_stocks:
                     data['hot_stocks']['top_gainers'] = hot_stocks.get('top_gainers', pd.DataFrame()).head(50).to_dict('records')
@@ -57,7 +64,6 @@ class DataFetcher:
             
             try:
                 hot_sectors = self.cn_fetcher.get_hot_sectors()
-                time.sleep(1)
                 
                 if not hot_sectors.empty:
                     data['hot_sectors'] = hot_sectors.head(20).to_dict('records')
@@ -82,7 +88,6 @@ class DataFetcher:
             
             try:
                 hot_stocks = self.hk_fetcher.get_hot_stocks()
-                time.sleep(1)
                 
                 if hot_stocks:
                     data['hot_stocks']['top_gainers'] = hot_stocks.get('top_gainers', pd.DataFrame()).head(50).to_dict('records')
@@ -114,7 +119,6 @@ class DataFetcher:
             
             try:
                 hot_stocks = self.us_fetcher.get_hot_stocks()
-                time.sleep(1)
                 
                 if not hot_stocks.empty:
                     data['hot_stocks'] = hot_stocks.head(50).to_dict('records')
@@ -127,7 +131,6 @@ class DataFetcher:
             
             try:
                 sector_performance = self.us_fetcher.get_sector_performance()
-                time.sleep(1)
                 
                 if not sector_performance.empty:
                     data['sector_performance'] = sector_performance.to_dict('records')
@@ -135,6 +138,8 @@ class DataFetcher:
                 logger.warning(f"获取板块表现失败: {e}")
             
             logger.info(f"获取到 {len(data['stocks_to_analyze'])} 只美股待分析")
+            self.us_fetcher.metadata_cache.flush()
+            self.us_fetcher.metadata_cache.log_stats()
             return data
         except Exception as e:
             logger.error(f"获取美股数据失败: {e}")
@@ -145,25 +150,64 @@ class DataFetcher:
         logger.info("开始执行数据获取")
         logger.info("=" * 50)
         
+        timestamp = datetime.now().isoformat()
+        start_time = time.time()
+        
+        # 三个市场互不等待，对同一上游的访问由该数据源的令牌桶统一限速
+        tasks = {
+            'cn': self.fetch_china_data,
+            'hk': self.fetch_hk_data,
+            'us': self.fetch_us_data
+        }
+        
+        if self.concurrent:
+            with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix='fetch') as executor:
+                futures = {market: executor.submit(task) for market, task in tasks.items()}
+                results = {market: future.result() for market, future in futures.items()}
+        else:
+            results = {market: task() for market, task in tasks.items()}
+        
+        logger.info(f"数据获取耗时 {time.time() - start_time:.1f} 秒 ({'并发' if self.concurrent else '串行'})")
+        get_rate_limiter().log_stats()
+        get_source_health().log_status()
+        get_cassette().log_stats()
+        
         all_data = {
-            'timestamp': datetime.now().isoformat(),
-            'cn': self.fetch_china_data(),
-            'hk': self.fetch_hk_data(),
-            'us': self.fetch_us_data()
+            'timestamp': timestamp,
+            'cn': results['cn'],
+            'hk': results['hk'],
+            'us': results['us']
         }
         
         return all_data
 
+    def _keyframe(self):
+        """上一次快照所属的关键帧和新快照的 chain_index，需要新建关键帧时关键帧为 None"""
+        try:
+            previous = get_catalog().latest('market_data')
+            return choose_keyframe(previous['path'] if previous else None)
+        except Exception as e:
+            logger.warning(f"查找关键帧失败，保存完整快照: {e}")
+            return None, 0
+
     def save_data(self, data: Dict, filename: str = None) -> str:
         try:
+            columnar = SNAPSHOT_CONFIG['format'] == 'columnar'
             if not filename:
-                filename = f"market_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+                suffix = 'snap' if columnar else 'json'
+                filename = f"market_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{suffix}"
             
             filepath = os.path.join(self.output_dir, filename)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            if columnar:
+                keyframe, chain_index = self._keyframe()
+                write_snapshot(filepath, data, compress=SNAPSHOT_CONFIG['compress'],
+                               base=keyframe, chain_index=chain_index)
+            else:
+                # 市场数据只给分析程序读取，不缩进
+                dump(data, filepath, compact=True)
             
+            register_artifact('market_data', filepath, markets=market_rows(data))
             logger.info(f"数据已保存: {filepath}")
             return filepath
         except Exception as e:
@@ -6,6 +6,8 @@ import json
 import os
 from datetime import datetime
 
+from src.storage.catalog import market_rows, register_artifact
+
 
 def generate_mock_data():
     """生成模拟的市场数据"""
@@ -107,6 +109,7 @@ def save_mock_data(data, filename=None):
     with open(filepath, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
     
+    register_artifact('market_data', filepath, markets=market_rows(data))
     print(f"模拟数据已保存: {filepath}")
     return filepath
 
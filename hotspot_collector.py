@@ -3,24 +3,24 @@
 通过网络搜索和抓取信息，分析最近的市场热点板块
 """
 
-import requests
 from bs4 import BeautifulSoup
 from typing import Dict, List
 import logging
 import re
-import time
 from datetime import datetime, timedelta
 
+from src.storage.catalog import register_artifact
+from src.utils.http_client import get_http_client
+from src.utils.rate_limiter import get_rate_limiter
+from src.utils.serialization import dump
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class MarketHotspotCollector:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        self.http = get_http_client()
         
         # 新闻源配置
         self.news_sources = {
@@ -43,7 +43,7 @@ class MarketHotspotCollector:
         logger.info(f"从 {source_name} 抓取新闻...")
         
         try:
-            response = self.session.get(url, timeout=10)
+            response = self.http.get(url, source_name, timeout=10)
             response.encoding = 'utf-8'
             soup = BeautifulSoup(response.text, 'html.parser')
             
@@ -62,7 +62,6 @@ class MarketHotspotCollector:
                 news_list = self._parse_10jqka(soup)
             
             logger.info(f"  ✓ 获取到 {len(news_list)} 条新闻")
-            time.sleep(1)  # 避免请求过快
             
             return news_list
         except Exception as e:
@@ -201,6 +200,8 @@ class MarketHotspotCollector:
             all_news.extend(news_list)
         
         logger.info(f"\n总计获取到 {len(all_news)} 条新闻")
+        get_rate_limiter().log_stats()
+        self.http.log_stats()
         return all_news
 
     def analyze_hotspots(self, news_list: List[Dict]) -> Dict:
@@ -403,7 +404,6 @@ class MarketHotspotCollector:
     def save_results(self, analysis_result: Dict, report: str):
         """保存分析结果"""
         import os
-        import json
         
         os.makedirs('data', exist_ok=True)
         
@@ -411,9 +411,9 @@ class MarketHotspotCollector:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         json_file = f"data/hotspots_{timestamp}.json"
         
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(analysis_result, f, ensure_ascii=False, indent=2)
+        dump(analysis_result, json_file)
         
+        register_artifact('hotspots', json_file, rows=len(analysis_result.get('hotspots', [])))
         logger.info(f"分析结果已保存: {json_file}")
         
         # 保存文本报告
@@ -422,6 +422,7 @@ class MarketHotspotCollector:
         with open(txt_file, 'w', encoding='utf-8') as f:
             f.write(report)
         
+        register_artifact('hotspots_report', txt_file)
         logger.info(f"分析报告已保存: {txt_file}")
 
 
@@ -2,11 +2,17 @@
 使用 MCP websearch 搜索市场热点
 """
 
-import json
 import logging
 from datetime import datetime
 from typing import List, Dict
 
+from src.data_sources.client import call_source
+from src.storage.catalog import register_artifact
+from src.storage.sector_index import SectorIndex
+from src.storage.snapshot_cache import get_snapshot_cache
+from src.utils.ranking import SPOT_RANKINGS, compute_rankings
+from src.utils.serialization import dump
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -30,6 +36,8 @@ class MarketHotspotSearcher:
             '消费', '金融', '地产', '军工', '有色',
             '通信', '汽车', '电子', '软件', '互联网'
         ]
+        
+        self.sector_index = SectorIndex()
 
     def search_hotspots(self) -> List[Dict]:
         """搜索市场热点"""
@@ -96,17 +104,21 @@ class MarketHotspotSearcher:
             logger.info("\n[3/3] 获取涨停板股票...")
             
             # 获取涨停股票
-            limit_up_df = ak.stock_zh_a_spot_em()
+            limit_up_df = get_snapshot_cache().get('cn_spot', lambda: call_source('akshare', ak.stock_zh_a_spot_em),
+                                                     copy=False)
             if not limit_up_df.empty:
                 logger.info(f"  获取到 {len(limit_up_df)} 只股票")
                 
                 # 筛选涨停股票（涨幅接近 10% 或 20%）
-                limit_up_stocks = limit_up_df[limit_up_df['涨跌幅'] > 9.5].head(20)
+                limit_up_idx = compute_rankings(limit_up_df, {'limit_up': SPOT_RANKINGS['limit_up']}, k=20)['limit_up']
+                limit_up_stocks = limit_up_df.iloc[limit_up_idx]
                 
                 # 统计行业分布
                 industry_count = {}
                 for idx, row in limit_up_stocks.iterrows():
-                    industry = row.get('行业', '未知')
+                    # 快照中没有行业列，从板块成分缓存反查所属行业
+                    industries = self.sector_index.get_stock_sectors(row.get('代码', ''), 'industry')
+                    industry = industries[0] if industries else row.get('行业', '未知')
                     if industry not in industry_count:
                         industry_count[industry] = 0
                     industry_count[industry] += 1
@@ -226,12 +238,12 @@ class MarketHotspotSearcher:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         json_file = f"data/hotspots_{timestamp}.json"
         
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'timestamp': datetime.now().isoformat(),
-                'hotspots': hotspots
-            }, f, ensure_ascii=False, indent=2)
+        dump({
+            'timestamp': datetime.now().isoformat(),
+            'hotspots': hotspots
+        }, json_file)
         
+        register_artifact('hotspots', json_file, rows=len(hotspots))
         logger.info(f"热点数据已保存: {json_file}")
         
         # 保存文本报告
@@ -240,6 +252,7 @@ class MarketHotspotSearcher:
         with open(txt_file, 'w', encoding='utf-8') as f:
             f.write(report)
         
+        register_artifact('hotspots_report', txt_file)
         logger.info(f"分析报告已保存: {txt_file}")
 
     def run(self):
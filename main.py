@@ -43,9 +43,21 @@ def main():
             analyzer = StockAnalyzer()
             analyzer.run(data_file)
     
+    elif mode == 'sectors':
+        # 板块成分缓存单独刷新（每个板块一次请求，耗时较长），数据获取流程只读取缓存
+        logger.info("运行模式: 刷新板块成分缓存")
+        from src.fetchers.china_fetcher import ChinaStockFetcher
+        refreshed = ChinaStockFetcher().refresh_sector_index()
+        logger.info(f"刷新了 {refreshed} 个板块")
+    
+    elif mode == 'archive':
+        logger.info("运行模式: 归档整理")
+        from src.storage.archive import ArchiveStore
+        ArchiveStore().compact('data')
+    
     else:
         logger.error(f"未知的运行模式: {mode}")
-        logger.info("可用模式: fetch, analyze, full")
+        logger.info("可用模式: fetch, analyze, full, sectors, archive")
         sys.exit(1)
     
     logger.info("=" * 60)
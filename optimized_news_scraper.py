@@ -7,21 +7,22 @@
 import requests
 from bs4 import BeautifulSoup
 import logging
-import time
 from datetime import datetime
 from typing import Dict, List
 from collections import Counter
 
+from src.storage.catalog import register_artifact
+from src.utils.http_client import get_http_client
+from src.utils.rate_limiter import get_rate_limiter
+from src.utils.serialization import dump
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class OptimizedNewsScraper:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        self.http = get_http_client()
         
         # 财经新闻网站列表（增加更多来源）
         self.news_sources = {
@@ -92,7 +93,7 @@ class OptimizedNewsScraper:
         logger.info(f"从 {source_name} 抓取新闻...")
         
         try:
-            response = self.session.get(source_config['url'], timeout=20)
+            response = self.http.get(source_config['url'], source_name, timeout=20)
             response.encoding = 'utf-8'
             
             if response.status_code != 200:
@@ -163,7 +164,6 @@ class OptimizedNewsScraper:
                     break  # 找到新闻就停止尝试其他选择器
             
             logger.info(f"  ✓ 获取到 {len(news_list)} 条新闻")
-            time.sleep(0.5)  # 避免请求过快
             
             return news_list
         
@@ -208,6 +208,8 @@ class OptimizedNewsScraper:
                 unique_news.append(news)
         
         logger.info(f"总计获取到 {len(unique_news)} 条新闻（去重后）")
+        get_rate_limiter().log_stats()
+        self.http.log_stats()
         
         return unique_news
 
@@ -365,7 +367,6 @@ class OptimizedNewsScraper:
     def save_results(self, hotspots: List[Dict], news_list: List[Dict], report: str):
         """保存结果"""
         import os
-        import json
         
         os.makedirs('data', exist_ok=True)
         
@@ -373,26 +374,26 @@ class OptimizedNewsScraper:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         news_file = f"data/news_{timestamp}.json"
         
-        with open(news_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'timestamp': datetime.now().isoformat(),
-                'news_count': len(news_list),
-                'sources': list(self.news_sources.keys()),
-                'news': news_list
-            }, f, ensure_ascii=False, indent=2)
+        dump({
+            'timestamp': datetime.now().isoformat(),
+            'news_count': len(news_list),
+            'sources': list(self.news_sources.keys()),
+            'news': news_list
+        }, news_file)
         
+        register_artifact('news', news_file, rows=len(news_list))
         logger.info(f"新闻数据已保存: {news_file}")
         
         # 保存热点数据
         hotspots_file = f"data/hotspots_{timestamp}.json"
         
-        with open(hotspots_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'timestamp': datetime.now().isoformat(),
-                'hotspots_count': len(hotspots),
-                'hotspots': hotspots
-            }, f, ensure_ascii=False, indent=2)
+        dump({
+            'timestamp': datetime.now().isoformat(),
+            'hotspots_count': len(hotspots),
+            'hotspots': hotspots
+        }, hotspots_file)
         
+        register_artifact('hotspots', hotspots_file, rows=len(hotspots))
         logger.info(f"热点数据已保存: {hotspots_file}")
         
         # 保存报告
@@ -401,6 +402,7 @@ class OptimizedNewsScraper:
         with open(report_file, 'w', encoding='utf-8') as f:
             f.write(report)
         
+        register_artifact('hotspots_report', report_file)
         logger.info(f"分析报告已保存: {report_file}")
         
         return {
@@ -2,104 +2,122 @@ import pandas as pd
 import numpy as np
 import logging
 from typing import Dict, List
-import talib
 from scipy import stats
 
+from src.analyzers.indicator_graph import IndicatorGraph
+from src.analyzers.ta_backends import get_backend
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class AdvancedTechnicalAnalyzer:
-    def __init__(self):
+    def __init__(self, backend: str = None):
+        # 指标计算后端，默认按 ANALYSIS_CONFIG['ta_backend'] 选择
+        self.backend = get_backend(backend)
         self.short_ma = [5, 10]
         self.mid_ma = [20, 40]
         self.long_ma = [60, 120]
 
-    def calculate_moving_averages(self, df: pd.DataFrame) -> pd.DataFrame:
-        df['MA5'] = df['Close'].rolling(window=5).mean()
-        df['MA10'] = df['Close'].rolling(window=10).mean()
-        df['MA20'] = df['Close'].rolling(window=20).mean()
-        df['MA40'] = df['Close'].rolling(window=40).mean()
-        df['MA60'] = df['Close'].rolling(window=60).mean()
-        df['MA120'] = df['Close'].rolling(window=120).mean()
-        
-        df['EMA12'] = df['Close'].ewm(span=12, adjust=False).mean()
-        df['EMA26'] = df['Close'].ewm(span=26, adjust=False).mean()
+    def calculate_moving_averages(self, df: pd.DataFrame, graph: IndicatorGraph = None) -> pd.DataFrame:
+        graph = graph or IndicatorGraph(df, backend=self.backend)
+        df['MA5'] = graph.rolling('Close', 5)
+        df['MA10'] = graph.rolling('Close', 10)
+        df['MA20'] = graph.rolling('Close', 20)
+        df['MA40'] = graph.rolling('Close', 40)
+        df['MA60'] = graph.rolling('Close', 60)
+        df['MA120'] = graph.rolling('Close', 120)
+        
+        df['EMA12'] = graph.ewm('Close', 12)
+        df['EMA26'] = graph.ewm('Close', 26)
         
         return df
 
-    def calculate_rsi(self, df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
+    def calculate_rsi(self, df: pd.DataFrame, period: int = 14, graph: IndicatorGraph = None) -> pd.DataFrame:
+        graph = graph or IndicatorGraph(df, backend=self.backend)
+        delta = graph.diff('Close')
+        graph.define('gain', lambda: delta.where(delta > 0, 0))
+        graph.define('loss', lambda: -delta.where(delta < 0, 0))
+        rs = graph.rolling('gain', period) / graph.rolling('loss', period)
         df['RSI'] = 100 - (100 / (1 + rs))
         return df
 
-    def calculate_stochastic(self, df: pd.DataFrame, k_period: int = 14, d_period: int = 3) -> pd.DataFrame:
-        low_min = df['Low'].rolling(window=k_period).min()
-        high_max = df['High'].rolling(window=k_period).max()
-        
-        df['%K'] = 100 * ((df['Close'] - low_min) / (high_max - low_min))
-        df['%D'] = df['%K'].rolling(window=d_period).mean()
+    def calculate_stochastic(self, df: pd.DataFrame, k_period: int = 14, d_period: int = 3,
+                             graph: IndicatorGraph = None) -> pd.DataFrame:
+        graph = graph or IndicatorGraph(df, backend=self.backend)
+        low_min = graph.rolling('Low', k_period, 'min')
+        high_max = graph.rolling('High', k_period, 'max')
+        
+        df['%K'] = graph.define(('%K', k_period), lambda: 100 * ((df['Close'] - low_min) / (high_max - low_min)))
+        df['%D'] = graph.rolling(('%K', k_period), d_period)
         return df
 
-    def calculate_macd(self, df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> pd.DataFrame:
-        exp1 = df['Close'].ewm(span=fast, adjust=False).mean()
-        exp2 = df['Close'].ewm(span=slow, adjust=False).mean()
-        df['MACD'] = exp1 - exp2
-        df['MACD_SIGNAL'] = df['MACD'].ewm(span=signal, adjust=False).mean()
+    def calculate_macd(self, df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9,
+                       graph: IndicatorGraph = None) -> pd.DataFrame:
+        graph = graph or IndicatorGraph(df, backend=self.backend)
+        exp1 = graph.ewm('Close', fast)
+        exp2 = graph.ewm('Close', slow)
+        df['MACD'] = graph.define(('MACD', fast, slow), lambda: exp1 - exp2)
+        df['MACD_SIGNAL'] = graph.ewm(('MACD', fast, slow), signal)
         df['MACD_HIST'] = df['MACD'] - df['MACD_SIGNAL']
         return df
 
-    def calculate_bollinger_bands(self, df: pd.DataFrame, period: int = 20, std_dev: int = 2) -> pd.DataFrame:
-        df['BB_MIDDLE'] = df['Close'].rolling(window=period).mean()
-        df['BB_UPPER'] = df['BB_MIDDLE'] + (df['Close'].rolling(window=period).std() * std_dev)
-        df['BB_LOWER'] = df['BB_MIDDLE'] - (df['Close'].rolling(window=period).std() * std_dev)
+    def calculate_bollinger_bands(self, df: pd.DataFrame, period: int = 20, std_dev: int = 2,
+                                  graph: IndicatorGraph = None) -> pd.DataFrame:
+        graph = graph or IndicatorGraph(df, backend=self.backend)
+        df['BB_MIDDLE'] = graph.rolling('Close', period)
+        df['BB_UPPER'] = df['BB_MIDDLE'] + (graph.rolling('Close', period, 'std') * std_dev)
+        df['BB_LOWER'] = df['BB_MIDDLE'] - (graph.rolling('Close', period, 'std') * std_dev)
         df['BB_WIDTH'] = (df['BB_UPPER'] - df['BB_LOWER']) / df['BB_MIDDLE']
         df['BB_PERCENT'] = (df['Close'] - df['BB_LOWER']) / (df['BB_UPPER'] - df['BB_LOWER'])
         return df
 
-    def calculate_atr(self, df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+    def calculate_atr(self, df: pd.DataFrame, period: int = 14, graph: IndicatorGraph = None) -> pd.DataFrame:
+        graph = graph or IndicatorGraph(df, backend=self.backend)
         high = df['High']
         low = df['Low']
-        close = df['Close']
+        prev_close = graph.shift('Close', 1)
         
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
+        def true_range():
+            tr1 = high - low
+            tr2 = abs(high - prev_close)
+            tr3 = abs(low - prev_close)
+            return pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
         
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        df['ATR'] = tr.rolling(window=period).mean()
+        graph.define('TR', true_range)
+        df['ATR'] = graph.rolling('TR', period)
         return df
 
-    def calculate_cci(self, df: pd.DataFrame, period: int = 20) -> pd.DataFrame:
-        tp = (df['High'] + df['Low'] + df['Close']) / 3
-        sma_tp = tp.rolling(window=period).mean()
-        mad = tp.rolling(window=period).apply(lambda x: np.abs(x - x.mean()).mean())
+    def calculate_cci(self, df: pd.DataFrame, period: int = 20, graph: IndicatorGraph = None) -> pd.DataFrame:
+        graph = graph or IndicatorGraph(df, backend=self.backend)
+        tp = graph.define('TP', lambda: (df['High'] + df['Low'] + df['Close']) / 3)
+        sma_tp = graph.rolling('TP', period)
+        mad = graph.rolling('TP', period, 'mad')
         df['CCI'] = (tp - sma_tp) / (0.015 * mad)
         return df
 
-    def calculate_williams_r(self, df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
-        high_max = df['High'].rolling(window=period).max()
-        low_min = df['Low'].rolling(window=period).min()
+    def calculate_williams_r(self, df: pd.DataFrame, period: int = 14, graph: IndicatorGraph = None) -> pd.DataFrame:
+        graph = graph or IndicatorGraph(df, backend=self.backend)
+        high_max = graph.rolling('High', period, 'max')
+        low_min = graph.rolling('Low', period, 'min')
         df['Williams_R'] = -100 * ((high_max - df['Close']) / (high_max - low_min))
         return df
 
-    def calculate_volume_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        df['OBV'] = (np.sign(df['Close'].diff()) * df['Volume']).fillna(0).cumsum()
-        df['Volume_MA20'] = df['Volume'].rolling(window=20).mean()
+    def calculate_volume_indicators(self, df: pd.DataFrame, graph: IndicatorGraph = None) -> pd.DataFrame:
+        graph = graph or IndicatorGraph(df, backend=self.backend)
+        df['OBV'] = (np.sign(graph.diff('Close')) * df['Volume']).fillna(0).cumsum()
+        df['Volume_MA20'] = graph.rolling('Volume', 20)
         df['Volume_Ratio'] = df['Volume'] / df['Volume_MA20']
         
-        price_change = df['Close'].pct_change()
-        volume_change = df['Volume'].pct_change()
-        df['VWAP'] = (df['Close'] * df['Volume']).rolling(window=20).sum() / df['Volume'].rolling(window=20).sum()
+        graph.define('CV', lambda: df['Close'] * df['Volume'])
+        df['VWAP'] = graph.rolling('CV', 20, 'sum') / graph.rolling('Volume', 20, 'sum')
         
         return df
 
-    def calculate_momentum(self, df: pd.DataFrame, period: int = 10) -> pd.DataFrame:
-        df['Momentum'] = df['Close'] - df['Close'].shift(period)
-        df['ROC'] = ((df['Close'] - df['Close'].shift(period)) / df['Close'].shift(period)) * 100
+    def calculate_momentum(self, df: pd.DataFrame, period: int = 10, graph: IndicatorGraph = None) -> pd.DataFrame:
+        graph = graph or IndicatorGraph(df, backend=self.backend)
+        df['Momentum'] = df['Close'] - graph.shift('Close', period)
+        df['ROC'] = ((df['Close'] - graph.shift('Close', period)) / graph.shift('Close', period)) * 100
         return df
 
     def calculate_fibonacci_retracement(self, df: pd.DataFrame, lookback: int = 100) -> Dict:
@@ -120,9 +138,10 @@ class AdvancedTechnicalAnalyzer:
         
         return fib_levels
 
-    def detect_support_resistance(self, df: pd.DataFrame, window: int = 20) -> Dict:
-        df['Local_Max'] = df['High'].rolling(window=window, center=True).max()
-        df['Local_Min'] = df['Low'].rolling(window=window, center=True).min()
+    def detect_support_resistance(self, df: pd.DataFrame, window: int = 20, graph: IndicatorGraph = None) -> Dict:
+        graph = graph or IndicatorGraph(df, backend=self.backend)
+        df['Local_Max'] = graph.rolling('High', window, 'max', center=True)
+        df['Local_Min'] = graph.rolling('Low', window, 'min', center=True)
         
         resistance_levels = df[df['High'] == df['Local_Max']]['High'].tail(5).tolist()
         support_levels = df[df['Low'] == df['Local_Min']]['Low'].tail(5).tolist()
@@ -365,24 +384,29 @@ class AdvancedTechnicalAnalyzer:
         if df.empty or len(df) < 120:
             return {}
         
-        df = self.calculate_moving_averages(df)
-        df = self.calculate_rsi(df)
-        df = self.calculate_stochastic(df)
-        df = self.calculate_macd(df)
-        df = self.calculate_bollinger_bands(df)
-        df = self.calculate_atr(df)
-        df = self.calculate_cci(df)
-        df = self.calculate_williams_r(df)
-        df = self.calculate_volume_indicators(df)
-        df = self.calculate_momentum(df)
-        
+        # 各指标共用一个计算图，相同的滚动统计、EWM、位移只算一次
+        graph = IndicatorGraph(df, backend=self.backend)
+        df = self.calculate_moving_averages(df, graph)
+        df = self.calculate_rsi(df, graph=graph)
+        df = self.calculate_stochastic(df, graph=graph)
+        df = self.calculate_macd(df, graph=graph)
+        df = self.calculate_bollinger_bands(df, graph=graph)
+        df = self.calculate_atr(df, graph=graph)
+        df = self.calculate_cci(df, graph=graph)
+        df = self.calculate_williams_r(df, graph=graph)
+        df = self.calculate_volume_indicators(df, graph=graph)
+        df = self.calculate_momentum(df, graph=graph)
+        
+        return self.score_indicators(df, self.detect_support_resistance(df, graph=graph))
+
+    def score_indicators(self, df: pd.DataFrame, sr_levels: Dict) -> Dict:
+        """由已算好指标列的K线（至少最近 100 行）和支撑/阻力位生成综合信号"""
         trend_analysis = self.analyze_trend(df)
         momentum_analysis = self.analyze_momentum(df)
         volume_analysis = self.analyze_volume(df)
         volatility_analysis = self.analyze_volatility(df)
         
         fib_levels = self.calculate_fibonacci_retracement(df)
-        sr_levels = self.detect_support_resistance(df)
         
         total_score = (
             trend_analysis['score'] +
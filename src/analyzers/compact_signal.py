@@ -0,0 +1,73 @@
+"""
+紧凑模式综合信号
+
+generate_comprehensive_signal 会往传入的K线上加约 30 个完整长度的指标列，调用方（抓取器、价格面板）的 DataFrame
+被修改，这些列也一直占着内存，而评分只读取最后一根和最近 100 根以内的窗口。
+CompactSignalEngine 把指标和中间结果算进预先分配、逐只股票复用的数组，不修改传入的K线，
+只返回最后一根K线的指标向量（FEATURE_COLUMNS 顺序）和信号字典，信号与 generate_comprehensive_signal 一致。
+数组按见过的最长K线分配；引擎不是线程安全的，每个线程/进程各用一个
+"""
+
+import logging
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.analyzers.advanced_technical_analyzer import AdvancedTechnicalAnalyzer
+from src.analyzers.panel_indicators import (FIELDS, INDICATOR_COLUMNS, MIN_BARS, SCRATCH_COLUMNS, TAIL_ROWS,
+                                            compute_indicators, support_resistance)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FEATURE_COLUMNS = FIELDS + INDICATOR_COLUMNS
+
+SR_LEVELS = 5
+
+
+class CompactSignalEngine:
+    def __init__(self, analyzer: AdvancedTechnicalAnalyzer = None, sr_window: int = 20):
+        self.analyzer = analyzer or AdvancedTechnicalAnalyzer()
+        self.sr_window = sr_window
+        self.capacity = 0
+        self.scratch: Dict[str, np.ndarray] = {}
+
+    def _buffers(self, n: int) -> Dict[str, np.ndarray]:
+        """长度为 n 的工作数组（复用已分配的数组，不够长时重新分配）"""
+        if n > self.capacity:
+            self.scratch = {name: np.empty(n) for name in SCRATCH_COLUMNS + ['Local_Max', 'Local_Min']}
+            self.capacity = n
+        return {name: buffer[:n] for name, buffer in self.scratch.items()}
+
+    def empty_features(self) -> np.ndarray:
+        return np.full(len(FEATURE_COLUMNS), np.nan)
+
+    def generate(self, df: pd.DataFrame) -> Tuple[np.ndarray, Dict]:
+        """
+        返回 (最后一根K线的指标向量, 信号字典)；K线不足 MIN_BARS 根或计算失败时信号为 {}
+        """
+        if df is None or df.empty or len(df) < MIN_BARS:
+            return self.empty_features(), {}
+
+        try:
+            out = self._buffers(len(df))
+            arrays = {field: df[field].to_numpy(dtype='float64') for field in FIELDS}
+            backend = self.analyzer.backend
+            indicators = compute_indicators(arrays, out, backend)
+
+            high, low = arrays['High'], arrays['Low']
+            local_max = backend.rolling(high, self.sr_window, 'max', center=True, out=out['Local_Max'])
+            local_min = backend.rolling(low, self.sr_window, 'min', center=True, out=out['Local_Min'])
+            sr_levels = support_resistance(high[high == local_max][-SR_LEVELS:].tolist(),
+                                           low[low == local_min][-SR_LEVELS:].tolist(),
+                                           arrays['Close'][-1])
+
+            # 评分只需要最近 TAIL_ROWS 行，DataFrame 复制这一小段，不引用工作数组
+            tail = pd.DataFrame({column: indicators[column][-TAIL_ROWS:] for column in FEATURE_COLUMNS},
+                                columns=FEATURE_COLUMNS)
+            features = np.array([indicators[column][-1] for column in FEATURE_COLUMNS])
+            return features, self.analyzer.score_indicators(tail, sr_levels)
+        except Exception as e:
+            logger.error(f"紧凑模式指标计算失败: {e}")
+            return self.empty_features(), {}
@@ -0,0 +1,79 @@
+"""
+指标计算图
+
+技术指标都由少数几种基础运算组合而成：滚动统计（均值、和、标准差、最大、最小、平均绝对偏差）、
+EWM、位移、差分。IndicatorGraph 按 (运算, 输入, 参数) 缓存这些运算的结果，
+同一份K线上 MA20 与布林中轨、随机指标与威廉指标的 14 日高低点、RSI 与 OBV 的差分等只计算一次。
+中间序列（TP、真实波幅等）用 define 登记后可以作为其他运算的输入。
+滚动统计和 EWM 由 ta_backends 中的后端（pandas / numpy / talib）计算
+"""
+
+import logging
+from typing import Callable, Dict, Hashable
+
+import pandas as pd
+
+from src.analyzers.ta_backends import PandasBackend, get_backend
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class IndicatorGraph:
+    def __init__(self, df: pd.DataFrame, memoize: bool = True, backend: PandasBackend = None):
+        self.df = df
+        self.memoize = memoize
+        self.backend = backend or get_backend()
+        self._cache: Dict[Hashable, pd.Series] = {}
+        self._defined: Dict[Hashable, pd.Series] = {}
+        # passes 为实际执行的基础运算次数，hits 为命中缓存的次数
+        self.passes = 0
+        self.hits = 0
+
+    def _node(self, key: Hashable, func: Callable[[], pd.Series]) -> pd.Series:
+        if self.memoize and key in self._cache:
+            self.hits += 1
+            return self._cache[key]
+        self.passes += 1
+        value = func()
+        self._cache[key] = value
+        return value
+
+    def source(self, name: Hashable) -> pd.Series:
+        """define 登记的中间序列，否则为K线中的列"""
+        if name in self._defined:
+            return self._defined[name]
+        return self.df[name]
+
+    def define(self, name: Hashable, func: Callable[[], pd.Series]) -> pd.Series:
+        """登记一个中间序列，之后可以用 name 作为 rolling/ewm/shift 的输入"""
+        if self.memoize and name in self._defined:
+            self.hits += 1
+            return self._defined[name]
+        self.passes += 1
+        value = func()
+        self._defined[name] = value
+        return value
+
+    def rolling(self, name: Hashable, window: int, stat: str = 'mean', center: bool = False) -> pd.Series:
+        """stat 为 mean / sum / std / max / min / mad"""
+        def compute():
+            series = self.source(name)
+            values = self.backend.rolling(series.to_numpy(dtype='float64'), window, stat, center)
+            return pd.Series(values, index=series.index)
+        return self._node(('rolling', name, window, stat, center), compute)
+
+    def ewm(self, name: Hashable, span: int) -> pd.Series:
+        def compute():
+            series = self.source(name)
+            return pd.Series(self.backend.ewm(series.to_numpy(dtype='float64'), span), index=series.index)
+        return self._node(('ewm', name, span), compute)
+
+    def shift(self, name: Hashable, periods: int = 1) -> pd.Series:
+        return self._node(('shift', name, periods), lambda: self.source(name).shift(periods))
+
+    def diff(self, name: Hashable) -> pd.Series:
+        return self._node(('diff', name), lambda: self.source(name) - self.shift(name, 1))
+
+    def stats(self) -> Dict[str, int]:
+        return {'passes': self.passes, 'hits': self.hits, 'cached': len(self._cache) + len(self._defined)}
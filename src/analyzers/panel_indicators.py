@@ -0,0 +1,210 @@
+"""
+多股票面板技术指标
+
+把 N 只股票的K线按最后一根对齐（右对齐，历史较短的股票前面补 NaN）排成 交易日 × 股票 的二维数组，
+每个指标对全部股票一次算完，结果与 AdvancedTechnicalAnalyzer 逐只计算的一致。
+滚动窗口统计和 EMA 由 ta_backends 中的后端计算（与 AdvancedTechnicalAnalyzer.backend 相同）；
+评分仍交给 AdvancedTechnicalAnalyzer 的 analyze_* 方法，输出的信号字典格式不变
+"""
+
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.analyzers.advanced_technical_analyzer import AdvancedTechnicalAnalyzer
+from src.analyzers.rolling_kernels import shift
+from src.analyzers.ta_backends import PandasBackend, get_backend
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# generate_comprehensive_signal 要求的最少K线数
+MIN_BARS = 120
+# 评分用到的最长尾部：斐波那契回撤取最近 100 根
+TAIL_ROWS = 100
+
+INDICATOR_COLUMNS = ['MA5', 'MA10', 'MA20', 'MA40', 'MA60', 'MA120', 'EMA12', 'EMA26', 'RSI', '%K', '%D',
+                     'Williams_R', 'MACD', 'MACD_SIGNAL', 'MACD_HIST', 'BB_MIDDLE', 'BB_UPPER', 'BB_LOWER',
+                     'BB_WIDTH', 'BB_PERCENT', 'ATR', 'CCI', 'OBV', 'Volume_MA20', 'Volume_Ratio', 'VWAP',
+                     'Momentum', 'ROC']
+# compute_indicators 的中间结果
+INTERMEDIATE_COLUMNS = ['prev_close', 'delta', 'gain', 'loss', 'gain_mean', 'loss_mean', 'rs', 'low_min', 'high_max',
+                        'hl_range', 'std', 'bb_range', 'tr', 'tr_gap', 'tp', 'tp_mean', 'tp_mad', 'obv', 'cv',
+                        'cv_sum', 'volume_sum', 'close_10']
+# compute_indicators 的 out 需要的数组；BB_MIDDLE 与 MA20 是同一个数组
+SCRATCH_COLUMNS = [column for column in INDICATOR_COLUMNS if column != 'BB_MIDDLE'] + INTERMEDIATE_COLUMNS
+
+
+def stack_frames(frames: Dict[str, pd.DataFrame]) -> Tuple[List[str], Dict[str, np.ndarray], np.ndarray]:
+    """
+    把 {代码: K线} 排成右对齐的 交易日 × 股票 数组
+
+    返回 (代码列表, {字段: 数组}, 每只股票的K线数)
+    """
+    symbols = list(frames)
+    lengths = np.array([len(frames[symbol]) for symbol in symbols], dtype=int)
+    days = int(lengths.max()) if len(lengths) else 0
+
+    arrays = {field: np.full((days, len(symbols)), np.nan) for field in FIELDS}
+    for j, symbol in enumerate(symbols):
+        df = frames[symbol]
+        n = len(df)
+        if n == 0:
+            continue
+        for field in FIELDS:
+            arrays[field][days - n:, j] = df[field].to_numpy(dtype='float64')
+    return symbols, arrays, lengths
+
+
+def compute_indicators(arrays: Dict[str, np.ndarray], out: Dict[str, np.ndarray] = None,
+                       backend: PandasBackend = None) -> Dict[str, np.ndarray]:
+    """
+    对 交易日 × 股票 的 OHLCV 数组计算全部指标，列名与 AdvancedTechnicalAnalyzer 相同
+
+    out 为 {名称: 数组}，包含 SCRATCH_COLUMNS 中的全部名称、形状与输入相同；给出时指标和中间结果都直接写入这些数组，
+    不再分配新的数组，可以在多只股票之间复用。输入数组不会被修改。
+    滚动统计和 EMA 由 backend 计算，默认按 ANALYSIS_CONFIG['ta_backend'] 选择
+    """
+    backend = backend or get_backend()
+    high, low, close, volume = arrays['High'], arrays['Low'], arrays['Close'], arrays['Volume']
+    padding = np.isnan(close)
+    result = dict(arrays)
+
+    def buffer(name: str) -> np.ndarray:
+        return np.empty(close.shape) if out is None else out[name]
+
+    # 多步运算都用 ufunc 的 out 参数原地写入同一个数组，运算顺序与逐只计算的写法相同，结果逐位一致
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for window in (5, 10, 20, 40, 60, 120):
+            result[f'MA{window}'] = backend.rolling(close, window, 'mean', out=buffer(f'MA{window}'))
+        result['EMA12'] = backend.ewm(close, 12, out=buffer('EMA12'))
+        result['EMA26'] = backend.ewm(close, 26, out=buffer('EMA26'))
+
+        # RSI：第一根K线的涨跌按 0 计入窗口，补齐的空位保持 NaN
+        prev_close = shift(close, 1, out=buffer('prev_close'))
+        delta = np.subtract(close, prev_close, out=buffer('delta'))
+        gain = buffer('gain')
+        gain.fill(0.0)
+        np.copyto(gain, delta, where=delta > 0)
+        loss = buffer('loss')
+        loss.fill(0.0)
+        np.negative(delta, out=loss, where=delta < 0)
+        gain[padding] = np.nan
+        loss[padding] = np.nan
+        rs = np.divide(backend.rolling(gain, 14, 'mean', out=buffer('gain_mean')),
+                       backend.rolling(loss, 14, 'mean', out=buffer('loss_mean')), out=buffer('rs'))
+        rsi = np.add(rs, 1, out=buffer('RSI'))
+        np.divide(100, rsi, out=rsi)
+        result['RSI'] = np.subtract(100, rsi, out=rsi)
+
+        low_min = backend.rolling(low, 14, 'min', out=buffer('low_min'))
+        high_max = backend.rolling(high, 14, 'max', out=buffer('high_max'))
+        hl_range = np.subtract(high_max, low_min, out=buffer('hl_range'))
+        k = np.subtract(close, low_min, out=buffer('%K'))
+        np.divide(k, hl_range, out=k)
+        result['%K'] = np.multiply(k, 100, out=k)
+        result['%D'] = backend.rolling(k, 3, 'mean', out=buffer('%D'))
+        williams = np.subtract(high_max, close, out=buffer('Williams_R'))
+        np.divide(williams, hl_range, out=williams)
+        result['Williams_R'] = np.multiply(williams, -100, out=williams)
+
+        result['MACD'] = np.subtract(result['EMA12'], result['EMA26'], out=buffer('MACD'))
+        result['MACD_SIGNAL'] = backend.ewm(result['MACD'], 9, out=buffer('MACD_SIGNAL'))
+        result['MACD_HIST'] = np.subtract(result['MACD'], result['MACD_SIGNAL'], out=buffer('MACD_HIST'))
+
+        std = backend.rolling(close, 20, 'std', out=buffer('std'))
+        middle = result['BB_MIDDLE'] = result['MA20']
+        upper = np.multiply(std, 2, out=buffer('BB_UPPER'))
+        result['BB_UPPER'] = np.add(middle, upper, out=upper)
+        lower = np.multiply(std, 2, out=buffer('BB_LOWER'))
+        result['BB_LOWER'] = np.subtract(middle, lower, out=lower)
+        bb_range = np.subtract(upper, lower, out=buffer('bb_range'))
+        result['BB_WIDTH'] = np.divide(bb_range, middle, out=buffer('BB_WIDTH'))
+        percent = np.subtract(close, lower, out=buffer('BB_PERCENT'))
+        result['BB_PERCENT'] = np.divide(percent, bb_range, out=percent)
+
+        tr = np.subtract(high, low, out=buffer('tr'))
+        gap = np.subtract(high, prev_close, out=buffer('tr_gap'))
+        np.fmax(tr, np.abs(gap, out=gap), out=tr)
+        np.subtract(low, prev_close, out=gap)
+        np.fmax(tr, np.abs(gap, out=gap), out=tr)
+        result['ATR'] = backend.rolling(tr, 14, 'mean', out=buffer('ATR'))
+
+        tp = np.add(high, low, out=buffer('tp'))
+        np.add(tp, close, out=tp)
+        np.divide(tp, 3, out=tp)
+        cci = np.subtract(tp, backend.rolling(tp, 20, 'mean', out=buffer('tp_mean')), out=buffer('CCI'))
+        mad = backend.rolling(tp, 20, 'mad', out=buffer('tp_mad'))
+        result['CCI'] = np.divide(cci, np.multiply(mad, 0.015, out=mad), out=cci)
+
+        obv = np.sign(delta, out=buffer('obv'))
+        np.multiply(obv, volume, out=obv)
+        obv[np.isnan(obv)] = 0.0
+        result['OBV'] = np.cumsum(obv, axis=0, out=buffer('OBV'))
+        result['Volume_MA20'] = backend.rolling(volume, 20, 'mean', out=buffer('Volume_MA20'))
+        result['Volume_Ratio'] = np.divide(volume, result['Volume_MA20'], out=buffer('Volume_Ratio'))
+        cv = np.multiply(close, volume, out=buffer('cv'))
+        result['VWAP'] = np.divide(backend.rolling(cv, 20, 'sum', out=buffer('cv_sum')),
+                                   backend.rolling(volume, 20, 'sum', out=buffer('volume_sum')), out=buffer('VWAP'))
+
+        close_10 = shift(close, 10, out=buffer('close_10'))
+        result['Momentum'] = np.subtract(close, close_10, out=buffer('Momentum'))
+        roc = np.divide(result['Momentum'], close_10, out=buffer('ROC'))
+        result['ROC'] = np.multiply(roc, 100, out=roc)
+    return result
+
+
+def support_resistance(resistance_levels: List[float], support_levels: List[float], current_price) -> Dict:
+    """由最近的局部高点/低点（按时间顺序，最多 5 个）生成与 detect_support_resistance 相同的输出"""
+    return {
+        'resistance': sorted(resistance_levels, reverse=True),
+        'support': sorted(support_levels),
+        'current_price': current_price,
+        'nearest_resistance': min([r for r in resistance_levels if r > current_price], default=None),
+        'nearest_support': max([s for s in support_levels if s < current_price], default=None)
+    }
+
+
+class PanelIndicatorEngine:
+    def __init__(self, analyzer: AdvancedTechnicalAnalyzer = None, sr_window: int = 20):
+        self.analyzer = analyzer or AdvancedTechnicalAnalyzer()
+        self.sr_window = sr_window
+
+    def generate_signals(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """对一组股票的K线批量生成综合信号，结果与逐只调用 generate_comprehensive_signal 相同"""
+        frames = {symbol: df for symbol, df in frames.items() if df is not None and not df.empty}
+        if not frames:
+            return {}
+
+        symbols, arrays, lengths = stack_frames(frames)
+        backend = self.analyzer.backend
+        indicators = compute_indicators(arrays, backend=backend)
+        local_max = backend.rolling(arrays['High'], self.sr_window, 'max', center=True)
+        local_min = backend.rolling(arrays['Low'], self.sr_window, 'min', center=True)
+        columns = list(indicators)
+        days = len(arrays['Close'])
+
+        signals = {}
+        for j, symbol in enumerate(symbols):
+            if lengths[j] < MIN_BARS:
+                signals[symbol] = {}
+                continue
+            try:
+                start = days - lengths[j]
+                tail = pd.DataFrame({column: indicators[column][-TAIL_ROWS:, j] for column in columns},
+                                    columns=columns)
+                high, low = arrays['High'][start:, j], arrays['Low'][start:, j]
+                sr_levels = support_resistance(high[high == local_max[start:, j]][-5:].tolist(),
+                                               low[low == local_min[start:, j]][-5:].tolist(),
+                                               arrays['Close'][-1, j])
+                signals[symbol] = self.analyzer.score_indicators(tail, sr_levels)
+            except Exception as e:
+                logger.error(f"面板指标评分失败 {symbol}: {e}")
+                signals[symbol] = {}
+
+        logger.info(f"面板指标计算完成: {len(symbols)} 只股票, {days} 个交易日")
+        return signals
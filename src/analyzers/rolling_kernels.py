@@ -0,0 +1,178 @@
+"""
+滚动窗口计算内核
+
+rolling_mad 计算滚动平均绝对偏差 mean(|x - mean(x)|)（CCI 的分母），
+替代 rolling(n).apply(lambda ...) 对每根K线调用一次 Python 函数的写法。
+一维（单只股票）和二维（交易日 × 股票 面板）输入都支持；安装了 numba 时用编译后的循环，
+否则用 sliding_window_view 向量化计算（按行分块，限制临时数组大小）。
+窗口不满或含 NaN 时结果为 NaN，与 pandas 默认的 min_periods 一致。
+
+另外提供面板指标、流式指标和 numpy 指标后端共用的滚动均值/和/标准差/最大/最小、EMA、位移
+"""
+
+import logging
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 向量化实现每块处理的窗口数 × 列数上限，临时数组约为 块大小 × 窗口 × 8 字节
+BLOCK_CELLS = 1 << 16
+
+
+def _rolling_mad_numpy(x: np.ndarray, window: int, out: np.ndarray = None) -> np.ndarray:
+    out = np.empty(x.shape) if out is None else out
+    out[:window - 1] = np.nan
+    n = len(x)
+    if n < window:
+        return out
+
+    windows = sliding_window_view(x, window, axis=0)
+    columns = x.shape[1] if x.ndim == 2 else 1
+    step = max(1, BLOCK_CELLS // columns)
+    for start in range(0, len(windows), step):
+        block = windows[start:start + step]
+        mean = block.mean(axis=-1, keepdims=True)
+        out[window - 1 + start:window - 1 + start + len(block)] = np.abs(block - mean).mean(axis=-1)
+    return out
+
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _rolling_mad_numba(x, window):
+        n, m = x.shape
+        out = np.full((n, m), np.nan)
+        for j in range(m):
+            for t in range(window - 1, n):
+                total = 0.0
+                valid = True
+                for k in range(t - window + 1, t + 1):
+                    value = x[k, j]
+                    if np.isnan(value):
+                        valid = False
+                        break
+                    total += value
+                if not valid:
+                    continue
+                mean = total / window
+                deviation = 0.0
+                for k in range(t - window + 1, t + 1):
+                    deviation += abs(x[k, j] - mean)
+                out[t, j] = deviation / window
+        return out
+else:
+    _rolling_mad_numba = None
+
+
+def rolling_mad(x, window: int, backend: str = None, out: np.ndarray = None) -> np.ndarray:
+    """
+    滚动平均绝对偏差
+
+    x 为一维数组或 交易日 × 股票 的二维数组；backend 为 'numba' / 'numpy'，默认有 numba 时用 numba；
+    out 为预先分配的结果数组
+    """
+    x = np.asarray(x, dtype='float64')
+    backend = backend or ('numba' if _rolling_mad_numba is not None else 'numpy')
+
+    if backend == 'numba':
+        if _rolling_mad_numba is None:
+            raise RuntimeError("未安装 numba")
+        values = x.reshape(len(x), -1)
+        result = _rolling_mad_numba(np.ascontiguousarray(values), window).reshape(x.shape)
+        if out is None:
+            return result
+        np.copyto(out, result)
+        return out
+    return _rolling_mad_numpy(x, window, out)
+
+
+def _empty(x: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    return np.empty(x.shape) if out is None else out
+
+
+def _rolling(x: np.ndarray, window: int, func, out: np.ndarray = None) -> np.ndarray:
+    """
+    沿交易日方向的滚动窗口统计，窗口不满或含 NaN 时为 NaN（与 pandas 默认 min_periods 一致）
+
+    out 为预先分配、与 x 形状相同的结果数组，给出时结果直接写入，下同
+    """
+    out = _empty(x, out)
+    if len(x) < window:
+        out[:] = np.nan
+        return out
+    out[:window - 1] = np.nan
+    func(sliding_window_view(x, window, axis=0), out[window - 1:])
+    return out
+
+
+def rolling_mean(x: np.ndarray, window: int, out: np.ndarray = None) -> np.ndarray:
+    return _rolling(x, window, lambda w, o: w.mean(axis=-1, out=o), out)
+
+
+def rolling_sum(x: np.ndarray, window: int, out: np.ndarray = None) -> np.ndarray:
+    return _rolling(x, window, lambda w, o: w.sum(axis=-1, out=o), out)
+
+
+def rolling_std(x: np.ndarray, window: int, out: np.ndarray = None) -> np.ndarray:
+    return _rolling(x, window, lambda w, o: w.std(axis=-1, ddof=1, out=o), out)
+
+
+def rolling_max(x: np.ndarray, window: int, out: np.ndarray = None) -> np.ndarray:
+    return _rolling(x, window, lambda w, o: w.max(axis=-1, out=o), out)
+
+
+def rolling_min(x: np.ndarray, window: int, out: np.ndarray = None) -> np.ndarray:
+    return _rolling(x, window, lambda w, o: w.min(axis=-1, out=o), out)
+
+
+def ewm_mean(x: np.ndarray, span: int, out: np.ndarray = None) -> np.ndarray:
+    """ewm(span, adjust=False).mean()：从每只股票的第一个有效值开始递推"""
+    alpha = 2.0 / (span + 1.0)
+    out = _empty(x, out)
+    if x.ndim == 1:
+        valid = np.flatnonzero(~np.isnan(x))
+        # 一维且第一个有效值之后没有缺失时用线性滤波一次算完
+        if len(valid) and len(valid) == len(x) - valid[0]:
+            tail = x[valid[0]:]
+            out[:valid[0]] = np.nan
+            out[valid[0]:], _ = lfilter([alpha], [1.0, alpha - 1.0], tail, zi=[(1.0 - alpha) * tail[0]])
+            return out
+    state = np.full(x.shape[1:], np.nan)
+    # 中间缺失时与 pandas（ignore_na=False）一致：旧值的权重按缺失的天数继续衰减
+    weight = np.ones(x.shape[1:])
+    for t in range(len(x)):
+        value = x[t]
+        observed = ~np.isnan(value)
+        weight = np.where(np.isnan(state), weight, weight * (1.0 - alpha))
+        updated = (weight * state + alpha * value) / (weight + alpha)
+        state = np.where(np.isnan(state), value, np.where(observed, updated, state))
+        weight = np.where(observed, 1.0, weight)
+        out[t] = state
+    return out
+
+
+def shift(x: np.ndarray, periods: int, out: np.ndarray = None) -> np.ndarray:
+    out = _empty(x, out)
+    split = min(periods, len(x))
+    out[:split] = np.nan
+    out[split:] = x[:len(x) - split]
+    return out
+
+
+def centered(x: np.ndarray, window: int, reducer, out: np.ndarray = None) -> np.ndarray:
+    """rolling(window, center=True)：偶数窗口覆盖 i-window/2 .. i+window/2-1"""
+    trailing = reducer(x, window)
+    offset = window - 1 - window // 2
+    out = _empty(x, out)
+    split = max(len(x) - offset, 0)
+    out[:split] = trailing[offset:]
+    out[split:] = np.nan
+    return out
@@ -0,0 +1,359 @@
+"""
+流式增量技术指标
+
+每只股票保存一份指标状态：各滚动窗口最近 N 个值的定长缓冲区（窗口多长就保存多长）、
+EMA/MACD 信号线/OBV 的最新值、最近的局部高低点。新K线到来时只更新缓冲区，
+计算量与历史长度无关；评分所需的尾部K线由缓冲区拼出，交给 AdvancedTechnicalAnalyzer.score_indicators，
+信号字典与 generate_comprehensive_signal 对全部历史计算的一致。
+
+首次出现的股票、历史数据被修改（复权、补数据）的股票用面板引擎一次性预热；
+同一交易日的K线再次到来（盘中刷新）时基于上一根K线之前的状态重算最后一根。
+状态按市场保存为一个 .npz 文件
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from config.config import STORAGE_CONFIG
+from src.analyzers.advanced_technical_analyzer import AdvancedTechnicalAnalyzer
+from src.analyzers.panel_indicators import (FIELDS, INDICATOR_COLUMNS, MIN_BARS, TAIL_ROWS, compute_indicators,
+                                            stack_frames, support_resistance)
+from src.analyzers.rolling_kernels import shift
+from src.storage.columnar import SCHEMA_KEY
+from src.storage.price_panel import _normalize_bars
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SR_WINDOW = 20
+SR_LEVELS = 5
+
+# 缓冲区长度：滚动窗口和评分读取多少个最近值就保存多少个，其余指标只需要最近 2 个（与前一根比较）
+BUFFER_LENGTHS = {
+    'Open': 2, 'High': TAIL_ROWS, 'Low': TAIL_ROWS, 'Close': 120, 'Volume': 20,
+    'gain': 14, 'loss': 14, 'TR': 14, 'TP': 20, 'CV': 20,
+    '%K': 3, 'ATR': 20, 'BB_WIDTH': 20,
+    'resistance': SR_LEVELS, 'support': SR_LEVELS
+}
+for _column in INDICATOR_COLUMNS:
+    BUFFER_LENGTHS.setdefault(_column, 2)
+
+
+def _new_state() -> Dict[str, np.ndarray]:
+    return {name: np.full(length, np.nan) for name, length in BUFFER_LENGTHS.items()}
+
+
+def _copy_state(state: Dict) -> Dict:
+    return {name: value.copy() if isinstance(value, np.ndarray) else list(value) if isinstance(value, list)
+            else value for name, value in state.items()}
+
+
+def _push(buffer: np.ndarray, value):
+    buffer[:-1] = buffer[1:]
+    buffer[-1] = value
+
+
+def _ewm(previous, value, span: int):
+    alpha = 2.0 / (span + 1.0)
+    if np.isnan(previous):
+        return value
+    if np.isnan(value):
+        return previous
+    return (1.0 - alpha) * previous + alpha * value
+
+
+def _tail(values: np.ndarray, length: int) -> np.ndarray:
+    """最后 length 个值，不足时前面补 NaN"""
+    out = np.full(length, np.nan)
+    values = values[-length:]
+    if len(values):
+        out[length - len(values):] = values
+    return out
+
+
+def update_state(state: Dict, bar: np.ndarray):
+    """按一根K线（Open/High/Low/Close/Volume）更新状态，只读写定长缓冲区"""
+    bar = np.asarray(bar, dtype='float64')
+    o, h, l, c, v = bar
+    prev_close = state['Close'][-1]
+    for name, value in zip(FIELDS, bar):
+        _push(state[name], value)
+    state['count'] += 1
+
+    closes = state['Close']
+    delta = c - prev_close
+    _push(state['gain'], delta if delta > 0 else 0.0)
+    _push(state['loss'], -delta if delta < 0 else 0.0)
+    _push(state['TR'], np.fmax(np.fmax(h - l, abs(h - prev_close)), abs(l - prev_close)))
+    _push(state['TP'], (h + l + c) / 3)
+    _push(state['CV'], c * v)
+
+    values = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for window in (5, 10, 20, 40, 60, 120):
+            values[f'MA{window}'] = closes[-window:].mean()
+        values['EMA12'] = _ewm(state['EMA12'][-1], c, 12)
+        values['EMA26'] = _ewm(state['EMA26'][-1], c, 26)
+
+        rs = state['gain'].mean() / state['loss'].mean()
+        values['RSI'] = 100 - (100 / (1 + rs))
+
+        low_min = state['Low'][-14:].min()
+        high_max = state['High'][-14:].max()
+        values['%K'] = 100 * ((c - low_min) / (high_max - low_min))
+        _push(state['%K'], values['%K'])
+        values['%D'] = state['%K'].mean()
+        values['Williams_R'] = -100 * ((high_max - c) / (high_max - low_min))
+
+        values['MACD'] = values['EMA12'] - values['EMA26']
+        values['MACD_SIGNAL'] = _ewm(state['MACD_SIGNAL'][-1], values['MACD'], 9)
+        values['MACD_HIST'] = values['MACD'] - values['MACD_SIGNAL']
+
+        std = closes[-20:].std(ddof=1)
+        values['BB_MIDDLE'] = values['MA20']
+        values['BB_UPPER'] = values['BB_MIDDLE'] + std * 2
+        values['BB_LOWER'] = values['BB_MIDDLE'] - std * 2
+        values['BB_WIDTH'] = (values['BB_UPPER'] - values['BB_LOWER']) / values['BB_MIDDLE']
+        values['BB_PERCENT'] = (c - values['BB_LOWER']) / (values['BB_UPPER'] - values['BB_LOWER'])
+
+        values['ATR'] = state['TR'].mean()
+
+        tp = state['TP']
+        tp_mean = tp.mean()
+        values['CCI'] = (tp[-1] - tp_mean) / (0.015 * np.abs(tp - tp_mean).mean())
+
+        obv = state['OBV'][-1]
+        step = np.sign(delta) * v
+        values['OBV'] = (0.0 if np.isnan(obv) else obv) + (0.0 if np.isnan(step) else step)
+        values['Volume_MA20'] = state['Volume'].mean()
+        values['Volume_Ratio'] = v / values['Volume_MA20']
+        values['VWAP'] = state['CV'].sum() / state['Volume'].sum()
+
+        close_10 = closes[-11]
+        values['Momentum'] = c - close_10
+        values['ROC'] = ((c - close_10) / close_10) * 100
+
+    for column in INDICATOR_COLUMNS:
+        if column != '%K':
+            _push(state[column], values[column])
+
+    # rolling(20, center=True) 覆盖 i-10..i+9：新K线到来后，9 根之前的那根K线的局部高低点才确定
+    if state['count'] >= SR_WINDOW:
+        highs = state['High'][-SR_WINDOW:]
+        lows = state['Low'][-SR_WINDOW:]
+        candidate = SR_WINDOW // 2
+        if highs[candidate] == highs.max():
+            _push(state['resistance'], highs[candidate])
+        if lows[candidate] == lows.min():
+            _push(state['support'], lows[candidate])
+
+
+def _bar_days(bars: pd.DataFrame) -> List[str]:
+    return list(bars.index.strftime('%Y-%m-%d'))
+
+
+class StreamingIndicators:
+    def __init__(self, path: str = None, analyzer: AdvancedTechnicalAnalyzer = None):
+        self.path = path
+        self.analyzer = analyzer or AdvancedTechnicalAnalyzer()
+        self.states: Dict[str, Dict] = {}
+        # 每只股票最后一根K线之前的状态，用于盘中刷新时重算最后一根
+        self.previous: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    @classmethod
+    def for_market(cls, market: str, analyzer: AdvancedTechnicalAnalyzer = None) -> 'StreamingIndicators':
+        return cls(os.path.join(STORAGE_CONFIG['indicator_state_dir'], f'{market}.npz'), analyzer)
+
+    def warm_up(self, frames: Dict[str, pd.DataFrame]):
+        """用全部历史K线（面板引擎一次计算）建立状态"""
+        self._warm_up({symbol: _normalize_bars(df) for symbol, df in frames.items()
+                       if df is not None and not df.empty})
+
+    def _warm_up(self, frames: Dict[str, pd.DataFrame]):
+        if not frames:
+            return
+
+        symbols, arrays, lengths = stack_frames(frames)
+        backend = self.analyzer.backend
+        indicators = compute_indicators(arrays, backend=backend)
+        high, low, close, volume = arrays['High'], arrays['Low'], arrays['Close'], arrays['Volume']
+        prev_close = shift(close, 1)
+        with np.errstate(invalid='ignore'):
+            delta = close - prev_close
+            sources = {
+                'gain': np.where(delta > 0, delta, 0.0),
+                'loss': np.where(delta < 0, -delta, 0.0),
+                'TR': np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close)),
+                'TP': (high + low + close) / 3,
+                'CV': close * volume
+            }
+        padding = np.isnan(close)
+        for name in ('gain', 'loss'):
+            sources[name][padding] = np.nan
+        local_max = backend.rolling(high, SR_WINDOW, 'max', center=True)
+        local_min = backend.rolling(low, SR_WINDOW, 'min', center=True)
+        days = len(close)
+
+        with self._lock:
+            for j, symbol in enumerate(symbols):
+                state = {}
+                for name, length in BUFFER_LENGTHS.items():
+                    if name in indicators:
+                        state[name] = _tail(indicators[name][:, j], length)
+                    elif name in sources:
+                        state[name] = _tail(sources[name][:, j], length)
+                start = days - lengths[j]
+                highs, lows = high[start:, j], low[start:, j]
+                state['resistance'] = _tail(highs[highs == local_max[start:, j]], SR_LEVELS)
+                state['support'] = _tail(lows[lows == local_min[start:, j]], SR_LEVELS)
+                state['count'] = int(lengths[j])
+                state['dates'] = _bar_days(frames[symbol])[-2:]
+                self.states[symbol] = state
+                self.previous.pop(symbol, None)
+
+        logger.info(f"指标状态预热: {len(symbols)} 只股票")
+
+    def update(self, symbol: str, bar, day: str):
+        """追加一根K线；day 与最后一根相同时视为盘中刷新，替换最后一根"""
+        with self._lock:
+            state = self.states.get(symbol)
+            if state is None:
+                state = _new_state()
+                state['count'] = 0
+                state['dates'] = []
+            elif state['dates'] and day == state['dates'][-1]:
+                if symbol not in self.previous:
+                    raise KeyError(f"{symbol} 没有上一根K线之前的状态，需要重新预热")
+                state = _copy_state(self.previous[symbol])
+            elif state['dates'] and day < state['dates'][-1]:
+                raise ValueError(f"{symbol} 的K线日期 {day} 早于已处理的 {state['dates'][-1]}")
+
+            self.previous[symbol] = _copy_state(state)
+            update_state(state, bar)
+            state['dates'] = (state['dates'] + [day])[-2:]
+            self.states[symbol] = state
+
+    @staticmethod
+    def _same_bar(state: Dict, values: np.ndarray, offset: int) -> bool:
+        """状态中倒数第 offset 根K线是否与 values 相同"""
+        stored = [state[field][-offset] for field in FIELDS]
+        return np.allclose(values, stored, rtol=1e-12, equal_nan=True)
+
+    def ingest(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """
+        把最新的K线并入状态并返回信号
+
+        已有状态的股票只处理最后一根之后（以及盘中刷新的最后一根）的K线；
+        新股票、历史与状态不一致（复权、补数据）的股票重新预热
+        """
+        rewarm = {}
+        updated = 0
+        for symbol, df in frames.items():
+            if df is None or df.empty:
+                continue
+            bars = _normalize_bars(df)
+            days = _bar_days(bars)
+            values = bars.to_numpy(dtype='float64')
+            state = self.states.get(symbol)
+
+            if state is None or not state['dates'] or state['dates'][-1] not in days:
+                rewarm[symbol] = bars
+                continue
+            start = days.index(state['dates'][-1])
+            if len(state['dates']) == 2 and (start == 0 or days[start - 1] != state['dates'][0] or
+                                             not self._same_bar(state, values[start - 1], 2)):
+                rewarm[symbol] = bars
+                continue
+            if self._same_bar(state, values[start], 1):
+                start += 1
+            elif symbol not in self.previous:
+                rewarm[symbol] = bars
+                continue
+
+            for i in range(start, len(days)):
+                self.update(symbol, values[i], days[i])
+                updated += 1
+
+        if rewarm:
+            self._warm_up(rewarm)
+        if updated:
+            logger.info(f"指标状态增量更新: {updated} 根K线")
+
+        return {symbol: self.signal(symbol) for symbol in frames if symbol in self.states}
+
+    def tail_frame(self, symbol: str) -> pd.DataFrame:
+        """由缓冲区拼出评分用的尾部K线，较短的缓冲区前面为 NaN（评分不会读到）"""
+        state = self.states[symbol]
+        columns = FIELDS + INDICATOR_COLUMNS
+        return pd.DataFrame({column: _tail(state[column], TAIL_ROWS) for column in columns}, columns=columns)
+
+    def signal(self, symbol: str) -> Dict:
+        state = self.states.get(symbol)
+        if state is None or state['count'] < MIN_BARS:
+            return {}
+        try:
+            resistance = state['resistance'][~np.isnan(state['resistance'])].tolist()
+            support = state['support'][~np.isnan(state['support'])].tolist()
+            sr_levels = support_resistance(resistance, support, state['Close'][-1])
+            return self.analyzer.score_indicators(self.tail_frame(symbol), sr_levels)
+        except Exception as e:
+            logger.error(f"流式指标评分失败 {symbol}: {e}")
+            return {}
+
+    def save(self, path: str = None):
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            symbols = list(self.states)
+            arrays = {}
+            for name, length in BUFFER_LENGTHS.items():
+                arrays[name] = np.array([self.states[s][name] for s in symbols]).reshape(len(symbols), length)
+                arrays[f'prev.{name}'] = np.array(
+                    [self.previous[s][name] if s in self.previous else np.full(length, np.nan) for s in symbols]
+                ).reshape(len(symbols), length)
+            arrays['count'] = np.array([self.states[s]['count'] for s in symbols], dtype=np.int64)
+            arrays['prev.count'] = np.array([self.previous[s]['count'] if s in self.previous else -1
+                                             for s in symbols], dtype=np.int64)
+            schema = {
+                'symbols': symbols,
+                'dates': [self.states[s]['dates'] for s in symbols],
+                'prev_dates': [self.previous[s]['dates'] if s in self.previous else None for s in symbols]
+            }
+            arrays[SCHEMA_KEY] = np.array(json.dumps(schema, ensure_ascii=False))
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    def _load(self):
+        try:
+            with np.load(self.path, allow_pickle=False) as npz:
+                schema = json.loads(str(npz[SCHEMA_KEY]))
+                data = {key: npz[key] for key in npz.files if key != SCHEMA_KEY}
+        except Exception as e:
+            logger.warning(f"读取指标状态失败，将重新预热: {e}")
+            return
+
+        for i, symbol in enumerate(schema['symbols']):
+            state = {name: data[name][i].copy() for name in BUFFER_LENGTHS}
+            state['count'] = int(data['count'][i])
+            state['dates'] = schema['dates'][i]
+            self.states[symbol] = state
+            if schema['prev_dates'][i] is not None:
+                previous = {name: data[f'prev.{name}'][i].copy() for name in BUFFER_LENGTHS}
+                previous['count'] = int(data['prev.count'][i])
+                previous['dates'] = schema['prev_dates'][i]
+                self.previous[symbol] = previous
+        logger.info(f"读取指标状态: {len(self.states)} 只股票")
@@ -0,0 +1,139 @@
+"""
+技术指标计算后端
+
+滚动统计和 EMA 交给后端计算：逐只计算的 IndicatorGraph（一维数组），以及面板、流式预热和紧凑模式共用的
+panel_indicators.compute_indicators（交易日 × 股票 的二维数组或一维数组）都按 AdvancedTechnicalAnalyzer.backend 计算。
+流式指标逐根K线的增量更新是常数时间的递推，不经过后端。
+
+- pandas：Series/DataFrame 的 rolling / ewm，原来的写法
+- numpy：rolling_kernels 中的 sliding_window_view 实现，EMA 用线性滤波
+- talib：一维数组用 TA-Lib 的 C 实现（SMA / SUM / MAX / MIN），其余以及二维面板交给 numpy。
+  TA-Lib 的 STDDEV 是总体标准差且用平方和公式、EMA 用前 n 个值的均值做初值、
+  中间有 NaN 时之后全部为 NaN，与 pandas 结果不一致，这些情况都不用 TA-Lib
+
+用 ANALYSIS_CONFIG['ta_backend']（环境变量 TA_BACKEND）选择，默认 auto：
+安装了 TA-Lib 时用 talib，否则用 numpy（benchmark_ta_backends.py 中两者都比 pandas 快）
+"""
+
+import logging
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from config.config import ANALYSIS_CONFIG
+from src.analyzers.rolling_kernels import (centered, ewm_mean, rolling_mad, rolling_max, rolling_mean, rolling_min,
+                                           rolling_std, rolling_sum)
+
+try:
+    import talib
+except ImportError:
+    talib = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STATS = ('mean', 'sum', 'std', 'max', 'min', 'mad')
+
+
+def _into(values: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    if out is None:
+        return values
+    np.copyto(out, values)
+    return out
+
+
+class PandasBackend:
+    name = 'pandas'
+
+    def rolling(self, x: np.ndarray, window: int, stat: str = 'mean', center: bool = False,
+                out: np.ndarray = None) -> np.ndarray:
+        """
+        沿交易日方向的滚动统计，stat 为 mean / sum / std / max / min / mad，窗口不满或含 NaN 时为 NaN
+
+        x 为一维数组或 交易日 × 股票 的二维数组；out 为预先分配的结果数组，下同
+        """
+        if stat == 'mad':
+            return rolling_mad(x, window, out=out)
+        frame = pd.DataFrame(x) if x.ndim == 2 else pd.Series(x)
+        return _into(getattr(frame.rolling(window=window, center=center), stat)().to_numpy(), out)
+
+    def ewm(self, x: np.ndarray, span: int, out: np.ndarray = None) -> np.ndarray:
+        """ewm(span, adjust=False).mean()"""
+        frame = pd.DataFrame(x) if x.ndim == 2 else pd.Series(x)
+        return _into(frame.ewm(span=span, adjust=False).mean().to_numpy(), out)
+
+
+class NumpyBackend(PandasBackend):
+    name = 'numpy'
+    reducers = {'mean': rolling_mean, 'sum': rolling_sum, 'std': rolling_std, 'max': rolling_max,
+                'min': rolling_min, 'mad': rolling_mad}
+
+    def rolling(self, x: np.ndarray, window: int, stat: str = 'mean', center: bool = False,
+                out: np.ndarray = None) -> np.ndarray:
+        reducer = self.reducers[stat]
+        if center:
+            return centered(x, window, reducer, out=out)
+        return reducer(x, window, out=out)
+
+    def ewm(self, x: np.ndarray, span: int, out: np.ndarray = None) -> np.ndarray:
+        return ewm_mean(x, span, out=out)
+
+
+class TalibBackend(NumpyBackend):
+    name = 'talib'
+
+    def __init__(self):
+        if talib is None:
+            raise RuntimeError("未安装 TA-Lib")
+        self.functions = {'mean': talib.SMA, 'sum': talib.SUM, 'max': talib.MAX, 'min': talib.MIN}
+
+    def _talib_reducer(self, stat: str):
+        function = self.functions[stat]
+        return lambda x, window: function(x, timeperiod=window)
+
+    def rolling(self, x: np.ndarray, window: int, stat: str = 'mean', center: bool = False,
+                out: np.ndarray = None) -> np.ndarray:
+        # TA-Lib 只接受一维数组；面板逐列调用比 numpy 对整个面板一次计算慢（见 benchmark_ta_backends.py），交给 numpy
+        if stat not in self.functions or window < 2 or x.ndim != 1 or _has_gap(x):
+            return super().rolling(x, window, stat, center, out=out)
+        reducer = self._talib_reducer(stat)
+        values = np.ascontiguousarray(x, dtype='float64')
+        if center:
+            return centered(values, window, reducer, out=out)
+        return _into(reducer(values, window), out)
+
+
+def _has_gap(x: np.ndarray) -> bool:
+    """第一个有效值之后是否还有 NaN（TA-Lib 只能正确跳过开头的 NaN）"""
+    missing = np.isnan(x)
+    if not missing.any():
+        return False
+    valid = np.flatnonzero(~missing)
+    return len(valid) > 0 and missing[valid[0]:].any()
+
+
+BACKENDS = {'pandas': PandasBackend, 'numpy': NumpyBackend, 'talib': TalibBackend}
+
+_backends: Dict[str, PandasBackend] = {}
+
+
+def available_backends() -> List[str]:
+    return [name for name in BACKENDS if name != 'talib' or talib is not None]
+
+
+def get_backend(name: str = None) -> PandasBackend:
+    """按名称获取后端，默认读取 ANALYSIS_CONFIG['ta_backend']；TA-Lib 不可用时回退到 numpy"""
+    name = (name or ANALYSIS_CONFIG.get('ta_backend') or 'auto').lower()
+    if name == 'auto':
+        name = 'talib' if talib is not None else 'numpy'
+    elif name not in BACKENDS:
+        logger.warning(f"未知的指标计算后端 {name}，使用 numpy")
+        name = 'numpy'
+    elif name == 'talib' and talib is None:
+        logger.warning("未安装 TA-Lib，指标计算使用 numpy 后端")
+        name = 'numpy'
+
+    if name not in _backends:
+        _backends[name] = BACKENDS[name]()
+    return _backends[name]
@@ -0,0 +1,149 @@
+"""
+数据源调用录制与回放
+
+record 模式下把每次 call_source 的参数和返回值（DataFrame 等）压缩保存，
+replay 模式下不访问网络，直接返回录制的结果，并可按录制耗时或固定时间模拟延迟，
+用于离线复现和评估 fetch -> analyze 流程本身的开销
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import threading
+import time
+import zlib
+from datetime import date, datetime
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from config.config import CASSETTE_CONFIG
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CassetteMiss(Exception):
+    """回放时找不到对应的录制"""
+
+
+def _normalize(value, loose: bool):
+    if isinstance(value, (datetime, date, pd.Timestamp)):
+        # 日期参数大多由当前时间推算，宽松匹配时忽略，保证隔天也能回放
+        return None if loose else pd.Timestamp(value).strftime('%Y-%m-%d')
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v, loose) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v, loose) for k, v in sorted(value.items())}
+    if loose and isinstance(value, str) and re.fullmatch(r'\d{8}', value):
+        return None
+    return value
+
+
+class Cassette:
+    def __init__(self, mode: str = None, directory: str = None, latency: str = None):
+        self.mode = mode or CASSETTE_CONFIG['mode']
+        self.directory = directory or CASSETTE_CONFIG['dir']
+        self.latency = CASSETTE_CONFIG['latency'] if latency is None else latency
+        self.stats = {'recorded': 0, 'replayed': 0, 'misses': 0, 'simulated_latency': 0.0}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ('record', 'replay')
+
+    def _key(self, source: str, func_name: str, args, kwargs, loose: bool) -> str:
+        payload = json.dumps([source, func_name, _normalize(list(args), loose), _normalize(kwargs, loose)],
+                             ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, source: str, func_name: str, key: str) -> str:
+        return os.path.join(self.directory, source, f'{func_name}_{key}.pkl.z')
+
+    def _write(self, path: str, entry: Dict):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(zlib.compress(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)))
+        os.replace(tmp_path, path)
+
+    def _read(self, path: str) -> Optional[Dict]:
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return pickle.loads(zlib.decompress(f.read()))
+
+    def _simulate_latency(self, entry: Dict):
+        if not self.latency:
+            return
+        delay = entry.get('elapsed', 0.0) if self.latency == 'recorded' else float(self.latency)
+        if delay > 0:
+            time.sleep(delay)
+            with self._lock:
+                self.stats['simulated_latency'] += delay
+
+    def call(self, source: str, func: Callable, args, kwargs, invoke: Callable):
+        """按当前模式执行一次调用，invoke 为真正访问数据源的函数"""
+        func_name = getattr(func, '__name__', 'call')
+        exact_key = self._key(source, func_name, args, kwargs, loose=False)
+        loose_key = self._key(source, func_name, args, kwargs, loose=True)
+
+        if self.mode == 'replay':
+            entry = self._read(self._path(source, func_name, exact_key)) \
+                or self._read(self._path(source, func_name, loose_key))
+            if entry is None:
+                with self._lock:
+                    self.stats['misses'] += 1
+                raise CassetteMiss(f"未找到录制: {source}.{func_name} {args} {kwargs}")
+
+            self._simulate_latency(entry)
+            with self._lock:
+                self.stats['replayed'] += 1
+            return entry['result']
+
+        start_time = time.perf_counter()
+        result = invoke()
+        elapsed = time.perf_counter() - start_time
+
+        if self.mode == 'record':
+            entry = {
+                'source': source,
+                'func': func_name,
+                'args': repr(args),
+                'kwargs': repr(kwargs),
+                'recorded_at': datetime.now().isoformat(),
+                'elapsed': elapsed,
+                'result': result
+            }
+            try:
+                self._write(self._path(source, func_name, exact_key), entry)
+                self._write(self._path(source, func_name, loose_key), entry)
+                with self._lock:
+                    self.stats['recorded'] += 1
+            except Exception as e:
+                logger.warning(f"录制数据源调用失败 {source}.{func_name}: {e}")
+
+        return result
+
+    def log_stats(self):
+        if not self.enabled:
+            return
+        logger.info(f"数据源录制/回放 ({self.mode}): 录制 {self.stats['recorded']} 次, "
+                    f"回放 {self.stats['replayed']} 次, 未命中 {self.stats['misses']} 次, "
+                    f"模拟延迟 {self.stats['simulated_latency']:.2f} 秒")
+
+
+_cassette = None
+_cassette_guard = threading.Lock()
+
+
+def get_cassette() -> Cassette:
+    """进程内共享的录制/回放器"""
+    global _cassette
+    with _cassette_guard:
+        if _cassette is None:
+            _cassette = Cassette()
+        return _cassette
@@ -0,0 +1,99 @@
+"""
+统一的数据源调用入口
+
+fetchers 中对 akshare / yfinance 的调用都经过 call_source，
+由这里负责熔断检查、按数据源限速、记录调用结果以及录制/回放
+"""
+
+from typing import Callable, List
+
+import pandas as pd
+
+from src.data_sources.cassette import get_cassette
+from src.utils.circuit_breaker import get_source_health
+from src.utils.rate_limiter import get_rate_limiter
+
+try:
+    from yfinance import shared as yf_shared
+except ImportError:
+    yf_shared = None
+
+# yfinance 错误信息中出现这些字样时是数据源本身的问题（限流、网络），而不是个别代码无效
+OUTAGE_ERROR_MARKERS = ('ratelimit', 'too many requests', 'curl', 'timeout', 'timed out', 'connection',
+                        'could not resolve')
+
+
+class SourceUnavailable(Exception):
+    """数据源处于熔断状态"""
+
+    def __init__(self, source: str):
+        super().__init__(f"数据源 {source} 熔断中")
+        self.source = source
+
+
+def unavailable_frame(source: str) -> pd.DataFrame:
+    """熔断时返回的空表，attrs 中带有状态标记"""
+    df = pd.DataFrame()
+    df.attrs['source'] = source
+    df.attrs['source_status'] = 'unavailable'
+    return df
+
+
+def _tickers(args, kwargs) -> List[str]:
+    tickers = kwargs.get('tickers', args[0] if args else None)
+    if isinstance(tickers, str):
+        return tickers.replace(',', ' ').split()
+    if isinstance(tickers, (list, tuple)):
+        return list(tickers)
+    return []
+
+
+def _empty_result_error(source: str, args, kwargs) -> str:
+    """
+    空表是否说明数据源故障，是则返回错误描述，否则返回空字符串
+
+    多只代码的批量请求全部为空，或 yfinance 记录的错误是限流/网络错误时算故障；
+    单只代码返回空表（港股代码格式不对、已退市等）只是这只代码的问题
+    """
+    tickers = _tickers(args, kwargs)
+    if len(tickers) > 1:
+        return f'批量请求 {len(tickers)} 只代码全部返回空数据'
+
+    if source == 'yfinance' and yf_shared is not None:
+        for message in map(str, (getattr(yf_shared, '_ERRORS', None) or {}).values()):
+            if any(marker in message.lower() for marker in OUTAGE_ERROR_MARKERS):
+                return message
+    return ''
+
+
+def call_source(source: str, func: Callable, *args, **kwargs):
+    """检查熔断并按 source 限速后调用 func，数据源熔断时抛出 SourceUnavailable"""
+    cassette = get_cassette()
+    if cassette.mode == 'replay':
+        return cassette.call(source, func, args, kwargs, None)
+
+    health = get_source_health()
+    breaker = health.get(source)
+    if breaker is not None and not breaker.allow():
+        raise SourceUnavailable(source)
+
+    get_rate_limiter().acquire(source, getattr(func, '__name__', ''))
+
+    try:
+        if cassette.enabled:
+            result = cassette.call(source, func, args, kwargs, lambda: func(*args, **kwargs))
+        else:
+            result = func(*args, **kwargs)
+    except Exception as e:
+        if breaker is not None:
+            breaker.record_failure(str(e))
+        raise
+
+    if breaker is not None:
+        if source in health.empty_result_sources and isinstance(result, pd.DataFrame) and result.empty:
+            error = _empty_result_error(source, args, kwargs)
+            if error:
+                breaker.record_failure(error)
+        else:
+            breaker.record_success()
+    return result
@@ -3,7 +3,7 @@ DATA_SOURCES = {
         "akshare": {
             "enabled": True,
             "functions": {
-                "index_data": "ak.stock_zh_index_daily",
+                "index_data": "ak.stock_zh_index_daily_em",
                 "stock_list": "ak.stock_zh_a_spot_em",
                 "hot_stocks": "ak.stock_zh_a_spot_em"
             }
@@ -2,31 +2,80 @@ import akshare as ak
 import pandas as pd
 from datetime import datetime, timedelta
 import logging
+from typing import Dict, List, Optional
+
+from config.config import CACHE_CONFIG, MARKETS
+from src.data_sources.client import SourceUnavailable, call_source, unavailable_frame
+from src.storage.bar_store import BarStore
+from src.storage.sector_index import SectorIndex
+from src.storage.snapshot_cache import get_snapshot_cache
+from src.utils.ranking import HOT_STOCK_RANKINGS, compute_rankings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+INDEX_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+
+def to_index_symbol(index_code: str) -> str:
+    """'000001.SH' -> 'sh000001'，已带市场前缀的代码原样返回"""
+    if '.' in index_code:
+        code, exchange = index_code.split('.', 1)
+        return f"{exchange.lower()}{code}"
+    return index_code.lower()
+
 
 class ChinaStockFetcher:
-    def __init__(self):
-        pass
+    def __init__(self, bar_store: Optional[BarStore] = None, sector_index: Optional[SectorIndex] = None):
+        self.bar_store = bar_store
+        self.sector_index = sector_index if sector_index is not None else SectorIndex()
+
+    def _download_index_data(self, symbol: str, start: pd.Timestamp) -> pd.DataFrame:
+        df = call_source('akshare', ak.stock_zh_index_daily_em, symbol=symbol,
+                         start_date=start.strftime('%Y%m%d'),
+                         end_date=datetime.now().strftime('%Y%m%d'))
+        if df is None or df.empty:
+            return pd.DataFrame()
+        
+        # 与 ak.stock_zh_index_daily 的列保持一致
+        df = df[INDEX_COLUMNS].copy()
+        df['date'] = pd.to_datetime(df['date']).dt.date
+        return df
 
     def get_index_data(self, index_code, start_date=None):
         try:
             if not start_date:
                 start_date = (datetime.now() - timedelta(days=365)).strftime('%Y%m%d')
             
-            df = ak.stock_zh_index_daily(symbol=index_code)
-            df.index = pd.to_datetime(df.index)
+            symbol = to_index_symbol(index_code)
+            if self.bar_store is not None:
+                df = self.bar_store.get_bars(
+                    'cn_index', symbol,
+                    lambda start: self._download_index_data(symbol, start),
+                    start_date, date_column='date'
+                )
+            else:
+                df = self._download_index_data(symbol, pd.Timestamp(start_date))
+            
+            if not df.empty:
+                df.index = pd.to_datetime(df['date'])
             return df
+        except SourceUnavailable as e:
+            return unavailable_frame(e.source)
         except Exception as e:
             logger.error(f"获取指数数据失败 {index_code}: {e}")
             return pd.DataFrame()
 
+    def get_market_indices(self, start_date=None) -> Dict[str, pd.DataFrame]:
+        """获取 MARKETS['cn']['indices'] 中所有指数的行情"""
+        return {code: self.get_index_data(code, start_date) for code in MARKETS['cn']['indices']}
+
     def get_all_stocks(self):
         try:
-            df = ak.stock_zh_a_spot_em()
+            df = get_snapshot_cache().get('cn_spot', lambda: call_source('akshare', ak.stock_zh_a_spot_em))
             return df
+        except SourceUnavailable as e:
+            return unavailable_frame(e.source)
         except Exception as e:
             logger.error(f"获取A股列表失败: {e}")
             return pd.DataFrame()
@@ -36,44 +85,104 @@ class ChinaStockFetcher:
             if not start_date:
                 start_date = (datetime.now() - timedelta(days=365)).strftime('%Y%m%d')
             
-            df = ak.stock_zh_a_daily(symbol=stock_code, start_date=start_date)
+            if self.bar_store is not None:
+                return self.bar_store.get_bars(
+                    'cn', stock_code,
+                    lambda start: call_source('akshare', ak.stock_zh_a_daily,
+                                          symbol=stock_code, start_date=start.strftime('%Y%m%d')),
+                    start_date, date_column='date'
+                )
+            
+            df = call_source('akshare', ak.stock_zh_a_daily, symbol=stock_code, start_date=start_date)
             return df
+        except SourceUnavailable as e:
+            return unavailable_frame(e.source)
         except Exception as e:
             logger.error(f"获取股票数据失败 {stock_code}: {e}")
             return pd.DataFrame()
 
     def get_hot_stocks(self):
         try:
-            df = ak.stock_zh_a_spot_em()
-            
-            df = df.sort_values('涨跌幅', ascending=False)
-            
-            top_gainers = df.head(20)
-            top_losers = df.tail(20)
+            df = get_snapshot_cache().get('cn_spot', lambda: call_source('akshare', ak.stock_zh_a_spot_em), copy=False)
             
-            top_volume = df.sort_values('成交量', ascending=False).head(20)
+            rankings = compute_rankings(df, HOT_STOCK_RANKINGS, k=20)
             
-            return {
-                "top_gainers": top_gainers,
-                "top_losers": top_losers,
-                "top_volume": top_volume
-            }
+            return {name: df.iloc[idx] for name, idx in rankings.items()}
+        except SourceUnavailable:
+            return {}
         except Exception as e:
             logger.error(f"获取热门股票失败: {e}")
             return {}
 
     def get_hot_sectors(self):
         try:
-            df = ak.stock_board_industry_name_em()
+            df = call_source('akshare', ak.stock_board_industry_name_em)
             return df
+        except SourceUnavailable as e:
+            return unavailable_frame(e.source)
         except Exception as e:
             logger.error(f"获取热门板块失败: {e}")
             return pd.DataFrame()
 
+    def get_concept_sectors(self):
+        try:
+            df = call_source('akshare', ak.stock_board_concept_name_em)
+            return df
+        except SourceUnavailable as e:
+            return unavailable_frame(e.source)
+        except Exception as e:
+            logger.error(f"获取概念板块失败: {e}")
+            return pd.DataFrame()
+
+    def _download_sector_stocks(self, sector_name: str, board_type: str = 'industry') -> pd.DataFrame:
+        func = ak.stock_board_concept_cons_em if board_type == 'concept' else ak.stock_board_industry_cons_em
+        return call_source('akshare', func, symbol=sector_name)
+
     def get_sector_stocks(self, sector_name):
         try:
-            df = ak.stock_board_industry_cons_em(symbol=sector_name)
+            df = self._download_sector_stocks(sector_name)
+            if df is not None and not df.empty:
+                self.sector_index.update_board(sector_name, 'industry', df)
             return df
+        except SourceUnavailable as e:
+            return unavailable_frame(e.source)
         except Exception as e:
             logger.error(f"获取板块股票失败 {sector_name}: {e}")
             return pd.DataFrame()
+
+    def refresh_sector_index(self, force: bool = False, max_boards: int = None) -> int:
+        """增量刷新板块成分缓存，返回本次下载的板块数"""
+        boards = {}
+        industry_df = self.get_hot_sectors()
+        if industry_df.empty:
+            return 0
+        boards.update({name: 'industry' for name in industry_df['板块名称']})
+        
+        if CACHE_CONFIG['sector_include_concepts']:
+            concept_df = self.get_concept_sectors()
+            if concept_df.empty:
+                # 概念板块列表获取失败时保留已缓存的概念板块，避免被当作下线板块删除
+                boards.update({name: 'concept' for name, board in self.sector_index.boards.items()
+                               if board['type'] == 'concept'})
+            else:
+                boards.update({name: 'concept' for name in concept_df['板块名称'] if name not in boards})
+        
+        if max_boards is None:
+            max_boards = CACHE_CONFIG['sector_refresh_max_boards']
+        return self.sector_index.refresh(boards, self._download_sector_stocks, force=force, max_boards=max_boards)
+
+    def get_sector_members(self, sector_name: str) -> List[str]:
+        """板块成分股代码，优先使用缓存"""
+        if self.sector_index.is_stale(sector_name):
+            board_type = self.sector_index.boards.get(sector_name, {}).get('type', 'industry')
+            try:
+                df = self._download_sector_stocks(sector_name, board_type)
+                if df is not None and not df.empty:
+                    self.sector_index.update_board(sector_name, board_type, df)
+            except Exception as e:
+                logger.warning(f"刷新板块成分失败 {sector_name}，使用缓存: {e}")
+        return self.sector_index.get_sector_stocks(sector_name)
+
+    def get_stock_sectors(self, stock_code: str, board_type: str = None) -> List[str]:
+        """股票所属的行业/概念板块，只查缓存不访问网络"""
+        return self.sector_index.get_stock_sectors(stock_code, board_type)
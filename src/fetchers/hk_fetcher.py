@@ -2,23 +2,38 @@ import yfinance as yf
 import akshare as ak
 import pandas as pd
 from datetime import datetime, timedelta
+from typing import Optional
 import logging
 
+from src.data_sources.client import SourceUnavailable, call_source, unavailable_frame
+from src.storage.bar_store import BarStore
+from src.storage.snapshot_cache import get_snapshot_cache
+from src.utils.ranking import HOT_STOCK_RANKINGS, compute_rankings
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class HongKongStockFetcher:
-    def __init__(self):
-        pass
+    def __init__(self, bar_store: Optional[BarStore] = None):
+        self.bar_store = bar_store
 
     def get_index_data(self, index_code, start_date=None):
         try:
             if not start_date:
                 start_date = (datetime.now() - timedelta(days=365))
             
-            df = yf.download(index_code, start=start_date)
+            if self.bar_store is not None:
+                return self.bar_store.get_bars(
+                    'hk_index', index_code,
+                    lambda start: call_source('yfinance', yf.download, index_code, start=start),
+                    start_date
+                )
+            
+            df = call_source('yfinance', yf.download, index_code, start=start_date)
             return df
+        except SourceUnavailable as e:
+            return unavailable_frame(e.source)
         except Exception as e:
             logger.error(f"获取港股指数数据失败 {index_code}: {e}")
             return pd.DataFrame()
@@ -28,44 +43,50 @@ class HongKongStockFetcher:
             if not start_date:
                 start_date = (datetime.now() - timedelta(days=365))
             
-            df = yf.download(stock_code, start=start_date)
+            if self.bar_store is not None:
+                return self.bar_store.get_bars(
+                    'hk', stock_code,
+                    lambda start: call_source('yfinance', yf.download, stock_code, start=start),
+                    start_date
+                )
+            
+            df = call_source('yfinance', yf.download, stock_code, start=start_date)
             return df
+        except SourceUnavailable as e:
+            return unavailable_frame(e.source)
         except Exception as e:
             logger.error(f"获取港股数据失败 {stock_code}: {e}")
             return pd.DataFrame()
 
     def get_all_stocks(self):
         try:
-            df = ak.stock_hk_spot_em()
+            df = get_snapshot_cache().get('hk_spot', lambda: call_source('akshare', ak.stock_hk_spot_em))
             return df
+        except SourceUnavailable as e:
+            return unavailable_frame(e.source)
         except Exception as e:
             logger.error(f"获取港股列表失败: {e}")
             return pd.DataFrame()
 
     def get_hot_stocks(self):
         try:
-            df = ak.stock_hk_spot_em()
+            df = get_snapshot_cache().get('hk_spot', lambda: call_source('akshare', ak.stock_hk_spot_em), copy=False)
             
-            df = df.sort_values('涨跌幅', ascending=False)
+            rankings = compute_rankings(df, HOT_STOCK_RANKINGS, k=20)
             
-            top_gainers = df.head(20)
-            top_losers = df.tail(20)
-            
-            top_volume = df.sort_values('成交量', ascending=False).head(20)
-            
-            return {
-                "top_gainers": top_gainers,
-                "top_losers": top_losers,
-                "top_volume": top_volume
-            }
+            return {name: df.iloc[idx] for name, idx in rankings.items()}
+        except SourceUnavailable:
+            return {}
         except Exception as e:
             logger.error(f"获取热门港股失败: {e}")
             return {}
 
     def get_hot_sectors(self):
         try:
-            df = ak.stock_board_industry_name_em()
+            df = call_source('akshare', ak.stock_board_industry_name_em)
             return df
+        except SourceUnavailable as e:
+            return unavailable_frame(e.source)
         except Exception as e:
             logger.error(f"获取热门板块失败: {e}")
             return pd.DataFrame()
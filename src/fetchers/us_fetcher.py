@@ -1,23 +1,44 @@
 import yfinance as yf
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 import logging
 
+from src.data_sources.client import SourceUnavailable, call_source, unavailable_frame
+from src.storage.bar_store import BarStore
+from src.storage.metadata_cache import MetadataCache
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _ticker_info(ticker: str) -> Dict:
+    return yf.Ticker(ticker).info
+
+
 class USStockFetcher:
-    def __init__(self):
-        pass
+    def __init__(self, bar_store: Optional[BarStore] = None,
+                 metadata_cache: Optional[MetadataCache] = None):
+        self.bar_store = bar_store
+        self.metadata_cache = metadata_cache or MetadataCache()
 
     def get_index_data(self, index_code, start_date=None):
         try:
             if not start_date:
                 start_date = (datetime.now() - timedelta(days=365))
             
-            df = yf.download(index_code, start=start_date)
+            if self.bar_store is not None:
+                return self.bar_store.get_bars(
+                    'us_index', index_code,
+                    lambda start: call_source('yfinance', yf.download, index_code, start=start),
+                    start_date
+                )
+            
+            df = call_source('yfinance', yf.download, index_code, start=start_date)
             return df
+        except SourceUnavailable as e:
+            return unavailable_frame(e.source)
         except Exception as e:
             logger.error(f"获取美股指数数据失败 {index_code}: {e}")
             return pd.DataFrame()
@@ -27,21 +48,92 @@ class USStockFetcher:
             if not start_date:
                 start_date = (datetime.now() - timedelta(days=365))
             
-            df = yf.download(stock_code, start=start_date)
+            if self.bar_store is not None:
+                return self.bar_store.get_bars(
+                    'us', stock_code,
+                    lambda start: call_source('yfinance', yf.download, stock_code, start=start),
+                    start_date
+                )
+            
+            df = call_source('yfinance', yf.download, stock_code, start=start_date)
             return df
+        except SourceUnavailable as e:
+            return unavailable_frame(e.source)
         except Exception as e:
             logger.error(f"获取美股数据失败 {stock_code}: {e}")
             return pd.DataFrame()
 
-    def get_stock_info(self, stock_code):
+    def get_stock_info(self, stock_code, fields: List[str] = None):
+        """股票基本信息，fields 为调用方要读取的字段，这些字段在缓存有效期内时不访问网络"""
         try:
-            ticker = yf.Ticker(stock_code)
-            info = ticker.info
+            info = self.metadata_cache.get(stock_code, fields)
+            if info is None:
+                info = call_source('yfinance', _ticker_info, stock_code)
+                # 每次未命中都重写整个缓存文件太慢，由调用方在一轮结束时 flush
+                self.metadata_cache.put(stock_code, info)
             return info
+        except SourceUnavailable:
+            return {}
         except Exception as e:
             logger.error(f"获取股票信息失败 {stock_code}: {e}")
             return {}
 
+    def download_recent_bars(self, tickers: List[str], period: str = "5d") -> Dict[str, pd.DataFrame]:
+        """一次请求批量下载多只股票的近期K线"""
+        if not tickers:
+            return {}
+        
+        try:
+            df = call_source('yfinance', yf.download, tickers, period=period,
+                             group_by='ticker', threads=True, progress=False)
+        except SourceUnavailable:
+            raise
+        except Exception as e:
+            logger.error(f"批量下载美股行情失败: {e}")
+            return {}
+        
+        if df is None or df.empty:
+            return {}
+        
+        bars = {}
+        for ticker in tickers:
+            if isinstance(df.columns, pd.MultiIndex):
+                if ticker not in df.columns.get_level_values(0):
+                    continue
+                hist = df[ticker]
+            else:
+                hist = df
+            
+            hist = hist.dropna(subset=['Close'])
+            if not hist.empty:
+                bars[ticker] = hist
+        
+        return bars
+
+    def get_bulk_info(self, tickers: List[str], fields: List[str] = None) -> Dict[str, Dict]:
+        """批量获取股票基本信息，fields 中的字段在缓存有效期内时不访问网络"""
+        if not tickers:
+            return {}
+        
+        return self.metadata_cache.get_many(tickers, self._fetch_bulk_info, fields)
+
+    def warm_metadata(self, tickers: List[str]) -> int:
+        """预热关注列表的股票信息缓存"""
+        return self.metadata_cache.warm(tickers, self._fetch_bulk_info)
+
+    def _fetch_bulk_info(self, tickers: List[str], max_workers: int = 8) -> Dict[str, Dict]:
+        def fetch_info(ticker):
+            try:
+                return ticker, call_source('yfinance', _ticker_info, ticker)
+            except SourceUnavailable:
+                return ticker, {}
+            except Exception as e:
+                logger.warning(f"获取股票信息失败 {ticker}: {e}")
+                return ticker, {}
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(executor.map(fetch_info, tickers))
+
     def get_hot_stocks(self, top_n=20):
         try:
             popular_tickers = [
@@ -49,32 +141,35 @@ class USStockFetcher:
                 "BRK-B", "LLY", "AVGO", "JPM", "XOM", "MA", "HD", "PG",
                 "COST", "MRK", "CVX", "KO", "PEP"
             ]
+            tickers = popular_tickers[:top_n]
+            
+            bars = self.download_recent_bars(tickers)
+            infos = self.get_bulk_info([t for t in tickers if t in bars], fields=['longName', 'marketCap'])
             
             hot_stocks_data = []
-            for ticker in popular_tickers[:top_n]:
-                try:
-                    stock = yf.Ticker(ticker)
-                    info = stock.info
-                    hist = stock.history(period="5d")
-                    
-                    if not hist.empty:
-                        latest_price = hist['Close'].iloc[-1]
-                        prev_close = hist['Close'].iloc[-2]
-                        change_percent = ((latest_price - prev_close) / prev_close) * 100
-                        
-                        hot_stocks_data.append({
-                            '代码': ticker,
-                            '名称': info.get('longName', ticker),
-                            '价格': latest_price,
-                            '涨跌幅': change_percent,
-                            '成交量': hist['Volume'].iloc[-1],
-                            '市值': info.get('marketCap', 0)
-                        })
-                except:
+            for ticker in tickers:
+                hist = bars.get(ticker)
+                if hist is None or len(hist) < 2:
                     continue
+                
+                info = infos.get(ticker, {})
+                latest_price = hist['Close'].iloc[-1]
+                prev_close = hist['Close'].iloc[-2]
+                change_percent = ((latest_price - prev_close) / prev_close) * 100
+                
+                hot_stocks_data.append({
+                    '代码': ticker,
+                    '名称': info.get('longName', ticker),
+                    '价格': latest_price,
+                    '涨跌幅': change_percent,
+                    '成交量': hist['Volume'].iloc[-1],
+                    '市值': info.get('marketCap', 0)
+                })
             
             df = pd.DataFrame(hot_stocks_data)
             return df
+        except SourceUnavailable as e:
+            return unavailable_frame(e.source)
         except Exception as e:
             logger.error(f"获取热门美股失败: {e}")
             return pd.DataFrame()
@@ -92,26 +187,27 @@ class USStockFetcher:
                 "Real Estate": "XLRE"
             }
             
+            bars = self.download_recent_bars(list(sector_etfs.values()))
+            
             sector_data = []
             for sector, ticker in sector_etfs.items():
-                try:
-                    stock = yf.Ticker(ticker)
-                    hist = stock.history(period="5d")
-                    
-                    if not hist.empty:
-                        latest = hist['Close'].iloc[-1]
-                        prev = hist['Close'].iloc[-2]
-                        change = ((latest - prev) / prev) * 100
-                        
-                        sector_data.append({
-                            '板块': sector,
-                            '涨跌幅': change
-                        })
-                except:
+                hist = bars.get(ticker)
+                if hist is None or len(hist) < 2:
                     continue
+                
+                latest = hist['Close'].iloc[-1]
+                prev = hist['Close'].iloc[-2]
+                change = ((latest - prev) / prev) * 100
+                
+                sector_data.append({
+                    '板块': sector,
+                    '涨跌幅': change
+                })
             
             df = pd.DataFrame(sector_data)
             return df
+        except SourceUnavailable as e:
+            return unavailable_frame(e.source)
         except Exception as e:
             logger.error(f"获取美股板块表现失败: {e}")
             return pd.DataFrame()
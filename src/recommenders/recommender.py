@@ -3,15 +3,24 @@ import pandas as pd
 import logging
 from typing import Dict, List
 
+from src.storage.recommendation_store import RecommendationStore
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class Recommender:
-    def __init__(self):
+    def __init__(self, store: RecommendationStore = None):
         self.buy_threshold = 0.7
         self.sell_threshold = 0.3
         self.min_score = 60
+        self._store = store
+
+    @property
+    def store(self) -> RecommendationStore:
+        if self._store is None:
+            self._store = RecommendationStore()
+        return self._store
 
     def generate_recommendation(self, stock_code: str, stock_name: str, 
                                fundamental_analysis: Dict, 
@@ -158,3 +167,33 @@ class Recommender:
         except Exception as e:
             logger.error(f"生成投资组合建议失败: {e}")
             return {}
+
+    def record_run(self, recommendations: Dict, source_file: str = None) -> int:
+        """把一次分析的推荐结果写入历史库，失败时只记日志"""
+        try:
+            return self.store.save_run(recommendations, source_file=source_file)
+        except Exception as e:
+            logger.error(f"写入推荐历史失败: {e}")
+            return 0
+
+    def score_history(self, stock_code: str, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+        try:
+            return self.store.score_history(stock_code, start_date, end_date)
+        except Exception as e:
+            logger.error(f"查询评分历史失败 {stock_code}: {e}")
+            return pd.DataFrame()
+
+    def consecutive_ratings(self, rating: str = '强烈推荐', days: int = 3, end_date: str = None) -> List[Dict]:
+        """最近 days 个分析日连续获得 rating 评级的股票"""
+        try:
+            return self.store.consecutive_ratings(rating, days, end_date)
+        except Exception as e:
+            logger.error(f"查询连续评级失败: {e}")
+            return []
+
+    def top_scores(self, run_date: str = None, limit: int = 10) -> pd.DataFrame:
+        try:
+            return self.store.top_scores(run_date, limit)
+        except Exception as e:
+            logger.error(f"查询评分排行失败: {e}")
+            return pd.DataFrame()
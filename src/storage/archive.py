@@ -0,0 +1,327 @@
+"""
+data/ 目录归档
+
+按内容（sha256）寻址保存历史文件，内容相同的文件只存一份，用 zstd（未安装时用 zlib）压缩。
+compact 按保留策略整理 data/：当天的文件保持原样，30 天内每种文件每天保留最后一个，
+更早的每周保留最后一个；保留下来的历史文件移入归档，其余删除。
+归档后的文件通过 resolve_path 透明读回，原有的加载代码不需要改动
+
+用法:
+    python -m src.storage.archive compact [data_dir] [--dry-run]
+    python -m src.storage.archive restore <原路径>
+"""
+
+import hashlib
+import io
+import logging
+import os
+import shutil
+import sys
+import tarfile
+import zlib
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from config.config import ARCHIVE_CONFIG
+from src.storage.catalog import (SnapshotCatalog, created_at_from_filename, get_catalog,
+                                 kind_from_filename, path_size)
+from src.storage.snapshot import is_snapshot, materialize
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive_entries (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    is_dir INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    archived_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_archive_entries_checksum ON archive_entries (checksum);
+"""
+
+CODEC_SUFFIX = {'zstd': '.zst', 'zlib': '.z'}
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=ARCHIVE_CONFIG['zstd_level']).compress(data)
+    return zlib.compress(data, ARCHIVE_CONFIG['zlib_level'])
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("归档使用 zstd 压缩，需要安装 zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def _pack_dir(path: str) -> bytes:
+    """把快照目录打成 tar，成员按名称排序且不带修改时间，内容相同的目录得到相同的字节"""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w') as tar:
+        for name in sorted(os.listdir(path)):
+            with open(os.path.join(path, name), 'rb') as f:
+                data = f.read()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = 0
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def _unpack_dir(data: bytes, target: str):
+    os.makedirs(target, exist_ok=True)
+    with tarfile.open(fileobj=io.BytesIO(data), mode='r') as tar:
+        for member in tar.getmembers():
+            if not member.isfile() or os.path.basename(member.name) != member.name:
+                continue
+            with open(os.path.join(target, member.name), 'wb') as f:
+                f.write(tar.extractfile(member).read())
+
+
+def retention_keep(items: List[Dict], now: datetime = None) -> set:
+    """
+    按保留策略返回要保留的 path 集合
+
+    items 中每项含 path、kind、created_at（datetime）；当天全部保留，
+    daily_days 天内每种文件每天保留最后一个，更早的每周保留最后一个
+    """
+    now = now or datetime.now()
+    today = now.date()
+    daily_cutoff = today - timedelta(days=ARCHIVE_CONFIG['daily_days'])
+
+    keep = set()
+    latest = {}
+    for item in items:
+        day = item['created_at'].date()
+        if day >= today:
+            keep.add(item['path'])
+            continue
+        if day > daily_cutoff:
+            bucket = (item['kind'], 'day', day.isoformat())
+        else:
+            year, week, _ = day.isocalendar()
+            bucket = (item['kind'], 'week', f'{year}-{week:02d}')
+        if bucket not in latest or item['created_at'] > latest[bucket]['created_at']:
+            latest[bucket] = item
+
+    keep.update(item['path'] for item in latest.values())
+    return keep
+
+
+class ArchiveStore:
+    def __init__(self, root: str = None, catalog: SnapshotCatalog = None):
+        self.root = root or ARCHIVE_CONFIG['dir']
+        self.restore_dir = ARCHIVE_CONFIG['restore_dir']
+        self.catalog = catalog or get_catalog()
+        self.codec = 'zstd' if zstandard is not None else 'zlib'
+        with closing(self.catalog.connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _object_path(self, checksum: str, codec: str) -> str:
+        return os.path.join(self.root, checksum[:2], checksum + CODEC_SUFFIX[codec])
+
+    def get_entry(self, path: str) -> Optional[Dict]:
+        with closing(self.catalog.connect()) as conn:
+            row = conn.execute('SELECT * FROM archive_entries WHERE path = ?',
+                               (os.path.normpath(path),)).fetchone()
+            return dict(row) if row else None
+
+    def entries(self) -> List[Dict]:
+        with closing(self.catalog.connect()) as conn:
+            return [dict(row) for row in conn.execute('SELECT * FROM archive_entries')]
+
+    def archive(self, path: str, kind: str, created_at: str) -> Dict:
+        """把文件或快照目录存入归档并删除原文件，返回归档记录"""
+        path = os.path.normpath(path)
+        is_dir = os.path.isdir(path)
+        if is_dir:
+            data = _pack_dir(path)
+        else:
+            with open(path, 'rb') as f:
+                data = f.read()
+        checksum = hashlib.sha256(data).hexdigest()
+
+        # 相同内容已归档过（任一编码）时直接复用
+        codec = next((c for c in CODEC_SUFFIX if os.path.exists(self._object_path(checksum, c))), None)
+        stored = codec is not None
+        if not stored:
+            codec = self.codec
+            object_path = self._object_path(checksum, codec)
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            with open(object_path + '.tmp', 'wb') as f:
+                f.write(_compress(data, codec))
+            os.replace(object_path + '.tmp', object_path)
+
+        entry = {
+            'path': path, 'kind': kind, 'created_at': created_at, 'checksum': checksum, 'codec': codec,
+            'is_dir': int(is_dir), 'size': len(data), 'archived_at': datetime.now().isoformat()
+        }
+        with closing(self.catalog.connect()) as conn, conn:
+            conn.execute('INSERT OR REPLACE INTO archive_entries VALUES '
+                         '(:path, :kind, :created_at, :checksum, :codec, :is_dir, :size, :archived_at)', entry)
+
+        if is_dir:
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+        entry['deduplicated'] = stored
+        return entry
+
+    def restore(self, path: str, target: str = None) -> str:
+        """把归档的文件还原到 target（默认 restore_dir 下同名），返回还原后的路径"""
+        entry = self.get_entry(path)
+        if entry is None:
+            raise FileNotFoundError(f"归档中没有 {path}")
+
+        target = target or os.path.join(self.restore_dir, os.path.basename(entry['path']))
+        if os.path.exists(target):
+            return target
+
+        with open(self._object_path(entry['checksum'], entry['codec']), 'rb') as f:
+            data = _decompress(f.read(), entry['codec'])
+
+        tmp_target = target + '.tmp'
+        if entry['is_dir']:
+            if os.path.exists(tmp_target):
+                shutil.rmtree(tmp_target)
+            _unpack_dir(data, tmp_target)
+        else:
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+            with open(tmp_target, 'wb') as f:
+                f.write(data)
+        os.rename(tmp_target, target)
+        return target
+
+    def drop(self, path: str):
+        with closing(self.catalog.connect()) as conn, conn:
+            conn.execute('DELETE FROM archive_entries WHERE path = ?', (os.path.normpath(path),))
+
+    def gc(self) -> int:
+        """删除没有任何记录引用的归档对象"""
+        referenced = {self._object_path(e['checksum'], e['codec']) for e in self.entries()}
+        removed = 0
+        if not os.path.isdir(self.root):
+            return removed
+        for prefix in os.listdir(self.root):
+            prefix_dir = os.path.join(self.root, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                object_path = os.path.join(prefix_dir, name)
+                if object_path not in referenced:
+                    os.remove(object_path)
+                    removed += 1
+        return removed
+
+    def stored_bytes(self) -> int:
+        return path_size(self.root) if os.path.isdir(self.root) else 0
+
+    def compact(self, data_dir: str = 'data', now: datetime = None, dry_run: bool = False) -> Dict:
+        """按保留策略整理 data_dir，返回统计"""
+        now = now or datetime.now()
+        stats = {'kept': 0, 'archived': 0, 'deduplicated': 0, 'pruned': 0,
+                 'bytes_before': self.stored_bytes(), 'bytes_after': 0}
+
+        live = []
+        for filename in sorted(os.listdir(data_dir)):
+            kind = kind_from_filename(filename)
+            path = os.path.normpath(os.path.join(data_dir, filename))
+            if kind is None or filename.endswith('.tmp'):
+                continue
+            created_at = created_at_from_filename(filename) or \
+                datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+            live.append({'path': path, 'kind': kind, 'created_at': datetime.fromisoformat(created_at)})
+
+        archived = [dict(e, created_at=datetime.fromisoformat(e['created_at'])) for e in self.entries()]
+        keep = retention_keep(live + archived, now)
+
+        sizes = {item['path']: path_size(item['path']) for item in live}
+
+        # 增量快照依赖同一天的关键帧，先全部还原为完整快照再归档，归档后的文件各自独立
+        if not dry_run:
+            for item in live:
+                if item['path'] in keep and item['created_at'].date() < now.date() and is_snapshot(item['path']):
+                    materialize(item['path'])
+
+        for item in live:
+            path = item['path']
+            size = sizes[path]
+            stats['bytes_before'] += size
+
+            if item['created_at'].date() >= now.date():
+                stats['kept'] += 1
+                stats['bytes_after'] += size
+                continue
+            if dry_run:
+                stats['archived' if path in keep else 'pruned'] += 1
+                continue
+
+            if path in keep:
+                entry = self.archive(path, item['kind'], item['created_at'].isoformat())
+                stats['archived'] += 1
+                stats['deduplicated'] += int(entry['deduplicated'])
+            else:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+                self.catalog.unregister(path)
+                stats['pruned'] += 1
+
+        for entry in archived:
+            if entry['path'] not in keep:
+                stats['pruned'] += 1
+                if not dry_run:
+                    self.drop(entry['path'])
+                    self.catalog.unregister(entry['path'])
+
+        if not dry_run:
+            stats['objects_removed'] = self.gc()
+            stats['bytes_after'] += self.stored_bytes()
+
+        logger.info(f"归档整理{'（预演）' if dry_run else ''}: 保留当天 {stats['kept']} 个, "
+                    f"归档 {stats['archived']} 个 (其中内容重复 {stats['deduplicated']} 个), "
+                    f"删除 {stats['pruned']} 个, 占用 {stats['bytes_before'] / 1024:.0f} KB -> "
+                    f"{stats['bytes_after'] / 1024:.0f} KB")
+        return stats
+
+
+def resolve_path(path: str) -> str:
+    """文件还在原处时原样返回，已归档时还原后返回还原的路径"""
+    if not path or os.path.exists(path):
+        return path
+    try:
+        store = ArchiveStore()
+        if store.get_entry(path) is not None:
+            restored = store.restore(path)
+            logger.info(f"从归档读回: {path} -> {restored}")
+            return restored
+    except Exception as e:
+        logger.warning(f"从归档读回失败 {path}: {e}")
+    return path
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ''
+    args = [arg for arg in sys.argv[2:] if not arg.startswith('--')]
+
+    if command == 'compact':
+        ArchiveStore().compact(args[0] if args else 'data', dry_run='--dry-run' in sys.argv)
+    elif command == 'restore' and args:
+        print(ArchiveStore().restore(args[0]))
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,242 @@
+"""
+本地增量K线存储
+
+按 市场/代码 保存历史K线，每次只下载最后一个交易日之后的数据并追加为新分段，
+分段过多时自动合并。除权除息等公司行为发生后可以清除单只股票重新下载。
+
+用法:
+    python -m src.storage.bar_store compact [market]
+    python -m src.storage.bar_store invalidate <market> <symbol>
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+from config.config import STORAGE_CONFIG
+from src.storage.columnar import read_table, write_table
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class BarStore:
+    def __init__(self, root_dir: str = None):
+        self.root_dir = root_dir or STORAGE_CONFIG['bar_store_dir']
+        self.refresh_interval = timedelta(minutes=STORAGE_CONFIG['bar_refresh_minutes'])
+        self.backfill_tolerance = timedelta(days=STORAGE_CONFIG['bar_backfill_tolerance_days'])
+        self.max_segments = STORAGE_CONFIG['bar_max_segments']
+        self._locks = defaultdict(threading.RLock)
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, market: str, symbol: str):
+        with self._locks_guard:
+            return self._locks[(market, symbol)]
+
+    def _symbol_dir(self, market: str, symbol: str) -> str:
+        safe_symbol = re.sub(r'[^0-9A-Za-z._-]', '_', str(symbol))
+        return os.path.join(self.root_dir, market, safe_symbol)
+
+    def _meta_path(self, market: str, symbol: str) -> str:
+        return os.path.join(self._symbol_dir(market, symbol), 'meta.json')
+
+    def _load_meta(self, market: str, symbol: str) -> dict:
+        path = self._meta_path(market, symbol)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_meta(self, market: str, symbol: str, meta: dict):
+        path = self._meta_path(market, symbol)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def _segments(self, market: str, symbol: str) -> List[str]:
+        directory = self._symbol_dir(market, symbol)
+        if not os.path.isdir(directory):
+            return []
+        files = sorted(f for f in os.listdir(directory) if f.startswith('seg_') and f.endswith('.npz'))
+        return [os.path.join(directory, f) for f in files]
+
+    @staticmethod
+    def _dates(df: pd.DataFrame, date_column: Optional[str]) -> pd.DatetimeIndex:
+        values = df[date_column] if date_column else df.index
+        dates = pd.DatetimeIndex(pd.to_datetime(values))
+        if dates.tz is not None:
+            dates = dates.tz_localize(None)
+        return dates
+
+    def _read(self, market: str, symbol: str, date_column: Optional[str]) -> pd.DataFrame:
+        segments = self._segments(market, symbol)
+        if not segments:
+            return pd.DataFrame()
+
+        frames = [read_table(path) for path in segments]
+        df = pd.concat(frames) if len(frames) > 1 else frames[0]
+
+        # 后写入的分段覆盖同一交易日的旧数据（例如盘中未收盘的K线）
+        dates = self._dates(df, date_column)
+        keep = ~dates.duplicated(keep='last')
+        df = df[keep]
+        df = df.iloc[self._dates(df, date_column).argsort(kind='stable')]
+        return df.reset_index(drop=True) if date_column else df
+
+    def load(self, market: str, symbol: str, start_date=None) -> pd.DataFrame:
+        """读取本地保存的K线"""
+        meta = self._load_meta(market, symbol)
+        date_column = meta.get('date_column')
+        df = self._read(market, symbol, date_column)
+
+        if start_date is not None and not df.empty:
+            mask = self._dates(df, date_column) >= pd.Timestamp(start_date)
+            df = df[mask]
+            if date_column:
+                df = df.reset_index(drop=True)
+        return df
+
+    def last_date(self, market: str, symbol: str) -> Optional[pd.Timestamp]:
+        meta = self._load_meta(market, symbol)
+        return pd.Timestamp(meta['last_date']) if meta.get('last_date') else None
+
+    def append(self, market: str, symbol: str, df: pd.DataFrame, date_column: str = None) -> int:
+        """追加一段K线，返回写入行数"""
+        if df is None or df.empty:
+            return 0
+
+        directory = self._symbol_dir(market, symbol)
+        os.makedirs(directory, exist_ok=True)
+
+        meta = self._load_meta(market, symbol)
+        segments = self._segments(market, symbol)
+        next_id = int(os.path.basename(segments[-1])[4:-4]) + 1 if segments else 0
+        write_table(os.path.join(directory, f'seg_{next_id:06d}.npz'), df)
+
+        dates = self._dates(df, date_column)
+        first_date = dates.min()
+        if meta.get('first_date'):
+            first_date = min(first_date, pd.Timestamp(meta['first_date']))
+        last_date = dates.max()
+        if meta.get('last_date'):
+            last_date = max(last_date, pd.Timestamp(meta['last_date']))
+
+        meta.update({
+            'market': market,
+            'symbol': symbol,
+            'date_column': date_column,
+            'first_date': first_date.isoformat(),
+            'last_date': last_date.isoformat(),
+            'segments': len(segments) + 1,
+            'updated_at': datetime.now().isoformat()
+        })
+        self._save_meta(market, symbol, meta)
+
+        if meta['segments'] > self.max_segments:
+            self._compact_symbol(market, symbol)
+
+        return len(df)
+
+    def _compact_symbol(self, market: str, symbol: str):
+        meta = self._load_meta(market, symbol)
+        segments = self._segments(market, symbol)
+        if len(segments) <= 1:
+            return
+
+        df = self._read(market, symbol, meta.get('date_column'))
+        directory = self._symbol_dir(market, symbol)
+        merged_path = os.path.join(directory, 'seg_000000.npz.compact')
+        write_table(merged_path, df)
+        for path in segments:
+            os.remove(path)
+        os.replace(merged_path, os.path.join(directory, 'seg_000000.npz'))
+
+        meta['segments'] = 1
+        self._save_meta(market, symbol, meta)
+        logger.info(f"K线分段已合并 {market}/{symbol}: {len(segments)} -> 1")
+
+    def compact(self, market: str = None, symbol: str = None):
+        """合并分段文件"""
+        if market and symbol:
+            targets = [(market, symbol)]
+        else:
+            markets = [market] if market else (os.listdir(self.root_dir) if os.path.isdir(self.root_dir) else [])
+            targets = []
+            for m in markets:
+                market_dir = os.path.join(self.root_dir, m)
+                if os.path.isdir(market_dir):
+                    for s in os.listdir(market_dir):
+                        meta_path = os.path.join(market_dir, s, 'meta.json')
+                        if os.path.exists(meta_path):
+                            with open(meta_path, 'r', encoding='utf-8') as f:
+                                targets.append((m, json.load(f).get('symbol', s)))
+
+        for m, s in targets:
+            with self._lock(m, s):
+                self._compact_symbol(m, s)
+
+    def invalidate(self, market: str, symbol: str):
+        """清除单只股票的本地数据（除权除息后调用），下次访问时全量重新下载"""
+        with self._lock(market, symbol):
+            directory = self._symbol_dir(market, symbol)
+            if os.path.isdir(directory):
+                shutil.rmtree(directory)
+                logger.info(f"已清除本地K线 {market}/{symbol}")
+
+    def get_bars(self, market: str, symbol: str, fetch_func: Callable, start_date,
+                 date_column: str = None) -> pd.DataFrame:
+        """
+        读取 start_date 之后的K线，本地缺失的部分通过 fetch_func(start) 增量下载
+
+        fetch_func 接收 pd.Timestamp 类型的起始日期，返回与原始接口相同格式的 DataFrame
+        """
+        start = pd.Timestamp(start_date)
+
+        with self._lock(market, symbol):
+            meta = self._load_meta(market, symbol)
+            first_date = pd.Timestamp(meta['first_date']) if meta.get('first_date') else None
+            last_date = pd.Timestamp(meta['last_date']) if meta.get('last_date') else None
+
+            if first_date is None or first_date > start + self.backfill_tolerance:
+                df = fetch_func(start)
+                if df is not None and not df.empty:
+                    self.invalidate(market, symbol)
+                    self.append(market, symbol, df, date_column)
+                    logger.info(f"全量下载K线 {market}/{symbol}: {len(df)} 条")
+                return df if df is not None else pd.DataFrame()
+
+            updated_at = datetime.fromisoformat(meta['updated_at'])
+            if datetime.now() - updated_at >= self.refresh_interval:
+                # 从最后一个交易日开始下载，覆盖可能未收盘的K线
+                df = fetch_func(last_date)
+                if df is not None and not df.empty:
+                    rows = self.append(market, symbol, df, date_column)
+                    logger.info(f"增量更新K线 {market}/{symbol}: {rows} 条")
+                else:
+                    meta['updated_at'] = datetime.now().isoformat()
+                    self._save_meta(market, symbol, meta)
+
+            return self.load(market, symbol, start)
+
+
+if __name__ == "__main__":
+    store = BarStore()
+    command = sys.argv[1] if len(sys.argv) > 1 else ''
+
+    if command == 'compact':
+        store.compact(sys.argv[2] if len(sys.argv) > 2 else None)
+    elif command == 'invalidate' and len(sys.argv) == 4:
+        store.invalidate(sys.argv[2], sys.argv[3])
+    else:
+        print(__doc__)
+        sys.exit(1)
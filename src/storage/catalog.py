@@ -0,0 +1,236 @@
+"""
+数据文件目录（SQLite）
+
+每次写出市场数据快照、推荐结果、热点结果时登记一条记录：类型、路径、时间、大小、校验和，
+以及每个市场的行数。查找最新或历史快照走 (kind, created_at) 索引，不再扫描 data/ 目录
+
+用法: python -m src.storage.catalog rebuild [data_dir]   # 为已有文件补登记
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config.config import CATALOG_CONFIG
+from src.storage.snapshot import LazyRecords
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MARKETS_KEYS = ('cn', 'hk', 'us')
+
+# 文件名前缀 -> 类型，前缀长的在前
+FILE_KINDS = [
+    ('hotspots_report_', 'hotspots_report'),
+    ('market_data_', 'market_data'),
+    ('recommendations_', 'recommendations'),
+    ('hotspots_', 'hotspots'),
+    ('news_', 'news')
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    checksum TEXT NOT NULL,
+    rows INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_kind_created ON artifacts (kind, created_at);
+CREATE INDEX IF NOT EXISTS idx_artifacts_checksum ON artifacts (checksum);
+CREATE TABLE IF NOT EXISTS artifact_markets (
+    artifact_id INTEGER NOT NULL REFERENCES artifacts (id) ON DELETE CASCADE,
+    market TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    PRIMARY KEY (artifact_id, market)
+);
+CREATE INDEX IF NOT EXISTS idx_artifact_markets_market ON artifact_markets (market, rows);
+"""
+
+
+def file_checksum(path: str) -> str:
+    """文件或快照目录的 sha256"""
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            digest.update(name.encode('utf-8'))
+            digest.update(bytes.fromhex(file_checksum(os.path.join(path, name))))
+        return digest.hexdigest()
+
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def path_size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(path_size(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def count_rows(node) -> int:
+    """统计嵌套结构中记录列表的总行数"""
+    if isinstance(node, dict):
+        return sum(count_rows(value) for value in node.values())
+    if isinstance(node, (list, tuple, LazyRecords)):
+        return len(node)
+    return 0
+
+
+def market_rows(data: Dict) -> Dict[str, int]:
+    """市场数据中每个市场的行数"""
+    return {market: count_rows(data.get(market) or {}) for market in MARKETS_KEYS if market in data}
+
+
+def kind_from_filename(filename: str) -> Optional[str]:
+    for prefix, kind in FILE_KINDS:
+        if filename.startswith(prefix):
+            return kind
+    return None
+
+
+def created_at_from_filename(filename: str) -> Optional[str]:
+    match = re.search(r'(\d{8})_(\d{6})', filename)
+    if not match:
+        return None
+    return datetime.strptime(''.join(match.groups()), '%Y%m%d%H%M%S').isoformat()
+
+
+class SnapshotCatalog:
+    def __init__(self, path: str = None):
+        self.path = path or CATALOG_CONFIG['path']
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with closing(self.connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA foreign_keys = ON')
+        return conn
+
+    def register(self, kind: str, path: str, markets: Dict[str, int] = None, rows: int = None,
+                 created_at: str = None) -> int:
+        """登记一个刚写出的文件，同一路径重复登记时覆盖"""
+        markets = markets or {}
+        rows = sum(markets.values()) if rows is None else rows
+        created_at = created_at or datetime.now().isoformat()
+        path = os.path.normpath(path)
+
+        with self._lock, closing(self.connect()) as conn, conn:
+            conn.execute('DELETE FROM artifacts WHERE path = ?', (path,))
+            cursor = conn.execute(
+                'INSERT INTO artifacts (kind, path, created_at, size, checksum, rows) VALUES (?, ?, ?, ?, ?, ?)',
+                (kind, path, created_at, path_size(path), file_checksum(path), rows)
+            )
+            artifact_id = cursor.lastrowid
+            conn.executemany(
+                'INSERT INTO artifact_markets (artifact_id, market, rows) VALUES (?, ?, ?)',
+                [(artifact_id, market, count) for market, count in markets.items()]
+            )
+        return artifact_id
+
+    def unregister(self, path: str):
+        with self._lock, closing(self.connect()) as conn, conn:
+            conn.execute('DELETE FROM artifacts WHERE path = ?', (os.path.normpath(path),))
+
+    def latest(self, kind: str, market: str = None, before: str = None) -> Optional[Dict]:
+        """
+        最新的一条记录
+
+        market 指定时只返回该市场有数据（行数 > 0）的记录，before 为 ISO 时间，用于查历史快照
+        """
+        sql = 'SELECT a.* FROM artifacts a'
+        params = []
+        if market:
+            sql += ' JOIN artifact_markets m ON m.artifact_id = a.id AND m.market = ? AND m.rows > 0'
+            params.append(market)
+        sql += ' WHERE a.kind = ?'
+        params.append(kind)
+        if before:
+            sql += ' AND a.created_at <= ?'
+            params.append(before)
+        sql += ' ORDER BY a.created_at DESC LIMIT 1'
+
+        with closing(self.connect()) as conn:
+            row = conn.execute(sql, params).fetchone()
+            return self._to_dict(conn, row) if row else None
+
+    def history(self, kind: str, limit: int = 20) -> List[Dict]:
+        with closing(self.connect()) as conn:
+            rows = conn.execute('SELECT * FROM artifacts WHERE kind = ? ORDER BY created_at DESC LIMIT ?',
+                                (kind, limit)).fetchall()
+            return [self._to_dict(conn, row) for row in rows]
+
+    def find_by_checksum(self, checksum: str) -> List[Dict]:
+        with closing(self.connect()) as conn:
+            rows = conn.execute('SELECT * FROM artifacts WHERE checksum = ? ORDER BY created_at',
+                                (checksum,)).fetchall()
+            return [self._to_dict(conn, row) for row in rows]
+
+    def _to_dict(self, conn: sqlite3.Connection, row: sqlite3.Row) -> Dict:
+        result = dict(row)
+        result['markets'] = {
+            market: count for market, count in
+            conn.execute('SELECT market, rows FROM artifact_markets WHERE artifact_id = ?', (row['id'],))
+        }
+        return result
+
+    def rebuild(self, data_dir: str = 'data') -> int:
+        """为目录中尚未登记的文件补登记，市场行数需要解析文件，这里只记录总大小和校验和"""
+        with closing(self.connect()) as conn:
+            known = {row['path'] for row in conn.execute('SELECT path FROM artifacts')}
+
+        added = 0
+        for filename in sorted(os.listdir(data_dir)):
+            kind = kind_from_filename(filename)
+            path = os.path.normpath(os.path.join(data_dir, filename))
+            if kind is None or path in known or filename.endswith('.tmp'):
+                continue
+            created_at = created_at_from_filename(filename) or \
+                datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+            self.register(kind, path, created_at=created_at, rows=0)
+            added += 1
+
+        logger.info(f"数据目录补登记 {added} 个文件")
+        return added
+
+
+_catalog = None
+_catalog_guard = threading.Lock()
+
+
+def get_catalog() -> SnapshotCatalog:
+    """进程内共享的数据文件目录"""
+    global _catalog
+    with _catalog_guard:
+        if _catalog is None:
+            _catalog = SnapshotCatalog()
+        return _catalog
+
+
+def register_artifact(kind: str, path: str, markets: Dict[str, int] = None, rows: int = None):
+    """登记文件，目录出错时只记日志，不影响文件本身的写出"""
+    try:
+        get_catalog().register(kind, path, markets=markets, rows=rows)
+    except Exception as e:
+        logger.warning(f"登记数据文件失败 {path}: {e}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == 'rebuild':
+        SnapshotCatalog().rebuild(sys.argv[2] if len(sys.argv) > 2 else 'data')
+    else:
+        print(__doc__)
+        sys.exit(1)
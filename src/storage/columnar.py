@@ -0,0 +1,158 @@
+"""
+列式表存储
+
+每张表保存为一个 .npz 文件，每列对应一个数组，读取时按列加载
+"""
+
+import json
+import os
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+SCHEMA_KEY = '__schema__'
+
+
+def _encode_column(series: pd.Series):
+    """将一列编码为 (类型, 数组, 空值掩码)"""
+    if pd.api.types.is_bool_dtype(series) and not series.isna().any():
+        return 'bool', series.to_numpy(dtype=bool), None
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = pd.to_datetime(series)
+        if getattr(values.dt, 'tz', None) is not None:
+            values = values.dt.tz_localize(None)
+        mask = values.isna().to_numpy()
+        return 'datetime', values.to_numpy(dtype='datetime64[ns]').view('int64'), mask
+
+    if pd.api.types.is_numeric_dtype(series):
+        if pd.api.types.is_integer_dtype(series) and not series.isna().any():
+            return 'int', series.to_numpy(dtype='int64'), None
+        return 'float', series.to_numpy(dtype='float64', na_value=np.nan), None
+
+    mask = series.isna().to_numpy()
+    present = series[~mask]
+
+    if len(present) and all(isinstance(v, date) and not isinstance(v, datetime) for v in present):
+        values = pd.to_datetime(series).to_numpy(dtype='datetime64[ns]').view('int64')
+        return 'date', values, mask
+
+    if len(present) and all(isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in present):
+        return 'float', pd.to_numeric(series).to_numpy(dtype='float64', na_value=np.nan), None
+
+    values = np.array(['' if m else str(v) for v, m in zip(series.tolist(), mask)], dtype=np.str_)
+    return 'str', values, mask
+
+
+def _decode_column(kind: str, values: np.ndarray, mask: Optional[np.ndarray]):
+    if kind == 'datetime':
+        result = pd.Series(values.view('datetime64[ns]'))
+        if mask is not None and mask.any():
+            result[mask] = pd.NaT
+        return result
+
+    if kind == 'date':
+        result = pd.Series(values.view('datetime64[ns]')).dt.date.astype(object)
+        if mask is not None and mask.any():
+            result[mask] = None
+        return result
+
+    if kind == 'str':
+        result = pd.Series(values, dtype=object)
+        if mask is not None and mask.any():
+            result[mask] = None
+        return result
+
+    return pd.Series(values)
+
+
+def _encode_label(label):
+    if isinstance(label, tuple):
+        return list(label)
+    if isinstance(label, (np.integer, np.floating)):
+        return label.item()
+    return label
+
+
+def _decode_label(label):
+    return tuple(label) if isinstance(label, list) else label
+
+
+def write_table(path: str, df: pd.DataFrame, compress: bool = True) -> str:
+    """保存 DataFrame 为列式文件"""
+    schema = {
+        'rows': len(df),
+        'columns': [],
+        'column_names': list(df.columns.names) if isinstance(df.columns, pd.MultiIndex) else None,
+        'index': None
+    }
+    arrays = {}
+
+    for i in range(df.shape[1]):
+        kind, values, mask = _encode_column(df.iloc[:, i])
+        key = f'c{i}'
+        arrays[key] = values
+        if mask is not None and mask.any():
+            arrays[f'{key}_mask'] = mask
+        schema['columns'].append({'name': _encode_label(df.columns[i]), 'key': key, 'kind': kind})
+
+    if not isinstance(df.index, pd.RangeIndex):
+        kind, values, mask = _encode_column(df.index.to_series(index=range(len(df))))
+        arrays['index'] = values
+        if mask is not None and mask.any():
+            arrays['index_mask'] = mask
+        schema['index'] = {'name': _encode_label(df.index.name), 'kind': kind}
+
+    arrays[SCHEMA_KEY] = np.array(json.dumps(schema, ensure_ascii=False))
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        if compress:
+            np.savez_compressed(f, **arrays)
+        else:
+            np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_schema(path: str) -> Dict:
+    """只读取表结构"""
+    with np.load(path, allow_pickle=False) as npz:
+        return json.loads(str(npz[SCHEMA_KEY]))
+
+
+def read_table(path: str, columns: Optional[List] = None) -> pd.DataFrame:
+    """读取列式文件，columns 指定时只解码需要的列"""
+    with np.load(path, allow_pickle=False) as npz:
+        schema = json.loads(str(npz[SCHEMA_KEY]))
+        members = set(npz.files)
+
+        wanted = None if columns is None else set(columns)
+        names = []
+        data = {}
+        for i, col in enumerate(schema['columns']):
+            name = _decode_label(col['name'])
+            if wanted is not None and name not in wanted:
+                continue
+            key = col['key']
+            mask = npz[f'{key}_mask'] if f'{key}_mask' in members else None
+            names.append(name)
+            data[i] = _decode_column(col['kind'], npz[key], mask)
+
+        index = None
+        if schema.get('index'):
+            mask = npz['index_mask'] if 'index_mask' in members else None
+            index = pd.Index(_decode_column(schema['index']['kind'], npz['index'], mask),
+                             name=_decode_label(schema['index']['name']))
+
+    df = pd.DataFrame(data, index=range(schema['rows']))
+    if schema.get('column_names') and names:
+        df.columns = pd.MultiIndex.from_tuples(names, names=schema['column_names'])
+    else:
+        df.columns = names
+    if index is not None:
+        df.index = index
+    return df
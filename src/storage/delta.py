@@ -0,0 +1,168 @@
+"""
+快照表的增量编码
+
+以关键帧中的同名表为基准，按股票代码对齐后逐列比较，只保存发生变化的单元格
+（行号 + 新值），名称、代码这类几乎不变的列基本不占空间。读取时用关键帧的值补齐未变化的单元格
+"""
+
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.storage.columnar import SCHEMA_KEY, _decode_column, _decode_label, _encode_column, _encode_label, read_table
+
+# 依次尝试的主键列，取第一个存在且不重复的列
+KEY_COLUMNS = ['代码', 'code', '板块名称', '板块']
+
+
+def find_key(df: pd.DataFrame) -> Optional[str]:
+    for column in KEY_COLUMNS:
+        if column in df.columns and not df[column].isna().any() and df[column].is_unique:
+            return column
+    return None
+
+
+def changed_rows(base: pd.DataFrame, df: pd.DataFrame, key: str) -> Dict:
+    """
+    按主键对齐后逐列比较，返回 {列名: 变化的行号数组}
+
+    基准中没有的行（新增代码）在所有列上都算变化，基准中没有的列整列算变化
+    """
+    aligned = base.set_index(key).reindex(df[key].to_numpy())
+    present = df[key].isin(base[key]).to_numpy()
+    all_rows = np.arange(len(df))
+
+    result = {}
+    for column in df.columns:
+        if column == key:
+            continue
+        if column not in aligned.columns:
+            result[column] = all_rows
+            continue
+
+        new = df[column].reset_index(drop=True)
+        old = aligned[column].reset_index(drop=True)
+        try:
+            same = (new.eq(old) | (new.isna() & old.isna())).to_numpy(dtype=bool)
+        except Exception:
+            same = np.zeros(len(df), dtype=bool)
+        result[column] = np.flatnonzero(~(same & present))
+    return result
+
+
+def _cast(series: pd.Series, kind: str) -> pd.Series:
+    if kind == 'int':
+        return series.astype('int64')
+    if kind == 'float':
+        return pd.to_numeric(series).astype('float64')
+    if kind == 'bool':
+        return series.astype(bool)
+    if kind == 'datetime':
+        return pd.to_datetime(series)
+    return series.astype(object)
+
+
+def write_delta_table(path: str, df: pd.DataFrame, base: pd.DataFrame, key: str,
+                      compress: bool = True) -> int:
+    """保存 df 相对 base 的增量，返回保存的单元格数"""
+    changes = changed_rows(base, df, key)
+    schema = {'rows': len(df), 'key': _encode_label(key), 'columns': []}
+    arrays = {}
+    cells = len(df)
+
+    for i, column in enumerate(df.columns):
+        col_key = f'c{i}'
+        if column == key:
+            kind, values, mask = _encode_column(df[column])
+            arrays['keys'] = values
+            if mask is not None and mask.any():
+                arrays['keys_mask'] = mask
+            schema['columns'].append({'name': _encode_label(column), 'key': col_key, 'kind': kind, 'is_key': True})
+            continue
+
+        # 列的类型按整列判断，解码后据此还原 dtype
+        kind = _encode_column(df[column])[0]
+        idx = changes[column]
+        sub_kind, values, mask = _encode_column(df[column].iloc[idx].reset_index(drop=True))
+        arrays[f'{col_key}_idx'] = idx.astype(np.int32)
+        arrays[col_key] = values
+        if mask is not None and mask.any():
+            arrays[f'{col_key}_mask'] = mask
+        schema['columns'].append({'name': _encode_label(column), 'key': col_key, 'kind': kind, 'sub_kind': sub_kind})
+        cells += len(idx)
+
+    arrays[SCHEMA_KEY] = np.array(json.dumps(schema, ensure_ascii=False))
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        if compress:
+            np.savez_compressed(f, **arrays)
+        else:
+            np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+    return cells
+
+
+def read_delta_table(path: str, base_path: str, columns: Optional[List] = None) -> pd.DataFrame:
+    """用关键帧 base_path 还原增量表，columns 指定时只还原需要的列"""
+    with np.load(path, allow_pickle=False) as npz:
+        schema = json.loads(str(npz[SCHEMA_KEY]))
+        members = set(npz.files)
+        key = _decode_label(schema['key'])
+        key_spec = next(col for col in schema['columns'] if col.get('is_key'))
+        keys = _decode_column(key_spec['kind'], npz['keys'], npz['keys_mask'] if 'keys_mask' in members else None)
+
+        wanted = None if columns is None else set(columns)
+        specs = [col for col in schema['columns']
+                 if wanted is None or _decode_label(col['name']) in wanted]
+        needed = [key] + [_decode_label(col['name']) for col in specs if not col.get('is_key')]
+        base = read_table(base_path, needed)
+        aligned = base.set_index(key).reindex(keys.to_numpy())
+
+        data = {}
+        for col in specs:
+            name = _decode_label(col['name'])
+            if col.get('is_key'):
+                data[name] = keys
+                continue
+
+            col_key = col['key']
+            if name in aligned.columns:
+                series = aligned[name].reset_index(drop=True).astype(object)
+            else:
+                series = pd.Series([None] * schema['rows'], dtype=object)
+            idx = npz[f'{col_key}_idx']
+            if len(idx):
+                mask = npz[f'{col_key}_mask'] if f'{col_key}_mask' in members else None
+                changed = _decode_column(col['sub_kind'], npz[col_key], mask)
+                series.iloc[idx] = changed.astype(object).to_numpy()
+            data[name] = _cast(series, col['kind'])
+
+    return pd.DataFrame(data, index=range(schema['rows']))
+
+
+def diff_tables(old: pd.DataFrame, new: pd.DataFrame, key: str = None) -> Dict:
+    """
+    两张表之间的变化
+
+    返回 added / removed（代码列表）和 changed：以代码为索引、只含有变化的列的表，
+    未变化的单元格为 NaN
+    """
+    key = key or find_key(new)
+    if key is None or key not in old.columns:
+        raise ValueError("表中没有可用的主键列")
+
+    added = new.loc[~new[key].isin(old[key]), key].tolist()
+    removed = old.loc[~old[key].isin(new[key]), key].tolist()
+
+    common = new[new[key].isin(old[key])].reset_index(drop=True)
+    changes = changed_rows(old, common, key)
+    changed = {column: common[column].iloc[idx].set_axis(common[key].iloc[idx].to_numpy())
+               for column, idx in changes.items() if len(idx)}
+    changed_df = pd.DataFrame(changed)
+    changed_df.index.name = key
+    return {'added': added, 'removed': removed, 'changed': changed_df}
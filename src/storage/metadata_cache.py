@@ -0,0 +1,137 @@
+"""
+股票基本信息磁盘缓存
+
+每个字段单独记录获取时间并按字段设置有效期（名称、行业按月，市值按天），
+支持对整个关注列表批量预热，并统计命中率
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from config.config import METADATA_CACHE_CONFIG
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class MetadataCache:
+    def __init__(self, path: str = None, field_ttl_hours: Dict = None, default_ttl_hours: float = None):
+        self.path = path or METADATA_CACHE_CONFIG['path']
+        self.field_ttl_hours = METADATA_CACHE_CONFIG['field_ttl_hours'] if field_ttl_hours is None \
+            else field_ttl_hours
+        self.default_ttl_hours = METADATA_CACHE_CONFIG['default_ttl_hours'] if default_ttl_hours is None \
+            else default_ttl_hours
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self) -> Dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"读取股票信息缓存失败: {e}")
+            return {}
+
+    def save(self):
+        with self._lock:
+            entries = dict(self._entries)
+            self._dirty = False
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, self.path)
+
+    def flush(self):
+        """有未保存的修改时写盘，写盘失败只记录日志，内存中的缓存不受影响"""
+        if not self._dirty:
+            return
+        try:
+            self.save()
+        except Exception as e:
+            self._dirty = True
+            logger.warning(f"保存股票信息缓存失败: {e}")
+
+    def _ttl_seconds(self, field: str) -> float:
+        return self.field_ttl_hours.get(field, self.default_ttl_hours) * 3600
+
+    def _is_fresh(self, entry: Dict, fields: Optional[List[str]]) -> bool:
+        now = time.time()
+        fetched_at = entry['fetched_at']
+        if fields is None:
+            # 未指定字段时只看设置了有效期的字段，.info 中其余上百个字段不按默认有效期触发重新获取
+            fields = [field for field in self.field_ttl_hours if field in fetched_at] or list(fetched_at)
+        for field in fields:
+            if field not in fetched_at:
+                return False
+            if now - fetched_at[field] >= self._ttl_seconds(field):
+                return False
+        return bool(fetched_at)
+
+    def get(self, symbol: str, fields: List[str] = None) -> Optional[Dict]:
+        """
+        fields 中的字段都在有效期内时返回缓存的信息，否则返回 None；
+        fields 为 None 时只检查 field_ttl_hours 中设置了有效期的字段
+        """
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is not None and self._is_fresh(entry, fields):
+                self.hits += 1
+                return dict(entry['info'])
+            self.misses += 1
+            return None
+
+    def put(self, symbol: str, info: Dict):
+        if not info:
+            return
+        now = time.time()
+        with self._lock:
+            entry = self._entries.setdefault(symbol, {'info': {}, 'fetched_at': {}})
+            entry['info'].update(info)
+            entry['fetched_at'].update({field: now for field in info})
+            self._dirty = True
+
+    def get_many(self, symbols: List[str], fetch_func: Callable[[List[str]], Dict[str, Dict]],
+                 fields: List[str] = None) -> Dict[str, Dict]:
+        """批量获取，缓存缺失或过期的部分通过 fetch_func 一次性获取"""
+        result = {}
+        missing = []
+        for symbol in symbols:
+            info = self.get(symbol, fields)
+            if info is None:
+                missing.append(symbol)
+            else:
+                result[symbol] = info
+
+        if missing:
+            fetched = fetch_func(missing)
+            for symbol, info in fetched.items():
+                self.put(symbol, info)
+                result[symbol] = info
+            self.flush()
+
+        return {symbol: result[symbol] for symbol in symbols if symbol in result}
+
+    def warm(self, symbols: List[str], fetch_func: Callable[[List[str]], Dict[str, Dict]],
+             fields: List[str] = None) -> int:
+        """预热整个关注列表，返回实际获取的数量"""
+        misses_before = self.misses
+        self.get_many(symbols, fetch_func, fields)
+        return self.misses - misses_before
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def log_stats(self):
+        logger.info(f"股票信息缓存: 命中 {self.hits} 次, 未命中 {self.misses} 次, 命中率 {self.hit_rate:.1%}")
@@ -0,0 +1,228 @@
+"""
+内存映射的价格面板
+
+一个市场的全部K线保存为一个 股票 × 交易日 × OHLCV 的 float64 数组（.npy，np.memmap 打开），
+股票和交易日的下标保存在 meta.json。同一只股票的历史在文件中连续存放，
+get_array/get_frame 直接返回映射区域上的视图，不复制数据；其他进程可以只读打开同一个文件，
+由操作系统按需换页。新交易日原地追加，容量不足时按倍数扩容
+
+同一个面板只允许一个写入方，只读方以 meta.json 中的天数为准，看不到写了一半的交易日
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config.config import STORAGE_CONFIG
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _field_name(column) -> Optional[str]:
+    """列名对应的 FIELDS 字段；yfinance 的多层列名如 ('Close', 'AAPL') 取其中是字段名的一层"""
+    for name in (column if isinstance(column, tuple) else (column,)):
+        for field in FIELDS:
+            if str(name).lower() == field.lower():
+                return field
+    return None
+
+
+def _normalize_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    把 akshare（小写列名 + date 列）和 yfinance（大写列名 + 日期索引，单只下载默认为 (Price, Ticker) 两层列名）
+    的K线统一为 FIELDS 列、日期索引
+    """
+    columns = {}
+    for column in df.columns:
+        field = _field_name(column)
+        if field:
+            columns[field] = column
+
+    dates = df['date'] if 'date' in df.columns else df.index
+    dates = pd.DatetimeIndex(pd.to_datetime(dates))
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+
+    result = pd.DataFrame(
+        {field: pd.to_numeric(df[columns[field]], errors='coerce').to_numpy(dtype='float64') if field in columns
+         else np.full(len(df), np.nan) for field in FIELDS},
+        index=dates.normalize()
+    )
+    return result[~result.index.duplicated(keep='last')].sort_index()
+
+
+class PricePanel:
+    def __init__(self, root_dir: str, readonly: bool = False):
+        self.root_dir = root_dir
+        self.readonly = readonly
+        self.data_path = os.path.join(root_dir, 'panel.npy')
+        self.meta_path = os.path.join(root_dir, 'meta.json')
+        self._lock = threading.Lock()
+
+        self.symbols: List[str] = []
+        self.dates: List[str] = []
+        self._symbol_index: Dict[str, int] = {}
+        self._date_index: Dict[str, int] = {}
+        self._data = None
+
+        if os.path.exists(self.meta_path):
+            self._open()
+        elif readonly:
+            raise FileNotFoundError(f"价格面板不存在: {root_dir}")
+
+    @classmethod
+    def open_readonly(cls, root_dir: str) -> 'PricePanel':
+        """只读打开，供分析器和工作进程共享"""
+        return cls(root_dir, readonly=True)
+
+    def _open(self):
+        with open(self.meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.symbols = meta['symbols']
+        self.dates = meta['dates']
+        self._symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._date_index = {day: i for i, day in enumerate(self.dates)}
+        self._data = np.load(self.data_path, mmap_mode='r' if self.readonly else 'r+')
+
+    def _save_meta(self):
+        meta = {
+            'fields': FIELDS,
+            'symbols': self.symbols,
+            'dates': self.dates,
+            'capacity': list(self._data.shape[:2])
+        }
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+
+    def _allocate(self, n_symbols: int, n_days: int, date_positions: Optional[np.ndarray] = None):
+        """新建（或扩容重建）数据文件，date_positions 为旧交易日在新文件中的位置"""
+        os.makedirs(self.root_dir, exist_ok=True)
+        tmp_path = self.data_path + '.tmp'
+        data = np.lib.format.open_memmap(tmp_path, mode='w+', dtype='float64',
+                                         shape=(n_symbols, n_days, len(FIELDS)))
+        data[:] = np.nan
+        if self._data is not None:
+            old_symbols, old_days = len(self.symbols), len(self.dates)
+            if date_positions is None:
+                data[:old_symbols, :old_days] = self._data[:old_symbols, :old_days]
+            else:
+                data[:old_symbols, date_positions] = self._data[:old_symbols, :old_days]
+        data.flush()
+        del data
+        os.replace(tmp_path, self.data_path)
+        self._data = np.load(self.data_path, mmap_mode='r+')
+
+    def _ensure_symbol(self, symbol: str) -> int:
+        if symbol in self._symbol_index:
+            return self._symbol_index[symbol]
+
+        capacity_symbols, capacity_days = self._data.shape[:2] if self._data is not None else (0, 0)
+        if len(self.symbols) >= capacity_symbols:
+            self._allocate(max(STORAGE_CONFIG['panel_initial_symbols'], capacity_symbols * 2),
+                           max(STORAGE_CONFIG['panel_initial_days'], capacity_days))
+        self._symbol_index[symbol] = len(self.symbols)
+        self.symbols.append(symbol)
+        return self._symbol_index[symbol]
+
+    def _ensure_dates(self, dates: pd.DatetimeIndex):
+        new_days = sorted(set(dates.strftime('%Y-%m-%d')) - set(self._date_index))
+        if not new_days:
+            return
+
+        capacity_symbols, capacity_days = self._data.shape[:2]
+        n_days = len(self.dates) + len(new_days)
+
+        if not self.dates or new_days[0] > self.dates[-1]:
+            # 常见情况：只在末尾追加新交易日，容量足够时原地写入
+            if n_days > capacity_days:
+                self._allocate(capacity_symbols, max(capacity_days * 2, n_days))
+            self.dates.extend(new_days)
+        else:
+            # 中间插入交易日（补历史数据）需要重排整个文件
+            merged = sorted(self.dates + new_days)
+            positions = np.searchsorted(np.array(merged), np.array(self.dates))
+            self._allocate(capacity_symbols, max(capacity_days, n_days), date_positions=positions)
+            self.dates = merged
+            logger.info(f"价格面板插入 {len(new_days)} 个历史交易日，已重排: {self.root_dir}")
+
+        self._date_index = {day: i for i, day in enumerate(self.dates)}
+
+    def write_frame(self, symbol: str, df: pd.DataFrame) -> int:
+        """写入一只股票的K线（新交易日追加、已有交易日覆盖），返回写入行数"""
+        if self.readonly:
+            raise PermissionError("价格面板以只读方式打开")
+        if df is None or df.empty:
+            return 0
+
+        bars = _normalize_bars(df)
+        with self._lock:
+            row = self._ensure_symbol(str(symbol))
+            self._ensure_dates(bars.index)
+            positions = np.array([self._date_index[day] for day in bars.index.strftime('%Y-%m-%d')])
+            self._data[row, positions] = bars.to_numpy()
+            self._save_meta()
+        return len(bars)
+
+    def append_day(self, day, values: Dict[str, List[float]]):
+        """追加（或覆盖）一个交易日的全市场数据，values 为 {代码: [open, high, low, close, volume]}"""
+        if self.readonly:
+            raise PermissionError("价格面板以只读方式打开")
+        if not values:
+            return
+        with self._lock:
+            for symbol in values:
+                self._ensure_symbol(str(symbol))
+            self._ensure_dates(pd.DatetimeIndex([pd.Timestamp(day)]))
+            column = self._date_index[pd.Timestamp(day).strftime('%Y-%m-%d')]
+            rows = np.array([self._symbol_index[str(symbol)] for symbol in values])
+            self._data[rows, column] = np.array(list(values.values()), dtype='float64')
+            self._save_meta()
+
+    def flush(self):
+        if self._data is not None and not self.readonly:
+            self._data.flush()
+
+    def __contains__(self, symbol: str) -> bool:
+        return str(symbol) in self._symbol_index
+
+    @property
+    def date_index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.dates)
+
+    def get_array(self, symbol: str) -> np.ndarray:
+        """一只股票的 交易日 × OHLCV 视图（不复制）"""
+        return self._data[self._symbol_index[str(symbol)], :len(self.dates)]
+
+    def get_panel(self, field: str = 'Close') -> np.ndarray:
+        """全部股票某一字段的 股票 × 交易日 视图"""
+        return self._data[:len(self.symbols), :len(self.dates), FIELDS.index(field)]
+
+    def get_frame(self, symbol: str, start_date=None) -> pd.DataFrame:
+        """一只股票的K线，列为 Open/High/Low/Close/Volume，去掉该股票没有数据的交易日"""
+        if str(symbol) not in self._symbol_index:
+            return pd.DataFrame()
+
+        values = self.get_array(symbol)
+        start = 0
+        if start_date is not None:
+            start = int(np.searchsorted(np.array(self.dates), pd.Timestamp(start_date).strftime('%Y-%m-%d')))
+        values = values[start:]
+        valid = ~np.isnan(values[:, FIELDS.index('Close')])
+
+        # 有效交易日连续时直接用视图，否则只复制有效行
+        index = np.flatnonzero(valid)
+        if len(index) and index[-1] - index[0] + 1 == len(index):
+            values = values[index[0]:index[-1] + 1]
+        else:
+            values = values[valid]
+        return pd.DataFrame(values, index=self.date_index[start:][valid], columns=FIELDS, copy=False)
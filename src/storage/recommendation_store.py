@@ -0,0 +1,164 @@
+"""
+推荐结果历史（SQLite）
+
+每次分析写入一个 run，每个 (run, 市场, 代码) 一行，按代码、日期、评分建索引，
+用于查询单只股票的评分变化、连续多日获得同一评级的股票等，不必逐个读取历史 JSON
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, List
+
+import pandas as pd
+
+from config.config import RECOMMENDATION_CONFIG
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MARKETS_KEYS = ('cn', 'hk', 'us')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_at TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    source_file TEXT
+);
+CREATE TABLE IF NOT EXISTS recommendations (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    market TEXT NOT NULL,
+    code TEXT NOT NULL,
+    name TEXT,
+    run_date TEXT NOT NULL,
+    total_score REAL NOT NULL,
+    fundamental_score REAL,
+    technical_score REAL,
+    rating TEXT,
+    action TEXT,
+    current_price REAL,
+    target_price REAL,
+    stop_loss REAL,
+    risk_level TEXT,
+    holding_period TEXT,
+    reasons TEXT,
+    PRIMARY KEY (run_id, market, code)
+);
+CREATE INDEX IF NOT EXISTS idx_recommendations_code_date ON recommendations (code, run_date);
+CREATE INDEX IF NOT EXISTS idx_recommendations_date_score ON recommendations (run_date, total_score);
+CREATE INDEX IF NOT EXISTS idx_recommendations_rating_date ON recommendations (rating, run_date);
+"""
+
+COLUMNS = ['fundamental_score', 'technical_score', 'rating', 'action', 'current_price',
+           'target_price', 'stop_loss', 'risk_level', 'holding_period']
+
+
+def _value(value):
+    """numpy 标量转为 Python 类型，NaN 存为 NULL"""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+class RecommendationStore:
+    def __init__(self, path: str = None):
+        self.path = path or RECOMMENDATION_CONFIG['store_path']
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with closing(self.connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA foreign_keys = ON')
+        return conn
+
+    def save_run(self, recommendations: Dict, run_at: str = None, source_file: str = None) -> int:
+        """一次写入整个 run 的推荐结果，返回 run_id"""
+        run_at = run_at or recommendations.get('timestamp') or datetime.now().isoformat()
+        run_date = run_at[:10]
+
+        with self._lock, closing(self.connect()) as conn, conn:
+            run_id = conn.execute('INSERT INTO runs (run_at, run_date, source_file) VALUES (?, ?, ?)',
+                                  (run_at, run_date, source_file)).lastrowid
+            rows = []
+            for market in MARKETS_KEYS:
+                for rec in recommendations.get(market) or []:
+                    if not rec or not rec.get('code'):
+                        continue
+                    rows.append((run_id, market, str(rec['code']), rec.get('name'), run_date,
+                                 _value(rec.get('total_score', 0)),
+                                 *[_value(rec.get(column)) for column in COLUMNS],
+                                 json.dumps(rec.get('reasons', []), ensure_ascii=False)))
+            conn.executemany(
+                f"INSERT OR REPLACE INTO recommendations (run_id, market, code, name, run_date, total_score, "
+                f"{', '.join(COLUMNS)}, reasons) VALUES ({', '.join(['?'] * (len(COLUMNS) + 7))})",
+                rows
+            )
+
+        logger.info(f"推荐历史已写入 run {run_id}: {len(rows)} 条")
+        return run_id
+
+    def score_history(self, code: str, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+        """单只股票每次分析的评分，按时间排序"""
+        sql = ('SELECT r.run_at, r.run_date, c.market, c.code, c.name, c.total_score, c.fundamental_score, '
+               'c.technical_score, c.rating, c.current_price FROM recommendations c '
+               'JOIN runs r ON r.run_id = c.run_id WHERE c.code = ?')
+        params = [str(code)]
+        if start_date:
+            sql += ' AND c.run_date >= ?'
+            params.append(start_date)
+        if end_date:
+            sql += ' AND c.run_date <= ?'
+            params.append(end_date)
+        sql += ' ORDER BY r.run_at'
+
+        with closing(self.connect()) as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def consecutive_ratings(self, rating: str, days: int = 3, end_date: str = None) -> List[Dict]:
+        """
+        最近 days 个有分析记录的日期里，每天（以当天最后一次分析为准）都获得 rating 评级的股票
+        """
+        end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+        sql = """
+            WITH recent_days AS (
+                SELECT DISTINCT run_date FROM recommendations
+                WHERE run_date <= ? ORDER BY run_date DESC LIMIT ?
+            ),
+            last_runs AS (
+                SELECT market, code, run_date, MAX(run_id) AS run_id FROM recommendations
+                WHERE run_date IN (SELECT run_date FROM recent_days)
+                GROUP BY market, code, run_date
+            )
+            SELECT c.market, c.code, MAX(c.name) AS name, MIN(c.total_score) AS min_score,
+                   MAX(c.total_score) AS max_score
+            FROM recommendations c
+            JOIN last_runs l ON l.run_id = c.run_id AND l.market = c.market AND l.code = c.code
+            WHERE c.rating = ?
+            GROUP BY c.market, c.code
+            HAVING COUNT(*) = (SELECT COUNT(*) FROM recent_days) AND COUNT(*) = ?
+            ORDER BY min_score DESC
+        """
+        with closing(self.connect()) as conn:
+            return [dict(row) for row in conn.execute(sql, (end_date, days, rating, days))]
+
+    def top_scores(self, run_date: str = None, limit: int = 10) -> pd.DataFrame:
+        """某天（默认最近一次分析的日期）评分最高的股票，同一股票取当天最高分"""
+        with closing(self.connect()) as conn:
+            if run_date is None:
+                row = conn.execute('SELECT MAX(run_date) FROM recommendations').fetchone()
+                run_date = row[0]
+            return pd.read_sql_query(
+                'SELECT market, code, MAX(name) AS name, MAX(total_score) AS total_score FROM recommendations '
+                'WHERE run_date = ? GROUP BY market, code ORDER BY total_score DESC LIMIT ?',
+                conn, params=[run_date, limit]
+            )
@@ -0,0 +1,135 @@
+"""
+板块成分股缓存
+
+保存 板块 -> 成分股 的正向索引，并在加载时建立 股票 -> 板块 的倒排索引，
+两个方向的查询都不需要访问网络。每个板块单独记录刷新时间，只重新下载过期的板块
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from config.config import CACHE_CONFIG
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SectorIndex:
+    def __init__(self, path: str = None, refresh_hours: float = None):
+        self.path = path or CACHE_CONFIG['sector_index_path']
+        self.refresh_seconds = (refresh_hours or CACHE_CONFIG['sector_refresh_hours']) * 3600
+        self._lock = threading.Lock()
+        self.boards: Dict[str, Dict] = {}
+        self._stock_sectors: Dict[str, List[str]] = defaultdict(list)
+        self._stock_names: Dict[str, str] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.boards = json.load(f).get('boards', {})
+        except Exception as e:
+            logger.warning(f"读取板块成分缓存失败: {e}")
+            self.boards = {}
+        self._rebuild_inverted_index()
+
+    def save(self):
+        with self._lock:
+            payload = {'updated_at': time.time(), 'boards': self.boards}
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def _rebuild_inverted_index(self):
+        stock_sectors = defaultdict(list)
+        stock_names = {}
+        for board_name, board in self.boards.items():
+            for code, name in board['stocks']:
+                stock_sectors[code].append(board_name)
+                stock_names[code] = name
+        self._stock_sectors = stock_sectors
+        self._stock_names = stock_names
+
+    def is_stale(self, board_name: str) -> bool:
+        board = self.boards.get(board_name)
+        return board is None or time.time() - board['refreshed_at'] >= self.refresh_seconds
+
+    def update_board(self, board_name: str, board_type: str, constituents: pd.DataFrame):
+        """用成分股表（含 代码、名称 列）更新一个板块"""
+        stocks = []
+        if constituents is not None and not constituents.empty and '代码' in constituents.columns:
+            names = constituents['名称'] if '名称' in constituents.columns else constituents['代码']
+            stocks = [[str(code), str(name)] for code, name in zip(constituents['代码'], names)]
+
+        with self._lock:
+            old_stocks = self.boards.get(board_name, {}).get('stocks', [])
+            self.boards[board_name] = {'type': board_type, 'stocks': stocks, 'refreshed_at': time.time()}
+
+            for code, _ in old_stocks:
+                if board_name in self._stock_sectors.get(code, []):
+                    self._stock_sectors[code].remove(board_name)
+            for code, name in stocks:
+                self._stock_sectors[code].append(board_name)
+                self._stock_names[code] = name
+
+    def refresh(self, boards: Dict[str, str], fetch_constituents: Callable[[str, str], pd.DataFrame],
+                force: bool = False, max_boards: int = None) -> int:
+        """
+        增量刷新
+
+        boards 为当前的 {板块名称: 板块类型}，已下线的板块会被移除；
+        只下载过期（或 force 时全部）的板块，max_boards 可限制单次刷新的数量以分摊请求
+        """
+        with self._lock:
+            removed = [name for name in self.boards if name not in boards]
+            for name in removed:
+                del self.boards[name]
+        if removed:
+            self._rebuild_inverted_index()
+
+        targets = [name for name in boards if force or self.is_stale(name)]
+        if max_boards is not None:
+            targets = targets[:max_boards]
+
+        refreshed = 0
+        for idx, board_name in enumerate(targets, 1):
+            try:
+                constituents = fetch_constituents(board_name, boards[board_name])
+            except Exception as e:
+                logger.warning(f"获取板块成分失败 {board_name}: {e}")
+                continue
+            self.update_board(board_name, boards[board_name], constituents)
+            refreshed += 1
+            if idx % 50 == 0:
+                self.save()
+
+        if refreshed or removed:
+            self.save()
+        logger.info(f"板块成分缓存刷新 {refreshed} 个板块，移除 {len(removed)} 个，共 {len(self.boards)} 个板块")
+        return refreshed
+
+    def get_sector_stocks(self, board_name: str) -> List[str]:
+        """板块 -> 成分股代码"""
+        board = self.boards.get(board_name)
+        return [code for code, _ in board['stocks']] if board else []
+
+    def get_stock_sectors(self, code: str, board_type: Optional[str] = None) -> List[str]:
+        """股票代码 -> 所属板块，board_type 可选 industry / concept"""
+        sectors = self._stock_sectors.get(str(code), [])
+        if board_type is None:
+            return list(sectors)
+        return [name for name in sectors if self.boards[name]['type'] == board_type]
+
+    def get_stock_name(self, code: str) -> str:
+        return self._stock_names.get(str(code), '')
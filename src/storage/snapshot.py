@@ -0,0 +1,241 @@
+"""
+列式市场数据快照
+
+一次 fetch 的结果保存为一个目录：每个记录列表（如 cn.hot_stocks.top_gainers、
+us.stocks_to_analyze）保存为一张列式表，其余的标量和结构写入 manifest.json。
+读取时先只解析 manifest，各表在第一次访问时才解码，并可只读取需要的列。
+
+盘中连续抓取的快照大部分内容相同，写入时可以指定同一天的关键帧作为 base，
+有主键列的表只保存相对关键帧变化的单元格（见 src/storage/delta.py）
+"""
+
+import json
+import os
+import shutil
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from config.config import SNAPSHOT_CONFIG
+from src.storage.columnar import read_table, write_table
+from src.storage.delta import diff_tables, find_key, read_delta_table, write_delta_table
+
+MANIFEST_NAME = 'manifest.json'
+TABLE_KEY = '__table__'
+FORMAT_VERSION = 1
+
+
+def is_snapshot(path: str) -> bool:
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_NAME))
+
+
+def _is_records(node) -> bool:
+    return isinstance(node, list) and len(node) > 0 and all(isinstance(row, dict) for row in node)
+
+
+def _write_table(tmp_dir: str, name: str, df: pd.DataFrame, base_dir: Optional[str], compress: bool) -> bool:
+    """有可用的关键帧表时写增量，返回是否写成了增量"""
+    base_path = os.path.join(base_dir, f'{name}.npz') if base_dir else None
+    key = find_key(df)
+    if base_path and key and os.path.exists(base_path):
+        base = read_table(base_path)
+        if find_key(base) == key:
+            delta_path = os.path.join(tmp_dir, f'{name}.delta.npz')
+            cells = write_delta_table(delta_path, df, base, key, compress=compress)
+            # 变化太多时增量没有意义，改存整表
+            if cells <= df.size * SNAPSHOT_CONFIG['delta_max_ratio']:
+                return True
+            os.remove(delta_path)
+
+    write_table(os.path.join(tmp_dir, f'{name}.npz'), df, compress=compress)
+    return False
+
+
+def write_snapshot(path: str, data: Dict, compress: bool = True, base: str = None, chain_index: int = 1) -> str:
+    """
+    保存 fetch 结果，返回快照目录
+
+    base 为同目录下的关键帧快照路径，指定时各表尽量按增量保存，chain_index 为距关键帧的快照数
+    """
+    tmp_dir = path + '.tmp'
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+
+    def encode(node, keys: List[str]):
+        if isinstance(node, dict):
+            return {key: encode(value, keys + [str(key)]) for key, value in node.items()}
+        if _is_records(node):
+            name = '.'.join(keys)
+            df = pd.DataFrame.from_records(node)
+            table = {TABLE_KEY: name, 'rows': len(df), 'columns': [str(c) for c in df.columns]}
+            if _write_table(tmp_dir, name, df, base, compress):
+                table['delta'] = True
+            return table
+        return node
+
+    manifest = {
+        'format': 'columnar',
+        'version': FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'data': encode(data, [])
+    }
+    if base:
+        manifest['base'] = os.path.basename(os.path.normpath(base))
+        manifest['chain_index'] = chain_index
+    with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, default=str)
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.rename(tmp_dir, path)
+    return path
+
+
+class LazyRecords(Sequence):
+    """按需解码的记录列表，用法与 to_dict('records') 的结果相同"""
+
+    def __init__(self, path: str, rows: int, columns: Optional[List[str]] = None, base_path: str = None):
+        self.path = path
+        self.rows = rows
+        self.columns = columns
+        self.base_path = base_path
+        self._records = None
+
+    def _load(self) -> List[Dict]:
+        if self._records is None:
+            self._records = self.to_frame().to_dict('records')
+        return self._records
+
+    def to_frame(self) -> pd.DataFrame:
+        if self.base_path:
+            return read_delta_table(self.path, self.base_path, self.columns)
+        return read_table(self.path, self.columns)
+
+    def __getitem__(self, item):
+        return self._load()[item]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __repr__(self) -> str:
+        return f"LazyRecords({os.path.basename(self.path)}, rows={self.rows})"
+
+
+def read_manifest(path: str) -> Dict:
+    with open(os.path.join(path, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_snapshot(path: str, columns: Dict[str, List[str]] = None) -> Dict:
+    """
+    读取快照，各表以 LazyRecords 返回
+
+    columns 按表名的最后一段指定只读取的列，如 {'stocks_to_analyze': ['代码', '名称']}
+    """
+    columns = columns or {}
+    manifest = read_manifest(path)
+    base_dir = _base_dir(path, manifest)
+
+    def decode(node):
+        if isinstance(node, dict):
+            if TABLE_KEY in node:
+                return _lazy_table(path, node, base_dir, columns.get(node[TABLE_KEY].rsplit('.', 1)[-1]))
+            return {key: decode(value) for key, value in node.items()}
+        return node
+
+    return decode(manifest['data'])
+
+
+def _base_dir(path: str, manifest: Dict) -> Optional[str]:
+    if not manifest.get('base'):
+        return None
+    return os.path.join(os.path.dirname(os.path.normpath(path)), manifest['base'])
+
+
+def _lazy_table(path: str, node: Dict, base_dir: Optional[str], columns: Optional[List[str]]) -> LazyRecords:
+    name = node[TABLE_KEY]
+    if node.get('delta'):
+        return LazyRecords(os.path.join(path, f'{name}.delta.npz'), node['rows'], columns,
+                           base_path=os.path.join(base_dir, f'{name}.npz'))
+    return LazyRecords(os.path.join(path, f'{name}.npz'), node['rows'], columns)
+
+
+def _find_table(node, section: str) -> Optional[Dict]:
+    if isinstance(node, dict):
+        if node.get(TABLE_KEY) == section:
+            return node
+        for value in node.values():
+            found = _find_table(value, section)
+            if found is not None:
+                return found
+    return None
+
+
+def read_section(path: str, section: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """直接读取一张表，section 如 'cn.stocks_to_analyze'，表不存在时返回空表"""
+    manifest = read_manifest(path)
+    node = _find_table(manifest['data'], section)
+    if node is None:
+        return pd.DataFrame()
+    return _lazy_table(path, node, _base_dir(path, manifest), columns).to_frame()
+
+
+def choose_keyframe(previous: Optional[str], now: datetime = None) -> Tuple[Optional[str], int]:
+    """
+    根据上一次的快照决定新快照的关键帧，返回 (关键帧, chain_index)，关键帧为 None 表示新快照自己作为关键帧
+
+    同一天内每 keyframe_interval 个快照一个关键帧，跨天总是重新开始，保证增量不依赖前一天的文件
+    """
+    if not previous or not is_snapshot(previous):
+        return None, 0
+    manifest = read_manifest(previous)
+    keyframe = _base_dir(previous, manifest) or previous
+    chain_index = manifest.get('chain_index', 0) + 1
+    if chain_index >= SNAPSHOT_CONFIG['keyframe_interval'] or not is_snapshot(keyframe):
+        return None, 0
+
+    now = now or datetime.now()
+    if datetime.fromisoformat(read_manifest(keyframe)['created_at']).date() != now.date():
+        return None, 0
+    return keyframe, chain_index
+
+
+def materialize(path: str) -> str:
+    """把增量快照就地改写为完整快照，使其不再依赖关键帧"""
+    manifest = read_manifest(path)
+    base_dir = _base_dir(path, manifest)
+    if base_dir is None:
+        return path
+
+    def rewrite(node):
+        if isinstance(node, dict):
+            if TABLE_KEY in node:
+                if node.pop('delta', False):
+                    name = node[TABLE_KEY]
+                    df = _lazy_table(path, dict(node, delta=True), base_dir, None).to_frame()
+                    write_table(os.path.join(path, f'{name}.npz'), df)
+                    os.remove(os.path.join(path, f'{name}.delta.npz'))
+                return node
+            return {key: rewrite(value) for key, value in node.items()}
+        return node
+
+    manifest['data'] = rewrite(manifest['data'])
+    manifest.pop('base')
+    manifest.pop('chain_index', None)
+    tmp_path = os.path.join(path, MANIFEST_NAME + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp_path, os.path.join(path, MANIFEST_NAME))
+    return path
+
+
+def changes_since(path: str, since: str, section: str) -> Dict:
+    """
+    section 表在 since 快照之后的变化
+
+    只解码两张表本身，返回 added / removed 的代码和 changed（以代码为索引、只含变化列的表）
+    """
+    return diff_tables(read_section(since, section), read_section(path, section))
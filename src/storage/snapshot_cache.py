@@ -0,0 +1,113 @@
+"""
+全市场行情快照缓存
+
+同一进程内按 key 共享一次下载（并发调用只有一个真正发起请求），
+可选的磁盘层让 fetch 和 analyze 两个进程复用同一份快照
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from config.config import CACHE_CONFIG
+from src.storage.columnar import read_table, write_table
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SnapshotCache:
+    def __init__(self, ttl_seconds: int = None, disk_dir: str = None, disk_enabled: bool = None):
+        self.ttl_seconds = CACHE_CONFIG['snapshot_ttl_seconds'] if ttl_seconds is None else ttl_seconds
+        self.disk_dir = disk_dir or CACHE_CONFIG['snapshot_disk_dir']
+        self.disk_enabled = CACHE_CONFIG['snapshot_disk_enabled'] if disk_enabled is None else disk_enabled
+        self._entries: Dict[str, Tuple[float, pd.DataFrame]] = {}
+        self._locks = defaultdict(threading.Lock)
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, key: str):
+        with self._locks_guard:
+            return self._locks[key]
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f'{key}.npz')
+
+    def _is_fresh(self, fetched_at: float) -> bool:
+        return time.time() - fetched_at < self.ttl_seconds
+
+    def _load_from_disk(self, key: str) -> Optional[Tuple[float, pd.DataFrame]]:
+        path = self._disk_path(key)
+        if not self.disk_enabled or not os.path.exists(path):
+            return None
+
+        fetched_at = os.path.getmtime(path)
+        if not self._is_fresh(fetched_at):
+            return None
+
+        try:
+            return fetched_at, read_table(path)
+        except Exception as e:
+            logger.warning(f"读取快照缓存失败 {key}: {e}")
+            return None
+
+    def _save_to_disk(self, key: str, df: pd.DataFrame):
+        if not self.disk_enabled:
+            return
+        try:
+            write_table(self._disk_path(key), df, compress=False)
+        except Exception as e:
+            logger.warning(f"写入快照缓存失败 {key}: {e}")
+
+    def get(self, key: str, loader: Callable[[], pd.DataFrame], copy: bool = True) -> pd.DataFrame:
+        """获取快照，过期或不存在时调用 loader 下载；只读使用时可传 copy=False 避免复制"""
+        with self._lock(key):
+            entry = self._entries.get(key)
+            if entry is None or not self._is_fresh(entry[0]):
+                entry = self._load_from_disk(key)
+                if entry is not None:
+                    logger.info(f"使用磁盘快照缓存: {key}")
+                else:
+                    df = loader()
+                    # 空结果多半是接口临时出错，不缓存，下一次调用重新下载
+                    if df is None or df.empty:
+                        logger.warning(f"快照为空，不缓存: {key}")
+                        return pd.DataFrame() if df is None else df.copy()
+                    entry = (time.time(), df)
+                    self._save_to_disk(key, df)
+                self._entries[key] = entry
+
+            df = entry[1]
+            return df.copy() if copy else df
+
+    def invalidate(self, key: str = None):
+        """清除缓存，key 为空时全部清除"""
+        if key:
+            keys = [key]
+        else:
+            keys = set(self._entries.keys())
+            if os.path.isdir(self.disk_dir):
+                keys.update(f[:-4] for f in os.listdir(self.disk_dir) if f.endswith('.npz'))
+        for k in keys:
+            with self._lock(k):
+                self._entries.pop(k, None)
+                path = self._disk_path(k)
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+_snapshot_cache = None
+_snapshot_cache_guard = threading.Lock()
+
+
+def get_snapshot_cache() -> SnapshotCache:
+    """进程内共享的快照缓存"""
+    global _snapshot_cache
+    with _snapshot_cache_guard:
+        if _snapshot_cache is None:
+            _snapshot_cache = SnapshotCache()
+        return _snapshot_cache
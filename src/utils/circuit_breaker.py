@@ -0,0 +1,128 @@
+"""
+数据源健康状态与熔断
+
+每个数据源（DATA_SOURCES 中的 akshare、yfinance）一个熔断器：
+连续失败达到阈值后熔断，熔断期间的调用立即返回；
+冷却时间过后放行一次探测请求，成功则恢复，失败则继续熔断
+"""
+
+import logging
+import threading
+import time
+from typing import Dict
+
+from config.config import CIRCUIT_BREAKER_CONFIG
+from src.data_sources.sources import DATA_SOURCES
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int, recovery_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.total_calls = 0
+        self.total_failures = 0
+        self.rejected_calls = 0
+        self.last_error = ''
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """是否允许本次调用"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_seconds:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                logger.info(f"数据源 {self.name} 熔断冷却结束，发送探测请求")
+                return True
+
+            self.rejected_calls += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.total_calls += 1
+            if self.state != self.CLOSED:
+                logger.info(f"数据源 {self.name} 已恢复")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, error: str = ''):
+        with self._lock:
+            self.total_calls += 1
+            self.total_failures += 1
+            self.consecutive_failures += 1
+            self.last_error = error
+
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"数据源 {self.name} 连续失败 {self.consecutive_failures} 次，"
+                                   f"熔断 {self.recovery_seconds:.0f} 秒: {error}")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'total_calls': self.total_calls,
+                'total_failures': self.total_failures,
+                'rejected_calls': self.rejected_calls,
+                'last_error': self.last_error
+            }
+
+
+class SourceHealth:
+    def __init__(self, config: Dict = None):
+        config = config or CIRCUIT_BREAKER_CONFIG
+        sources = {name for market_sources in DATA_SOURCES.values() for name in market_sources}
+        self.breakers = {
+            name: CircuitBreaker(name, config['failure_threshold'], config['recovery_seconds'])
+            for name in sorted(sources)
+        }
+        self.empty_result_sources = set(config.get('empty_result_sources', []))
+
+    def get(self, source: str) -> CircuitBreaker:
+        return self.breakers.get(source)
+
+    def get_status(self) -> Dict[str, Dict]:
+        return {name: breaker.get_status() for name, breaker in self.breakers.items()}
+
+    def log_status(self):
+        for name, status in self.get_status().items():
+            if status['total_calls'] == 0 and status['rejected_calls'] == 0:
+                continue
+            logger.info(f"数据源 {name}: {status['state']}, 调用 {status['total_calls']} 次, "
+                        f"失败 {status['total_failures']} 次, 熔断拒绝 {status['rejected_calls']} 次")
+
+
+_source_health = None
+_source_health_guard = threading.Lock()
+
+
+def get_source_health() -> SourceHealth:
+    """进程内共享的数据源健康状态"""
+    global _source_health
+    with _source_health_guard:
+        if _source_health is None:
+            _source_health = SourceHealth()
+        return _source_health
@@ -0,0 +1,206 @@
+"""
+新闻抓取共用的 HTTP 客户端
+
+同一进程内共用一个 requests.Session，按站点保持长连接池并协商 gzip/deflate（装有 brotli 时加上 br）压缩，
+对每个 URL 缓存 ETag / Last-Modified，再次请求时带上条件请求头，
+页面未变化时服务器返回 304，直接使用本地缓存的正文。同时按站点统计流量和耗时
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import defaultdict
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.config import HTTP_CONFIG
+from src.utils.rate_limiter import get_rate_limiter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _accept_encoding() -> str:
+    encodings = ['gzip', 'deflate']
+    try:
+        import brotli  # noqa: F401
+        encodings.append('br')
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            encodings.append('br')
+        except ImportError:
+            pass
+    return ', '.join(encodings)
+
+
+class HttpClient:
+    def __init__(self, cache_dir: str = None, pool_connections: int = None, pool_maxsize: int = None,
+                 max_retries: int = None):
+        self.cache_dir = cache_dir or HTTP_CONFIG['cache_dir']
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': HTTP_CONFIG['user_agent'],
+            'Accept-Encoding': _accept_encoding()
+        })
+
+        retries = Retry(
+            total=HTTP_CONFIG['max_retries'] if max_retries is None else max_retries,
+            backoff_factor=0.5,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=['GET']
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections or HTTP_CONFIG['pool_connections'],
+            pool_maxsize=pool_maxsize or HTTP_CONFIG['pool_maxsize'],
+            max_retries=retries
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.stats = defaultdict(lambda: {'requests': 0, 'not_modified': 0, 'errors': 0,
+                                          'wire_bytes': 0, 'body_bytes': 0, 'latency': 0.0})
+        self._lock = threading.Lock()
+
+    def _cache_paths(self, url: str):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'{key}.json'), os.path.join(self.cache_dir, f'{key}.body')
+
+    def _load_validators(self, url: str) -> Optional[Dict]:
+        meta_path, body_path = self._cache_paths(url)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def _load_body(self, url: str) -> bytes:
+        _, body_path = self._cache_paths(url)
+        with open(body_path, 'rb') as f:
+            return zlib.decompress(f.read())
+
+    def _store(self, url: str, response: requests.Response):
+        validators = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_type': response.headers.get('Content-Type'),
+            'stored_at': time.time()
+        }
+        if not (validators['etag'] or validators['last_modified']):
+            return
+
+        meta_path, body_path = self._cache_paths(url)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_suffix = f'.{threading.get_ident()}.tmp'
+        with open(body_path + tmp_suffix, 'wb') as f:
+            f.write(zlib.compress(response.content))
+        os.replace(body_path + tmp_suffix, body_path)
+        with open(meta_path + tmp_suffix, 'w', encoding='utf-8') as f:
+            json.dump(validators, f, ensure_ascii=False)
+        os.replace(meta_path + tmp_suffix, meta_path)
+
+    def _record(self, host: str, wire_bytes: int, body_bytes: int, latency: float,
+                not_modified: bool = False, error: bool = False):
+        with self._lock:
+            stats = self.stats[host]
+            stats['requests'] += 1
+            stats['wire_bytes'] += wire_bytes
+            stats['body_bytes'] += body_bytes
+            stats['latency'] += latency
+            stats['not_modified'] += int(not_modified)
+            stats['errors'] += int(error)
+
+    def get(self, url: str, caller: str = '', timeout: float = 10, **kwargs) -> requests.Response:
+        """
+        限速后发出条件 GET 请求
+
+        页面未变化（304）时返回一个由缓存正文构造的 200 响应，response.from_cache 为 True
+        """
+        host = urlparse(url).netloc
+        get_rate_limiter().acquire(host, caller)
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        validators = self._load_validators(url)
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        start_time = time.perf_counter()
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout, **kwargs)
+            body = response.content
+        except Exception:
+            self._record(host, 0, 0, time.perf_counter() - start_time, error=True)
+            raise
+        latency = time.perf_counter() - start_time
+
+        # raw.tell() 是压缩后实际读取的字节数，拿不到时退回解压后的长度
+        try:
+            wire_bytes = response.raw.tell() or len(body)
+        except Exception:
+            wire_bytes = len(body)
+
+        if response.status_code == 304 and validators:
+            try:
+                response._content = self._load_body(url)
+                response.status_code = 200
+                response.from_cache = True
+                if validators.get('content_type'):
+                    response.headers['Content-Type'] = validators['content_type']
+                self._record(host, wire_bytes, 0, latency, not_modified=True)
+                return response
+            except Exception as e:
+                logger.warning(f"读取 HTTP 缓存失败 {url}: {e}")
+                self._record(host, wire_bytes, 0, latency, error=True)
+                for path in self._cache_paths(url):
+                    if os.path.exists(path):
+                        os.remove(path)
+                headers.pop('If-None-Match', None)
+                headers.pop('If-Modified-Since', None)
+                return self.get(url, caller, timeout, headers=headers, **kwargs)
+
+        response.from_cache = False
+        self._record(host, wire_bytes, len(body), latency, error=response.status_code >= 400)
+        if response.status_code == 200:
+            try:
+                self._store(url, response)
+            except Exception as e:
+                logger.warning(f"写入 HTTP 缓存失败 {url}: {e}")
+        return response
+
+    def get_stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {host: dict(stats) for host, stats in self.stats.items()}
+
+    def log_stats(self):
+        for host, stats in sorted(self.get_stats().items()):
+            avg_latency = stats['latency'] / stats['requests'] if stats['requests'] else 0.0
+            logger.info(f"HTTP {host}: 请求 {stats['requests']} 次, 304 未变化 {stats['not_modified']} 次, "
+                        f"失败 {stats['errors']} 次, 传输 {stats['wire_bytes'] / 1024:.1f} KB, "
+                        f"正文 {stats['body_bytes'] / 1024:.1f} KB, 平均耗时 {avg_latency:.2f} 秒")
+
+
+_http_client = None
+_http_client_guard = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """进程内共享的 HTTP 客户端"""
+    global _http_client
+    with _http_client_guard:
+        if _http_client is None:
+            _http_client = HttpClient()
+        return _http_client
@@ -0,0 +1,65 @@
+"""
+行情快照排行榜
+
+对全市场快照一次性计算多个前K/后K榜单（涨幅、跌幅、成交量、成交额、振幅、涨停），
+用 np.argpartition 做部分选择而不是整表排序，结果为位置下标数组，
+需要时再用 df.iloc[idx] 取出对应的行
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# column: 排序列；bottom: 取最小的K个；min_value: 只保留大于该值的行
+HOT_STOCK_RANKINGS = {
+    'top_gainers': {'column': '涨跌幅'},
+    'top_losers': {'column': '涨跌幅', 'bottom': True},
+    'top_volume': {'column': '成交量'}
+}
+
+SPOT_RANKINGS = {
+    **HOT_STOCK_RANKINGS,
+    'top_turnover': {'column': '成交额'},
+    'top_amplitude': {'column': '振幅'},
+    'limit_up': {'column': '涨跌幅', 'min_value': 9.5}
+}
+
+
+def select_top_k(values: np.ndarray, k: int, bottom: bool = False) -> np.ndarray:
+    """
+    返回最大（bottom=True 时为最小）的 k 个值的位置，NaN 不参与排名
+
+    结果按数值从大到小排列，与 sort_values(ascending=False) 后 head(k) / tail(k) 的顺序一致
+    """
+    valid = np.flatnonzero(~np.isnan(values))
+    if valid.size > k:
+        keys = values[valid] if bottom else -values[valid]
+        candidates = valid[np.argpartition(keys, k - 1)[:k]]
+    else:
+        candidates = valid
+    return candidates[np.argsort(-values[candidates], kind='stable')]
+
+
+def compute_rankings(df: pd.DataFrame, rankings: Dict = None, k: int = 20) -> Dict[str, np.ndarray]:
+    """一次计算多个榜单，每个排序列只转换一次"""
+    rankings = rankings or SPOT_RANKINGS
+    columns = {}
+    result = {}
+
+    for name, spec in rankings.items():
+        column = spec['column']
+        if column not in df.columns:
+            result[name] = np.array([], dtype=np.intp)
+            continue
+
+        if column not in columns:
+            columns[column] = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype='float64')
+        values = columns[column]
+
+        if 'min_value' in spec:
+            values = np.where(values > spec['min_value'], values, np.nan)
+
+        result[name] = select_top_k(values, spec.get('k', k), bottom=spec.get('bottom', False))
+
+    return result
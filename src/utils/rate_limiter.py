@@ -0,0 +1,105 @@
+"""
+按数据源限速的令牌桶
+
+每个上游（akshare/东方财富、yfinance、各新闻站点）一个令牌桶，
+同一进程内所有访问该上游的代码共用，并统计每个调用方的等待时间
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict
+
+from config.config import RATE_LIMIT_CONFIG
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """预占令牌，返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1) -> float:
+        """取得令牌，必要时阻塞，返回实际等待的秒数"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    def __init__(self, limits: Dict = None):
+        self.limits = limits or RATE_LIMIT_CONFIG
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats = defaultdict(lambda: {'calls': 0, 'waited': 0.0, 'max_wait': 0.0})
+        self._lock = threading.Lock()
+
+    def _bucket(self, source: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(source)
+            if bucket is None:
+                limit = self.limits.get(source, self.limits['default'])
+                bucket = TokenBucket(limit['rate'], limit['capacity'])
+                self._buckets[source] = bucket
+            return bucket
+
+    def acquire(self, source: str, caller: str = '') -> float:
+        """访问 source 前调用，返回等待的秒数"""
+        waited = self._bucket(source).acquire()
+
+        with self._lock:
+            for key in (source, f'{source}:{caller}' if caller else None):
+                if key is None:
+                    continue
+                stats = self._stats[key]
+                stats['calls'] += 1
+                stats['waited'] += waited
+                stats['max_wait'] = max(stats['max_wait'], waited)
+
+        if waited > 0:
+            logger.debug(f"限速等待 {source} {caller}: {waited:.2f} 秒")
+        return waited
+
+    def get_stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {key: dict(value) for key, value in self._stats.items()}
+
+    def log_stats(self):
+        stats = self.get_stats()
+        if not stats:
+            return
+        logger.info("限速等待统计:")
+        for key in sorted(stats):
+            item = stats[key]
+            logger.info(f"  {key}: {item['calls']} 次请求, 共等待 {item['waited']:.2f} 秒, "
+                        f"最长 {item['max_wait']:.2f} 秒")
+
+
+_rate_limiter = None
+_rate_limiter_guard = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """进程内共享的限速器"""
+    global _rate_limiter
+    with _rate_limiter_guard:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter()
+        return _rate_limiter
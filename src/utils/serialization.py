@@ -0,0 +1,105 @@
+"""
+JSON 序列化
+
+市场数据、推荐结果、热点结果里混有 numpy 标量、pandas 时间戳和 NaN，统一在这里编码：
+安装了 orjson 时用 orjson（原生支持 numpy，速度快），否则回退到标准库 json。
+NaN/inf 写成 null，时间写成 ISO 格式；compact=True 时不缩进，用于只给程序读取的文件
+"""
+
+import datetime
+import decimal
+import json
+import logging
+import math
+import os
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def _default(obj: Any) -> Any:
+    """两种后端都不能直接编码的类型"""
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, (pd.Timestamp, datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, np.datetime64):
+        return None if np.isnat(obj) else pd.Timestamp(obj).isoformat()
+    if isinstance(obj, pd.Timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return _clean_float(float(obj))
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        return _clean(obj.tolist())
+    if isinstance(obj, pd.DataFrame):
+        return _clean(obj.astype(object).where(obj.notna(), None).to_dict('records'))
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return _clean(obj.astype(object).where(obj.notna(), None).tolist())
+    if isinstance(obj, decimal.Decimal):
+        return _clean_float(float(obj))
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"无法序列化类型: {type(obj).__name__}")
+
+
+def _clean_float(value: float):
+    return value if math.isfinite(value) else None
+
+
+def _clean(obj: Any) -> Any:
+    """标准库 json 会把 NaN 写成非法的 NaN 字面量，先把浮点数的 NaN/inf 换成 None"""
+    if isinstance(obj, float):
+        return _clean_float(obj)
+    if isinstance(obj, dict):
+        return {key if isinstance(key, (str, int, float, bool)) or key is None else str(key): _clean(value)
+                for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_clean(value) for value in obj]
+    return obj
+
+
+def dumps(obj: Any, compact: bool = False) -> bytes:
+    """编码为 UTF-8 字节，中文不转义"""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    if compact:
+        text = json.dumps(_clean(obj), ensure_ascii=False, default=_default, separators=(',', ':'))
+    else:
+        text = json.dumps(_clean(obj), ensure_ascii=False, default=_default, indent=2)
+    return text.encode('utf-8')
+
+
+def dump(obj: Any, path: str, compact: bool = False) -> int:
+    """写入文件（先写临时文件再替换），返回写入的字节数"""
+    data = dumps(obj, compact=compact)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def loads(data) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
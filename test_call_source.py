@@ -0,0 +1,82 @@
+"""
+数据源调用熔断计数测试（离线，使用桩函数代替 yf.download）
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from src.data_sources import client
+from src.data_sources.client import SourceUnavailable, call_source
+from src.utils.circuit_breaker import SourceHealth
+
+FRAME = pd.DataFrame({'Close': [1.0, 2.0]})
+
+
+class _Limiter:
+    def acquire(self, *args):
+        pass
+
+
+class _Shared:
+    _ERRORS = {}
+
+
+def download(tickers, **kwargs):
+    """桩函数：以 0 开头的港股代码 yfinance 无法识别，返回空表"""
+    symbols = tickers.split() if isinstance(tickers, str) else tickers
+    if all(symbol[0].isdigit() for symbol in symbols):
+        return pd.DataFrame()
+    return FRAME
+
+
+def with_stubs(test, errors=None):
+    health = SourceHealth({'failure_threshold': 3, 'recovery_seconds': 60, 'empty_result_sources': ['yfinance']})
+    shared = _Shared()
+    shared._ERRORS = errors or {}
+    originals = client.get_source_health, client.get_rate_limiter, client.yf_shared
+    client.get_source_health, client.get_rate_limiter, client.yf_shared = lambda: health, lambda: _Limiter(), shared
+    try:
+        test(health)
+    finally:
+        client.get_source_health, client.get_rate_limiter, client.yf_shared = originals
+
+
+def test_bad_tickers_do_not_open_breaker():
+    def test(health):
+        for symbol in ('00700', '00941', '01299', '03690'):
+            assert call_source('yfinance', download, symbol).empty
+        for symbol in ('AAPL', 'MSFT', 'NVDA'):
+            assert not call_source('yfinance', download, symbol).empty
+        status = health.get('yfinance').get_status()
+        assert status['state'] == 'closed' and status['rejected_calls'] == 0
+    with_stubs(test)
+
+
+def test_empty_batch_counts_as_failure():
+    def test(health):
+        for _ in range(3):
+            call_source('yfinance', download, ['00700', '00941'])
+        try:
+            call_source('yfinance', download, 'AAPL')
+            assert False, '熔断后应拒绝调用'
+        except SourceUnavailable:
+            pass
+    with_stubs(test)
+
+
+def test_rate_limit_error_counts_as_failure():
+    def test(health):
+        for _ in range(3):
+            call_source('yfinance', download, '00700')
+        assert health.get('yfinance').get_status()['state'] == 'open'
+    with_stubs(test, {'00700': "YFRateLimitError('Too Many Requests. Rate limited. Try after a while.')"})
+
+
+if __name__ == "__main__":
+    test_bad_tickers_do_not_open_breaker()
+    test_empty_batch_counts_as_failure()
+    test_rate_limit_error_counts_as_failure()
+    print("数据源熔断计数测试通过")
@@ -0,0 +1,65 @@
+"""
+紧凑模式综合信号测试（离线，使用随机K线）
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from analyze_stocks import StockAnalyzer
+from src.analyzers import compact_signal
+from src.analyzers.advanced_technical_analyzer import AdvancedTechnicalAnalyzer
+from src.analyzers.compact_signal import FEATURE_COLUMNS, CompactSignalEngine
+from test_panel_indicators import assert_same, make_frame
+
+
+def test_matches_full_signal_and_leaves_input_untouched():
+    engine = CompactSignalEngine()
+    # 先长后短再更长，工作数组复用和重新分配都要覆盖到
+    for n, seed in ((365, 51), (130, 52), (500, 53), (120, 54)):
+        df = make_frame(n, seed)
+        original = df.copy()
+        features, signal = engine.generate(df)
+
+        assert df.equals(original)
+        assert list(df.columns) == list(original.columns)
+
+        full = df.copy()
+        assert_same(AdvancedTechnicalAnalyzer().generate_comprehensive_signal(full), signal)
+        expected = full[FEATURE_COLUMNS].iloc[-1].to_numpy(dtype='float64')
+        assert np.allclose(expected, features, rtol=1e-9, equal_nan=True)
+    assert engine.capacity == 500
+
+
+def test_short_history_returns_empty_signal():
+    features, signal = CompactSignalEngine().generate(make_frame(119, 55))
+    assert signal == {}
+    assert len(features) == len(FEATURE_COLUMNS) and np.isnan(features).all()
+
+
+def test_per_symbol_falls_back_to_full_signal():
+    def broken(*args, **kwargs):
+        raise ValueError('kernel')
+
+    analyzer = StockAnalyzer.__new__(StockAnalyzer)
+    analyzer.compact_engine = CompactSignalEngine()
+    analyzer.fallback_analyzer = AdvancedTechnicalAnalyzer('pandas')
+    frames = {'A': make_frame(365, 56), 'B': make_frame(119, 57)}
+    original = compact_signal.compute_indicators
+    compact_signal.compute_indicators = broken
+    try:
+        signals = analyzer._per_symbol_signals(frames)
+    finally:
+        compact_signal.compute_indicators = original
+    assert_same(AdvancedTechnicalAnalyzer('pandas').generate_comprehensive_signal(make_frame(365, 56)), signals['A'])
+    assert signals['B'] == {}
+    assert list(frames['A'].columns) == list(make_frame(365, 56).columns)
+
+
+if __name__ == "__main__":
+    test_matches_full_signal_and_leaves_input_untouched()
+    test_short_history_returns_empty_signal()
+    test_per_symbol_falls_back_to_full_signal()
+    print("紧凑模式综合信号测试通过")
@@ -0,0 +1,46 @@
+"""
+股票基本信息缓存有效期测试（离线，使用临时文件）
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import time
+
+from src.storage.metadata_cache import MetadataCache
+
+HOUR = 3600
+TTL = {'longName': 24 * 30, 'marketCap': 24}
+
+
+def aged_cache(tmp_path, hours: float, **kwargs) -> MetadataCache:
+    cache = MetadataCache(str(tmp_path / 'meta.json'), field_ttl_hours=TTL, **kwargs)
+    cache.put('AAPL', {'longName': 'Apple Inc.', 'marketCap': 3e12, 'dividendYield': 0.5})
+    entry = cache._entries['AAPL']
+    entry['fetched_at'] = {field: time.time() - hours * HOUR for field in entry['fetched_at']}
+    return cache
+
+
+def test_default_fields_use_configured_ttl(tmp_path):
+    # dividendYield 没有单独的有效期，过了默认的 24 小时也不触发重新获取
+    cache = aged_cache(tmp_path, 12, default_ttl_hours=1)
+    assert cache.get('AAPL') is not None
+    cache = aged_cache(tmp_path, 48)
+    assert cache.get('AAPL') is None
+    assert cache.get('AAPL', ['longName']) is not None
+
+
+def test_explicit_zero_default_ttl(tmp_path):
+    cache = aged_cache(tmp_path, 0.01, default_ttl_hours=0)
+    assert cache.default_ttl_hours == 0
+    assert cache.get('AAPL', ['dividendYield']) is None
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    with tempfile.TemporaryDirectory() as tmp:
+        test_default_fields_use_configured_ttl(Path(tmp))
+        test_explicit_zero_default_ttl(Path(tmp))
+    print("股票信息缓存有效期测试通过")
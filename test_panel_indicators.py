@@ -0,0 +1,116 @@
+"""
+面板指标与逐只计算的一致性测试（离线，使用随机K线）
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from src.analyzers.advanced_technical_analyzer import AdvancedTechnicalAnalyzer
+from src.analyzers.panel_indicators import PanelIndicatorEngine, compute_indicators, stack_frames
+from src.analyzers.rolling_kernels import rolling_mad
+
+INDICATOR_COLUMNS = ['MA5', 'MA10', 'MA20', 'MA40', 'MA60', 'MA120', 'EMA12', 'EMA26', 'RSI', '%K', '%D',
+                     'MACD', 'MACD_SIGNAL', 'MACD_HIST', 'BB_MIDDLE', 'BB_UPPER', 'BB_LOWER', 'BB_WIDTH',
+                     'BB_PERCENT', 'ATR', 'CCI', 'Williams_R', 'OBV', 'Volume_MA20', 'Volume_Ratio', 'VWAP',
+                     'Momentum', 'ROC']
+
+
+def make_frame(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    high = close * (1 + rng.uniform(0, 0.03, n))
+    low = close * (1 - rng.uniform(0, 0.03, n))
+    return pd.DataFrame({
+        'Open': (high + low) / 2,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': rng.integers(100000, 10000000, n).astype(float)
+    }, index=pd.bdate_range('2023-01-02', periods=n))
+
+
+def make_frames():
+    lengths = [365, 250, 130, 121, 119, 60]
+    return {f'{600000 + i}': make_frame(n, i) for i, n in enumerate(lengths)}
+
+
+def assert_same(expected, actual, path='signal'):
+    if isinstance(expected, dict):
+        assert expected.keys() == actual.keys(), path
+        for key in expected:
+            assert_same(expected[key], actual[key], f'{path}.{key}')
+    elif isinstance(expected, list):
+        assert len(expected) == len(actual), path
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            assert_same(e, a, f'{path}[{i}]')
+    elif isinstance(expected, float) and not isinstance(expected, bool):
+        assert np.isclose(expected, actual, rtol=1e-9, equal_nan=True), f'{path}: {expected} != {actual}'
+    else:
+        assert expected == actual, f'{path}: {expected} != {actual}'
+
+
+def test_rolling_mad_matches_apply():
+    series = make_frame(200, 42)['Close']
+    series.iloc[[0, 50, 51, 120]] = np.nan
+    expected = series.rolling(window=20).apply(lambda x: np.abs(x - x.mean()).mean()).to_numpy()
+
+    assert np.allclose(rolling_mad(series.to_numpy(), 20), expected, rtol=1e-12, equal_nan=True)
+
+    panel = np.column_stack([series.to_numpy(), make_frame(200, 43)['Close'].to_numpy()])
+    result = rolling_mad(panel, 20)
+    assert result.shape == panel.shape
+    assert np.allclose(result[:, 0], expected, rtol=1e-12, equal_nan=True)
+
+
+def test_indicator_columns_match():
+    frames = make_frames()
+    analyzer = AdvancedTechnicalAnalyzer()
+    symbols, arrays, lengths = stack_frames(frames)
+    indicators = compute_indicators(arrays)
+    days = len(arrays['Close'])
+
+    for j, symbol in enumerate(symbols):
+        df = frames[symbol].copy()
+        for method in (analyzer.calculate_moving_averages, analyzer.calculate_rsi, analyzer.calculate_stochastic,
+                       analyzer.calculate_macd, analyzer.calculate_bollinger_bands, analyzer.calculate_atr,
+                       analyzer.calculate_cci, analyzer.calculate_williams_r, analyzer.calculate_volume_indicators,
+                       analyzer.calculate_momentum):
+            df = method(df)
+        for column in INDICATOR_COLUMNS:
+            expected = df[column].to_numpy()
+            actual = indicators[column][days - lengths[j]:, j]
+            assert np.allclose(expected, actual, rtol=1e-9, equal_nan=True), f'{symbol} {column}'
+
+
+def test_signals_match():
+    frames = make_frames()
+    analyzer = AdvancedTechnicalAnalyzer()
+    signals = PanelIndicatorEngine(analyzer).generate_signals(frames)
+
+    assert set(signals) == set(frames)
+    for symbol, df in frames.items():
+        expected = analyzer.generate_comprehensive_signal(df.copy())
+        assert_same(expected, signals[symbol], symbol)
+
+
+def test_short_history_and_input_untouched():
+    frames = make_frames()
+    before = {symbol: df.copy() for symbol, df in frames.items()}
+    signals = PanelIndicatorEngine().generate_signals(frames)
+
+    assert signals['600004'] == {}
+    assert signals['600005'] == {}
+    for symbol, df in frames.items():
+        pd.testing.assert_frame_equal(df, before[symbol])
+
+
+if __name__ == "__main__":
+    test_rolling_mad_matches_apply()
+    test_indicator_columns_match()
+    test_signals_match()
+    test_short_history_and_input_untouched()
+    print("面板指标一致性测试通过")
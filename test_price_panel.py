@@ -0,0 +1,67 @@
+"""
+价格面板读写测试（离线，使用临时目录和随机K线）
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from src.storage.price_panel import FIELDS, PricePanel, _normalize_bars
+from test_panel_indicators import make_frame
+
+
+def yfinance_frame(df: pd.DataFrame, ticker: str) -> pd.DataFrame:
+    """yfinance 1.x 单只下载的默认格式：(Price, Ticker) 两层列名"""
+    frame = df.copy()
+    frame.columns = pd.MultiIndex.from_product([frame.columns, [ticker]], names=['Price', 'Ticker'])
+    return frame
+
+
+def akshare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    frame = df.rename(columns=str.lower).reset_index(drop=True)
+    frame.insert(0, 'date', df.index.strftime('%Y-%m-%d'))
+    return frame
+
+
+def test_yfinance_multiindex_round_trip(tmp_path):
+    df = make_frame(200, 61)
+    panel = PricePanel(str(tmp_path / 'us'))
+    assert panel.write_frame('AAPL', yfinance_frame(df, 'AAPL')) == 200
+
+    frame = panel.get_frame('AAPL', df.index[0])
+    assert frame.shape == (200, len(FIELDS))
+    assert np.allclose(frame.to_numpy(), df[FIELDS].to_numpy())
+
+    # 只读方打开同一个面板看到相同数据
+    readonly = PricePanel.open_readonly(str(tmp_path / 'us'))
+    assert np.allclose(readonly.get_frame('AAPL').to_numpy(), df[FIELDS].to_numpy())
+
+
+def test_akshare_frame_round_trip(tmp_path):
+    df = make_frame(150, 62)
+    panel = PricePanel(str(tmp_path / 'cn'))
+    assert panel.write_frame('600000', akshare_frame(df)) == 150
+    frame = panel.get_frame('600000')
+    assert list(frame.columns) == FIELDS
+    assert np.allclose(frame.to_numpy(), df[FIELDS].to_numpy())
+
+
+def test_normalize_bars_picks_field_level():
+    df = make_frame(30, 63)
+    expected = df[FIELDS].to_numpy()
+    for frame in (df, yfinance_frame(df, 'AAPL'), yfinance_frame(df, 'AAPL').swaplevel(axis=1)):
+        assert np.allclose(_normalize_bars(frame).to_numpy(), expected)
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    with tempfile.TemporaryDirectory() as tmp:
+        test_yfinance_multiindex_round_trip(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_akshare_frame_round_trip(Path(tmp))
+    test_normalize_bars_picks_field_level()
+    print("价格面板读写测试通过")
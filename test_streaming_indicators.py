@@ -0,0 +1,96 @@
+"""
+流式增量指标与全量计算的一致性测试（离线，使用随机K线）
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+
+import pandas as pd
+
+from src.analyzers.advanced_technical_analyzer import AdvancedTechnicalAnalyzer
+from src.analyzers.streaming_indicators import StreamingIndicators
+from test_panel_indicators import assert_same, make_frame
+from test_price_panel import yfinance_frame
+
+
+def full_signal(df: pd.DataFrame):
+    return AdvancedTechnicalAnalyzer().generate_comprehensive_signal(df.copy())
+
+
+def test_bar_by_bar_matches_full_history():
+    df = make_frame(300, 7)
+    state = StreamingIndicators()
+    days = df.index.strftime('%Y-%m-%d')
+    values = df.to_numpy()
+
+    for i in range(len(df)):
+        state.update('600000', values[i], days[i])
+        if i + 1 in (119, 120, 200):
+            assert_same(full_signal(df.iloc[:i + 1]), state.signal('600000'))
+
+    assert_same(full_signal(df), state.signal('600000'))
+
+
+def test_warm_up_then_ingest_new_bars():
+    df = make_frame(300, 8)
+    state = StreamingIndicators()
+    state.warm_up({'600000': df.iloc[:250]})
+    assert_same(full_signal(df.iloc[:250]), state.signal('600000'))
+
+    signals = state.ingest({'600000': df})
+    assert_same(full_signal(df), signals['600000'])
+
+
+def test_yfinance_multiindex_frames():
+    df = make_frame(300, 12)
+    state = StreamingIndicators()
+    state.warm_up({'AAPL': yfinance_frame(df.iloc[:250], 'AAPL')})
+    assert_same(full_signal(df.iloc[:250]), state.signal('AAPL'))
+
+    signals = state.ingest({'AAPL': yfinance_frame(df, 'AAPL')})
+    assert_same(full_signal(df), signals['AAPL'])
+
+
+def test_intraday_refresh_replaces_last_bar():
+    df = make_frame(200, 9)
+    state = StreamingIndicators()
+    state.ingest({'600000': df.iloc[:-1]})
+    state.ingest({'600000': df})
+
+    refreshed = df.copy()
+    refreshed.iloc[-1, refreshed.columns.get_loc('Close')] *= 1.01
+    refreshed.iloc[-1, refreshed.columns.get_loc('High')] = refreshed[['High', 'Close']].iloc[-1].max()
+    signals = state.ingest({'600000': refreshed})
+    assert_same(full_signal(refreshed), signals['600000'])
+
+
+def test_state_round_trip_and_revised_history():
+    df = make_frame(320, 10)
+    path = os.path.join(tempfile.mkdtemp(), 'cn.npz')
+
+    state = StreamingIndicators(path)
+    state.ingest({'600000': df.iloc[:300], '600001': make_frame(150, 11)})
+    state.save()
+
+    reloaded = StreamingIndicators(path)
+    assert set(reloaded.states) == {'600000', '600001'}
+    signals = reloaded.ingest({'600000': df})
+    assert_same(full_signal(df), signals['600000'])
+
+    # 历史K线被修改（如复权）时重新预热
+    revised = df.copy()
+    revised.iloc[-2, revised.columns.get_loc('Close')] *= 1.05
+    signals = reloaded.ingest({'600000': revised})
+    assert_same(full_signal(revised), signals['600000'])
+
+
+if __name__ == "__main__":
+    test_bar_by_bar_matches_full_history()
+    test_warm_up_then_ingest_new_bars()
+    test_yfinance_multiindex_frames()
+    test_intraday_refresh_replaces_last_bar()
+    test_state_round_trip_and_revised_history()
+    print("流式指标一致性测试通过")
@@ -0,0 +1,117 @@
+"""
+技术指标计算后端一致性测试（离线，使用随机K线）
+
+每个可用后端的滚动统计、EMA 与 pandas 后端对比，含开头和中间的缺失值；
+完整的综合信号在各后端之间对比；未安装 TA-Lib 时回退到 numpy
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from src.analyzers import ta_backends
+from src.analyzers.advanced_technical_analyzer import AdvancedTechnicalAnalyzer
+from src.analyzers.compact_signal import CompactSignalEngine
+from src.analyzers.panel_indicators import PanelIndicatorEngine, compute_indicators, stack_frames
+from src.analyzers.ta_backends import STATS, NumpyBackend, available_backends, get_backend
+from test_panel_indicators import assert_same, make_frame, make_frames
+
+
+def sample_inputs():
+    close = make_frame(300, 21)['Close'].to_numpy()
+    leading = close.copy()
+    leading[:5] = np.nan
+    gap = close.copy()
+    gap[[0, 80, 81, 200]] = np.nan
+    return {'完整': close, '开头缺失': leading, '中间缺失': gap}
+
+
+def test_rolling_matches_pandas():
+    reference = get_backend('pandas')
+    for name in available_backends():
+        backend = get_backend(name)
+        for label, x in sample_inputs().items():
+            for stat in STATS:
+                for window in (5, 14, 20):
+                    for center in ((False, True) if stat in ('max', 'min') else (False,)):
+                        expected = reference.rolling(x, window, stat, center)
+                        actual = backend.rolling(x, window, stat, center)
+                        assert np.allclose(expected, actual, rtol=1e-9, equal_nan=True), \
+                            f'{name} {label} {stat} {window} center={center}'
+
+
+def test_ewm_matches_pandas():
+    reference = get_backend('pandas')
+    for name in available_backends():
+        backend = get_backend(name)
+        for label, x in sample_inputs().items():
+            for span in (9, 12, 26):
+                assert np.allclose(reference.ewm(x, span), backend.ewm(x, span), rtol=1e-9, equal_nan=True), \
+                    f'{name} {label} ewm {span}'
+
+
+def test_signal_matches_across_backends():
+    for seed, n in ((31, 365), (32, 130)):
+        df = make_frame(n, seed)
+        expected = AdvancedTechnicalAnalyzer('pandas').generate_comprehensive_signal(df.copy())
+        for name in available_backends():
+            actual = AdvancedTechnicalAnalyzer(name).generate_comprehensive_signal(df.copy())
+            assert_same(expected, actual, f'{name}.signal')
+
+
+def test_panel_and_compact_paths_use_analyzer_backend():
+    frames = make_frames()
+    expected = PanelIndicatorEngine(AdvancedTechnicalAnalyzer('pandas')).generate_signals(frames)
+    for name in available_backends():
+        analyzer = AdvancedTechnicalAnalyzer(name)
+        assert_same(expected, PanelIndicatorEngine(analyzer).generate_signals(frames), f'{name}.panel')
+        engine = CompactSignalEngine(analyzer)
+        for symbol, df in frames.items():
+            assert_same(expected[symbol], engine.generate(df)[1], f'{name}.compact.{symbol}')
+
+
+def test_compute_indicators_calls_backend():
+    class CountingBackend(NumpyBackend):
+        calls = 0
+
+        def rolling(self, *args, **kwargs):
+            CountingBackend.calls += 1
+            return super().rolling(*args, **kwargs)
+
+        def ewm(self, *args, **kwargs):
+            CountingBackend.calls += 1
+            return super().ewm(*args, **kwargs)
+
+    _, arrays, _ = stack_frames(make_frames())
+    compute_indicators(arrays, backend=CountingBackend())
+    assert CountingBackend.calls > 0
+
+
+def test_falls_back_without_talib():
+    original = ta_backends.talib
+    ta_backends.talib = None
+    try:
+        assert 'talib' not in available_backends()
+        assert get_backend('talib').name == 'numpy'
+        assert get_backend('auto').name == 'numpy'
+        assert AdvancedTechnicalAnalyzer('talib').backend.name == 'numpy'
+    finally:
+        ta_backends.talib = original
+
+
+def test_auto_prefers_talib_when_installed():
+    expected = 'talib' if ta_backends.talib is not None else 'numpy'
+    assert get_backend('auto').name == expected
+
+
+if __name__ == "__main__":
+    test_rolling_matches_pandas()
+    test_ewm_matches_pandas()
+    test_signal_matches_across_backends()
+    test_panel_and_compact_paths_use_analyzer_backend()
+    test_compute_indicators_calls_backend()
+    test_falls_back_without_talib()
+    test_auto_prefers_talib_when_installed()
+    print("指标计算后端一致性测试通过")